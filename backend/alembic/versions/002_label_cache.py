@@ -0,0 +1,41 @@
+"""label cache
+
+Revision ID: 002_label_cache
+Revises: 001_initial
+Create Date: 2026-10-18
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "002_label_cache"
+down_revision: str | None = "001_initial"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "label_cache",
+        sa.Column("key", sa.String(64), primary_key=True),
+        sa.Column("provider", sa.String(20), nullable=False),
+        sa.Column("model", sa.String(100), nullable=False),
+        sa.Column("title", sa.String(255), nullable=True),
+        sa.Column("company", sa.String(255), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+    op.create_index("ix_label_cache_provider_model", "label_cache", ["provider", "model"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_label_cache_provider_model")
+    op.drop_table("label_cache")
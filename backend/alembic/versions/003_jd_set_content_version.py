@@ -0,0 +1,29 @@
+"""jd set content version
+
+Revision ID: 003_content_version
+Revises: 002_label_cache
+Create Date: 2026-10-18
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "003_content_version"
+down_revision: str | None = "002_label_cache"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "jd_sets",
+        sa.Column("content_version", sa.Integer, nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("jd_sets", "content_version")
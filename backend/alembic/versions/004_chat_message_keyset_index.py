@@ -0,0 +1,31 @@
+"""chat message keyset index
+
+Revision ID: 004_chat_message_keyset
+Revises: 003_content_version
+Create Date: 2026-10-18
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "004_chat_message_keyset"
+down_revision: str | None = "003_content_version"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_chat_messages_session_created_id",
+        "chat_messages",
+        ["session_id", "created_at", "id"],
+    )
+    # Covered by the composite index's leading column
+    op.drop_index("ix_chat_messages_session_id")
+
+
+def downgrade() -> None:
+    op.create_index("ix_chat_messages_session_id", "chat_messages", ["session_id"])
+    op.drop_index("ix_chat_messages_session_created_id")
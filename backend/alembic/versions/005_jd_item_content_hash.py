@@ -0,0 +1,27 @@
+"""jd item content hash
+
+Revision ID: 005_item_content_hash
+Revises: 004_chat_message_keyset
+Create Date: 2026-10-18
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "005_item_content_hash"
+down_revision: str | None = "004_chat_message_keyset"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Left NULL for existing rows: they are rewritten once on their next sync
+    op.add_column("jd_items", sa.Column("content_hash", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("jd_items", "content_hash")
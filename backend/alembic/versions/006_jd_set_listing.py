@@ -0,0 +1,37 @@
+"""jd set item count and listing indexes
+
+Revision ID: 006_jd_set_listing
+Revises: 005_item_content_hash
+Create Date: 2026-10-18
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "006_jd_set_listing"
+down_revision: str | None = "005_item_content_hash"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "jd_sets",
+        sa.Column("item_count", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.execute(
+        "UPDATE jd_sets SET item_count = "
+        "(SELECT count(*) FROM jd_items WHERE jd_items.jd_set_id = jd_sets.id)"
+    )
+    op.create_index("ix_jd_sets_updated_at_id", "jd_sets", ["updated_at", "id"])
+    op.create_index("ix_jd_sets_user_updated_at_id", "jd_sets", ["user_id", "updated_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jd_sets_user_updated_at_id")
+    op.drop_index("ix_jd_sets_updated_at_id")
+    op.drop_column("jd_sets", "item_count")
@@ -0,0 +1,35 @@
+"""jd set versions for etags and if-match
+
+Revision ID: 007_jd_set_version
+Revises: 006_jd_set_listing
+Create Date: 2026-10-18
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "007_jd_set_version"
+down_revision: str | None = "006_jd_set_listing"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "jd_sets",
+        sa.Column("version", sa.Integer, nullable=False, server_default="1"),
+    )
+    # Bumped by edits only, not by chat or background labels; If-Match checks it
+    op.add_column(
+        "jd_sets",
+        sa.Column("edit_version", sa.Integer, nullable=False, server_default="1"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("jd_sets", "edit_version")
+    op.drop_column("jd_sets", "version")
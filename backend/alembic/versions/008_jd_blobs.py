@@ -0,0 +1,178 @@
+"""content-addressed compressed jd text
+
+Revision ID: 008_jd_blobs
+Revises: 007_jd_set_version
+Create Date: 2026-10-18
+"""
+
+import hashlib
+import logging
+import unicodedata
+import zlib
+from collections.abc import Sequence
+from pathlib import Path
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "008_jd_blobs"
+down_revision: str | None = "007_jd_set_version"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+BATCH_SIZE = 500
+
+# Codec logic is copied from app.services.jd_blobs as of this revision, so the
+# migration behaves the same however the app changes later. The backfill uses
+# plain zlib, so no stored blob depends on a dictionary shipped later; the
+# downgrade looks dictionaries up by content id among the shipped files,
+# which are never edited, for blobs the app wrote since.
+DICTIONARY_DIR = Path(__file__).resolve().parents[2] / "app" / "services"
+MAX_DICTIONARY_SIZE = 32 * 1024
+COMPRESSION_LEVEL = 9
+
+
+def _dictionaries() -> dict[str, bytes]:
+    found = {}
+    for path in DICTIONARY_DIR.glob("jd_blob_dictionary*.txt"):
+        dictionary = path.read_bytes()
+        found[hashlib.sha256(dictionary).hexdigest()[:8]] = dictionary[-MAX_DICTIONARY_SIZE:]
+    return found
+
+
+def _normalize(text: str) -> str:
+    return unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _blob_row(text: str) -> dict:
+    data = text.encode("utf-8")
+    body = zlib.compress(data, COMPRESSION_LEVEL)
+    return {
+        "hash": hashlib.sha256(data).hexdigest(),
+        "codec": "zlib",
+        "body": body,
+        "raw_size": len(data),
+        "stored_size": len(body),
+    }
+
+
+def _decompress(codec: str, body: bytes, dictionaries: dict[str, bytes]) -> str:
+    if codec == "zlib":
+        return zlib.decompress(body).decode("utf-8")
+    name, _, dict_id = codec.partition(":")
+    if name != "zlib+dict" or dict_id not in dictionaries:
+        raise ValueError(f"Unknown JD blob codec {codec!r}")
+    decompressor = zlib.decompressobj(zdict=dictionaries[dict_id])
+    return (decompressor.decompress(body) + decompressor.flush()).decode("utf-8")
+
+jd_items = sa.table(
+    "jd_items",
+    sa.column("id", sa.Uuid),
+    sa.column("raw_text", sa.Text),
+    sa.column("blob_hash", sa.String),
+)
+jd_blobs = sa.table(
+    "jd_blobs",
+    sa.column("hash", sa.String),
+    sa.column("codec", sa.String),
+    sa.column("body", sa.LargeBinary),
+    sa.column("raw_size", sa.Integer),
+    sa.column("stored_size", sa.Integer),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jd_blobs",
+        sa.Column("hash", sa.String(64), primary_key=True),
+        sa.Column("codec", sa.String(32), nullable=False),
+        sa.Column("body", sa.LargeBinary, nullable=False),
+        sa.Column("raw_size", sa.Integer, nullable=False),
+        sa.Column("stored_size", sa.Integer, nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "jd_items",
+        sa.Column("blob_hash", sa.String(64), sa.ForeignKey("jd_blobs.hash"), nullable=True),
+    )
+    op.create_index("ix_jd_items_blob_hash", "jd_items", ["blob_hash"])
+    op.alter_column("jd_items", "raw_text", existing_type=sa.Text, nullable=True)
+
+    # Backfill in keyset-ordered batches, moving each text into jd_blobs
+    conn = op.get_bind()
+    logical = items = 0
+    last_id = None
+    while True:
+        query = (
+            sa.select(jd_items.c.id, jd_items.c.raw_text)
+            .where(jd_items.c.raw_text.is_not(None))
+            .order_by(jd_items.c.id)
+            .limit(BATCH_SIZE)
+        )
+        if last_id is not None:
+            query = query.where(jd_items.c.id > last_id)
+        batch = conn.execute(query).all()
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        blobs: dict[str, dict] = {}
+        updates = []
+        for item_id, raw_text in batch:
+            row = _blob_row(_normalize(raw_text))
+            blobs.setdefault(row["hash"], row)
+            updates.append({"b_id": item_id, "b_hash": row["hash"]})
+            logical += row["raw_size"]
+            items += 1
+        conn.execute(insert(jd_blobs).values(list(blobs.values())).on_conflict_do_nothing())
+        conn.execute(
+            jd_items.update()
+            .where(jd_items.c.id == sa.bindparam("b_id"))
+            .values(blob_hash=sa.bindparam("b_hash"), raw_text=sa.null()),
+            updates,
+        )
+
+    unique, stored = conn.execute(
+        sa.select(
+            sa.func.coalesce(sa.func.sum(jd_blobs.c.raw_size), 0),
+            sa.func.coalesce(sa.func.sum(jd_blobs.c.stored_size), 0),
+        )
+    ).one()
+    if items:
+        logger.info(
+            "moved %d JD texts into jd_blobs: "
+            "%d bytes inline -> %d unique -> %d stored (%.1f%% saved)",
+            items,
+            logical,
+            unique,
+            stored,
+            100 * (1 - stored / logical) if logical else 0.0,
+        )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    dictionaries = _dictionaries()
+    rows = conn.execute(
+        sa.select(jd_blobs.c.hash, jd_blobs.c.codec, jd_blobs.c.body)
+    ).all()
+    for blob_hash, codec_name, body in rows:
+        conn.execute(
+            jd_items.update()
+            .where(jd_items.c.blob_hash == blob_hash)
+            .values(raw_text=_decompress(codec_name, body, dictionaries))
+        )
+    op.alter_column("jd_items", "raw_text", existing_type=sa.Text, nullable=False)
+    op.drop_index("ix_jd_items_blob_hash")
+    op.drop_column("jd_items", "blob_hash")
+    op.drop_table("jd_blobs")
@@ -0,0 +1,136 @@
+"""weighted full-text search vector on jd items
+
+Revision ID: 009_jd_item_search
+Revises: 008_jd_blobs
+Create Date: 2026-10-18
+"""
+
+import hashlib
+import zlib
+from collections.abc import Sequence
+from pathlib import Path
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "009_jd_item_search"
+down_revision: str | None = "008_jd_blobs"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BATCH_SIZE = 500
+
+# Copied from app.services.jd_blobs and app.services.jd_search as of this
+# revision, so the backfill doesn't change when the app does
+DICTIONARY_DIR = Path(__file__).resolve().parents[2] / "app" / "services"
+MAX_DICTIONARY_SIZE = 32 * 1024
+
+
+def _dictionaries() -> dict[str, bytes]:
+    found = {}
+    for path in DICTIONARY_DIR.glob("jd_blob_dictionary*.txt"):
+        dictionary = path.read_bytes()
+        found[hashlib.sha256(dictionary).hexdigest()[:8]] = dictionary[-MAX_DICTIONARY_SIZE:]
+    return found
+
+
+def _decompress(codec: str, body: bytes, dictionaries: dict[str, bytes]) -> str:
+    if codec == "zlib":
+        return zlib.decompress(body).decode("utf-8")
+    name, _, dict_id = codec.partition(":")
+    if name != "zlib+dict" or dict_id not in dictionaries:
+        raise ValueError(f"Unknown JD blob codec {codec!r}")
+    decompressor = zlib.decompressobj(zdict=dictionaries[dict_id])
+    return (decompressor.decompress(body) + decompressor.flush()).decode("utf-8")
+
+
+def _weighted(value, weight: str):
+    config = sa.literal_column("'english'::regconfig")
+    vector = sa.func.to_tsvector(config, sa.func.coalesce(sa.cast(value, sa.Text), ""))
+    return sa.func.setweight(vector, sa.literal_column(f"'{weight}'::\"char\""))
+
+
+def _search_vector(title, company, body):
+    """Title ranks A, company B, body C."""
+    return (
+        _weighted(title, "A").op("||")(_weighted(company, "B")).op("||")(_weighted(body, "C"))
+    )
+
+jd_items = sa.table(
+    "jd_items",
+    sa.column("id", sa.Uuid),
+    sa.column("raw_text", sa.Text),
+    sa.column("blob_hash", sa.String),
+    sa.column("label_title", sa.String),
+    sa.column("label_company", sa.String),
+    sa.column("search_vector", TSVECTOR),
+)
+jd_blobs = sa.table(
+    "jd_blobs",
+    sa.column("hash", sa.String),
+    sa.column("codec", sa.String),
+    sa.column("body", sa.LargeBinary),
+)
+
+
+def upgrade() -> None:
+    op.add_column("jd_items", sa.Column("search_vector", TSVECTOR, nullable=True))
+
+    # The text is compressed in jd_blobs, so vectors are computed batch by batch
+    # from decompressed text rather than by a generated column
+    conn = op.get_bind()
+    dictionaries = _dictionaries()
+    last_id = None
+    while True:
+        query = (
+            sa.select(
+                jd_items.c.id,
+                jd_items.c.raw_text,
+                jd_items.c.label_title,
+                jd_items.c.label_company,
+                jd_blobs.c.codec,
+                jd_blobs.c.body,
+            )
+            .select_from(jd_items.outerjoin(jd_blobs, jd_blobs.c.hash == jd_items.c.blob_hash))
+            .order_by(jd_items.c.id)
+            .limit(BATCH_SIZE)
+        )
+        if last_id is not None:
+            query = query.where(jd_items.c.id > last_id)
+        batch = conn.execute(query).all()
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        conn.execute(
+            jd_items.update()
+            .where(jd_items.c.id == sa.bindparam("b_id"))
+            .values(
+                search_vector=_search_vector(
+                    sa.bindparam("b_title"), sa.bindparam("b_company"), sa.bindparam("b_text")
+                )
+            ),
+            [
+                {
+                    "b_id": row.id,
+                    "b_title": row.label_title,
+                    "b_company": row.label_company,
+                    "b_text": _decompress(row.codec, row.body, dictionaries)
+                    if row.body is not None
+                    else row.raw_text or "",
+                }
+                for row in batch
+            ],
+        )
+
+    op.create_index(
+        "ix_jd_items_search_vector", "jd_items", ["search_vector"], postgresql_using="gin"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jd_items_search_vector")
+    op.drop_column("jd_items", "search_vector")
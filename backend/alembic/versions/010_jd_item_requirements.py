@@ -0,0 +1,53 @@
+"""locally extracted jd requirements
+
+Revision ID: 010_jd_item_requirements
+Revises: 009_jd_item_search
+Create Date: 2026-10-18
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "010_jd_item_requirements"
+down_revision: str | None = "009_jd_item_search"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # No backfill: changed items are extracted at sync time, and items without
+    # a row (or with a stale extractor_version) are extracted on first read of
+    # their workspace, so existing items fill in lazily
+    op.create_table(
+        "jd_item_requirements",
+        sa.Column(
+            "item_id",
+            sa.Uuid,
+            sa.ForeignKey("jd_items.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("skills", ARRAY(sa.String(64)), nullable=False),
+        sa.Column("seniority", sa.String(16), nullable=True),
+        sa.Column("years_min", sa.Integer, nullable=True),
+        sa.Column("years_max", sa.Integer, nullable=True),
+        sa.Column("salary_min", sa.Integer, nullable=True),
+        sa.Column("salary_max", sa.Integer, nullable=True),
+        sa.Column("salary_currency", sa.String(3), nullable=True),
+        sa.Column("extractor_version", sa.String(16), nullable=False),
+    )
+    op.create_index(
+        "ix_jd_item_requirements_skills",
+        "jd_item_requirements",
+        ["skills"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jd_item_requirements_skills")
+    op.drop_table("jd_item_requirements")
@@ -1,16 +1,42 @@
-import json
+import logging
+import time
 import uuid
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.config import settings
+from app.db.session import async_session_factory
 from app.models.chat_session import ChatMessage as ChatMessageModel, ChatSession
-from app.schemas.chat import ChatRequest
+from app.models.jd_item import JDItem
+from app.models.jd_set import JDSet
+from app.schemas.chat import ChatCacheStats, ChatRequest, ChatStreamStats, JDInput
+from app.services.chat_writer import chat_writer
+from app.services.detail_cache import detail_cache
+from app.services.jd_blobs import blob_store
 from app.services.llm.factory import get_provider
-from app.services.llm.prompt_builder import build_prompt_parts
+from app.services.llm.jd_block_cache import jd_block_cache
+from app.services.llm.jd_retrieval import retrieval_query, use_retrieval
+from app.services.llm.prompt_builder import (
+    RenderedJDBlock,
+    build_prompt_parts,
+    jd_block_render_key,
+    render_jd_block,
+)
+from app.services.llm.response_cache import prompt_cache_key, replay_tokens, response_cache
+from app.services.llm.stream_hub import stream_hub
+from app.services.llm.telemetry import (
+    Usage,
+    chat_duration_seconds,
+    chat_ttft_seconds,
+    current_usage,
+)
+from app.services.llm.tokens import count_tokens
+from app.services.sse import coalesce_tokens, event_frame, token_frame
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -31,48 +57,144 @@ async def _get_or_create_session(
     return session
 
 
+async def _load_jd_cards(jd_set_id: uuid.UUID, db: AsyncSession) -> list[JDInput]:
+    result = await db.execute(
+        select(JDItem).where(JDItem.jd_set_id == jd_set_id).order_by(JDItem.sort_order)
+    )
+    items = result.scalars().all()
+    texts = await blob_store.item_texts(db, items)
+    return [
+        JDInput(
+            id=str(item.id),
+            text=texts[str(item.id)],
+            label_title=item.label_title,
+            label_company=item.label_company,
+            is_muted=item.is_muted,
+        )
+        for item in items
+        if texts[str(item.id)].strip()
+    ]
+
+
+async def _load_jd_block(jd_set_id: uuid.UUID, db: AsyncSession, query: str) -> RenderedJDBlock:
+    """Render the JD block from stored items, reusing it while the content version
+    holds. Large workspaces get a per-query block of retrieved passages instead."""
+    result = await db.execute(
+        select(JDSet.content_version, JDSet.item_count).where(JDSet.id == jd_set_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+
+    if use_retrieval(row.item_count):
+        # Depends on the question, so only the retrieval index is reused
+        return render_jd_block(await _load_jd_cards(jd_set_id, db), query, jd_set_id)
+
+    key = (jd_set_id, row.content_version, jd_block_render_key())
+    rendered = jd_block_cache.get(key)
+    if rendered is None:
+        rendered = render_jd_block(await _load_jd_cards(jd_set_id, db))
+        jd_block_cache.set(key, rendered)
+    return rendered
+
+
 @router.post("/stream")
-async def stream_chat(request: ChatRequest, db: AsyncSession = Depends(get_db)):
+async def stream_chat(request: ChatRequest):
+    started = time.perf_counter()
     provider = get_provider(request.provider)
-    prompt_parts = build_prompt_parts(request)
 
-    # Resolve chat session if workspace ID provided
-    chat_session: ChatSession | None = None
+    set_uuid: uuid.UUID | None = None
     if request.jd_set_id:
         try:
             set_uuid = uuid.UUID(request.jd_set_id)
+        except ValueError:
+            set_uuid = None  # Invalid UUID, skip persistence
+
+    # Hold a pooled connection only while preparing; it is released before the
+    # stream starts and the assistant reply is persisted by chat_writer
+    chat_session_id: uuid.UUID | None = None
+    rendered_jd_block: RenderedJDBlock | None = None
+    if set_uuid:
+        async with async_session_factory() as db:
+            # Without inline cards, hydrate the JD block from the stored workspace
+            if not request.jd_cards:
+                rendered_jd_block = await _load_jd_block(set_uuid, db, retrieval_query(request))
+
             chat_session = await _get_or_create_session(set_uuid, db)
+            chat_session_id = chat_session.id
             # Persist user message
             user_msg = ChatMessageModel(
-                session_id=chat_session.id,
+                session_id=chat_session_id,
                 role="user",
                 content=request.user_message,
+                token_count=count_tokens(request.user_message),
             )
             db.add(user_msg)
+            await db.execute(
+                update(JDSet).where(JDSet.id == set_uuid).values(version=JDSet.version + 1)
+            )
             await db.commit()
-        except ValueError:
-            chat_session = None  # Invalid UUID, skip persistence
+            await detail_cache.invalidate(set_uuid)
+
+    prompt_parts = build_prompt_parts(request, provider.chat_model, rendered_jd_block)
+    if prompt_parts.jd_tokens_saved:
+        logger.info("JD dedup/retrieval saved ~%d prompt tokens", prompt_parts.jd_tokens_saved)
+
+    cache_key: str | None = None
+    cached_tokens: tuple[str, ...] | None = None
+    if request.use_cache:
+        cache_key = prompt_cache_key(prompt_parts, request.provider, provider.chat_model)
+        if settings.chat_cache_enabled:
+            cached_tokens = response_cache.get(cache_key)
 
     async def event_generator():
         collected_tokens: list[str] = []
+        # Filled in by the provider call serving this stream
+        usage = Usage()
+        current_usage.set(usage)
+        source = "cache" if cached_tokens is not None else "provider"
+        outcome = "cancelled"
+        if cached_tokens is not None:
+            tokens = replay_tokens(cached_tokens, settings.chat_cache_replay_delay_ms)
+        elif cache_key and settings.chat_stream_coalescing:
+            # Identical in-flight requests share a single upstream stream
+            tokens = stream_hub.subscribe(cache_key, lambda: provider.stream_chat(prompt_parts))
+        else:
+            tokens = provider.stream_chat(prompt_parts)
+        chunks = coalesce_tokens(tokens, settings.sse_flush_bytes, settings.sse_flush_interval_ms)
         try:
-            async for token in provider.stream_chat(prompt_parts):
-                collected_tokens.append(token)
-                yield f"data: {json.dumps({'token': token})}\n\n"
-            yield f"data: {json.dumps({'done': True})}\n\n"
+            async for chunk in chunks:
+                if not collected_tokens:
+                    chat_ttft_seconds.observe(
+                        time.perf_counter() - started, provider=request.provider, source=source
+                    )
+                collected_tokens.append(chunk)
+                yield token_frame(chunk)
+            fresh = cached_tokens is None and collected_tokens
+            if cache_key and settings.chat_cache_enabled and fresh:
+                response_cache.set(cache_key, collected_tokens)
+            outcome = "ok"
+            yield event_frame({"done": True})
         except Exception as e:
-            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            outcome = "error"
+            yield event_frame({"error": str(e)})
         finally:
+            chat_duration_seconds.observe(
+                time.perf_counter() - started,
+                provider=request.provider,
+                source=source,
+                outcome=outcome,
+            )
             # Persist assistant message after streaming completes
-            if chat_session and collected_tokens:
+            if chat_session_id and collected_tokens:
                 full_response = "".join(collected_tokens)
-                assistant_msg = ChatMessageModel(
-                    session_id=chat_session.id,
-                    role="assistant",
-                    content=full_response,
+                # Prefer the provider's reported output tokens over the local estimate
+                chat_writer.enqueue(
+                    chat_session_id,
+                    "assistant",
+                    full_response,
+                    usage.output_tokens or count_tokens(full_response),
                 )
-                db.add(assistant_msg)
-                await db.commit()
 
     return StreamingResponse(
         event_generator(),
@@ -81,5 +203,16 @@ async def stream_chat(request: ChatRequest, db: AsyncSession = Depends(get_db)):
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
             "X-Accel-Buffering": "no",
+            "X-JD-Tokens-Saved": str(prompt_parts.jd_tokens_saved),
         },
     )
+
+
+@router.get("/cache/stats", response_model=ChatCacheStats)
+async def chat_cache_stats():
+    return response_cache.stats()
+
+
+@router.get("/streams/stats", response_model=ChatStreamStats)
+async def chat_stream_stats():
+    return stream_hub.stats()
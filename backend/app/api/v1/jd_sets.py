@@ -1,50 +1,245 @@
+import base64
+import hashlib
+import json
 import uuid
+from datetime import datetime
+from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy import and_, any_, bindparam, case, delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.config import settings
 from app.db.session import get_db
-from app.models.jd_set import JDSet
+from app.models.chat_session import ChatMessage, ChatSession
 from app.models.jd_item import JDItem
-from app.models.chat_session import ChatSession, ChatMessage
+from app.models.jd_set import JDSet
 from app.schemas.jd_set import (
     BulkItemsSync,
+    ChatMessagePage,
     ChatMessageResponse,
+    JDItemRequirementsResponse,
     JDItemResponse,
+    JDItemUpsert,
+    JDRequirementsGrid,
+    JDSearchHit,
+    JDSearchPage,
     JDSetCreate,
     JDSetDetail,
     JDSetSummary,
     JDSetUpdate,
+    JDSimilarity,
+    JDSimilarityPair,
+    JDSkillRow,
+    LabelStatus,
+)
+from app.services.detail_cache import detail_cache
+from app.services.jd_blobs import blob_store, normalize_jd_text
+from app.services.jd_search import label_vector, search_items, search_vector
+from app.services.jd_similarity import workspace_similarity
+from app.services.label_queue import LabelJob, label_queue
+from app.services.requirements import (
+    requirement_extractor,
+    store_requirements,
+    workspace_requirements,
 )
 
 router = APIRouter()
 
 
 @router.get("", response_model=list[JDSetSummary])
-async def list_jd_sets(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(JDSet.id, JDSet.name, func.count(JDItem.id).label("item_count"), JDSet.updated_at)
-        .outerjoin(JDItem, JDItem.jd_set_id == JDSet.id)
-        .group_by(JDSet.id)
-        .order_by(JDSet.updated_at.desc())
+async def list_jd_sets(
+    response: Response,
+    limit: int | None = Query(default=None, ge=1),
+    after: str | None = None,
+    owner_id: str | None = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Most recently updated first, keyset-paginated on (updated_at, id). The
+    cursor for the next page is returned in the X-Next-Cursor header."""
+    limit = min(limit or settings.jd_set_page_size, settings.jd_set_page_max_size)
+    stmt = (
+        select(JDSet.id, JDSet.name, JDSet.item_count, JDSet.updated_at)
+        .order_by(JDSet.updated_at.desc(), JDSet.id.desc())
+        .limit(limit + 1)
     )
-    rows = result.all()
+    if owner_id:
+        try:
+            stmt = stmt.where(JDSet.user_id == uuid.UUID(owner_id))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid owner ID") from None
+    if after:
+        updated_at, set_id = _decode_cursor(after)
+        stmt = stmt.where(tuple_(JDSet.updated_at, JDSet.id) < (updated_at, set_id))
+
+    rows = (await db.execute(stmt)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1].updated_at, rows[-1].id)
     return [
-        JDSetSummary(id=str(row.id), name=row.name, item_count=row.item_count, updated_at=row.updated_at)
+        JDSetSummary(
+            id=str(row.id), name=row.name, item_count=row.item_count, updated_at=row.updated_at
+        )
         for row in rows
     ]
 
 
-def _set_to_detail(jd_set: JDSet) -> JDSetDetail:
-    """Convert ORM JDSet (with loaded relations) to JDSetDetail response."""
-    # Collect all chat messages across all sessions, ordered by created_at
-    all_messages: list[ChatMessage] = []
-    for session in jd_set.chat_sessions:
-        all_messages.extend(session.messages)
-    all_messages.sort(key=lambda m: m.created_at)
+async def _search_page(
+    db: AsyncSession,
+    q: str,
+    limit: int | None,
+    offset: int,
+    jd_set_id: uuid.UUID | None = None,
+    owner_id: uuid.UUID | None = None,
+) -> JDSearchPage:
+    limit = min(limit or settings.search_page_size, settings.search_page_max_size)
+    hits, has_more = await search_items(db, q, limit, offset, jd_set_id, owner_id)
+    return JDSearchPage(
+        hits=[
+            JDSearchHit(
+                item_id=str(hit.item_id),
+                jd_set_id=str(hit.jd_set_id),
+                jd_set_name=hit.jd_set_name,
+                label_title=hit.label_title,
+                label_company=hit.label_company,
+                rank=hit.rank,
+                snippet=hit.snippet,
+            )
+            for hit in hits
+        ],
+        next_offset=offset + len(hits) if has_more else None,
+    )
+
+
+@router.get("/search", response_model=JDSearchPage)
+async def search_jd_items(
+    q: str = Query(min_length=1, max_length=500),
+    limit: int | None = Query(default=None, ge=1),
+    offset: int = Query(default=0, ge=0),
+    owner_id: str | None = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Ranked full-text search over every stored JD. `q` takes web-search syntax:
+    "quoted phrases", OR and -excluded words."""
+    owner_uuid = None
+    if owner_id:
+        try:
+            owner_uuid = uuid.UUID(owner_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid owner ID") from None
+    return await _search_page(db, q, limit, offset, owner_id=owner_uuid)
+
+
+def _etag(edit_version: int, version: int) -> str:
+    """Tagged as "<edit_version>.<version>": the whole tag validates cached
+    copies, the edit part alone is what If-Match guards."""
+    return f'"{edit_version}.{version}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """RFC 9110 weak comparison against an If-None-Match list."""
+    for candidate in header.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+
+def _if_match_allows(header: str, edit_version: int) -> bool:
+    """Strong If-Match check on the edit part of our ETags only, so chat turns and
+    label write-backs, which bump `version`, don't fail an editor's next save."""
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith('"') and candidate.endswith('"'):
+            edit_part = candidate[1:-1].partition(".")[0]
+            if edit_part == str(edit_version):
+                return True
+    return False
+
+
+async def _lock_version(
+    set_uuid: uuid.UUID, db: AsyncSession, if_match: str | None
+) -> tuple[int, int]:
+    """Lock the workspace row for this transaction and check If-Match against it,
+    so concurrent editors can't interleave their writes. Returns (edit_version,
+    version)."""
+    row = (
+        await db.execute(
+            select(JDSet.edit_version, JDSet.version)
+            .where(JDSet.id == set_uuid)
+            .with_for_update()
+        )
+    ).one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+    if if_match and not _if_match_allows(if_match, row.edit_version):
+        raise HTTPException(
+            status_code=412,
+            detail="Workspace was modified by someone else",
+            headers={"ETag": _etag(row.edit_version, row.version)},
+        )
+    return row.edit_version, row.version
+
+
+def _encode_cursor(timestamp: datetime, row_id: uuid.UUID) -> str:
+    raw = f"{timestamp.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, msg_id = raw.split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(msg_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+
+async def _message_page(
+    set_uuid: uuid.UUID, db: AsyncSession, limit: int, before: str | None = None
+) -> tuple[list[ChatMessage], str | None]:
+    """One page of the workspace's messages across its sessions, newest first in
+    the query and returned oldest first, with the cursor for the next older page."""
+    stmt = (
+        select(ChatMessage)
+        .join(ChatSession, ChatMessage.session_id == ChatSession.id)
+        .where(ChatSession.jd_set_id == set_uuid)
+        .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+        .limit(limit + 1)
+    )
+    if before:
+        created_at, msg_id = _decode_cursor(before)
+        stmt = stmt.where(tuple_(ChatMessage.created_at, ChatMessage.id) < (created_at, msg_id))
+
+    messages = list((await db.execute(stmt)).scalars().all())
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    messages.reverse()
+    return messages, _encode_cursor(messages[0].created_at, messages[0].id) if has_more else None
+
+
+def _message_to_response(msg: ChatMessage) -> ChatMessageResponse:
+    return ChatMessageResponse(
+        id=str(msg.id),
+        role=msg.role,
+        content=msg.content,
+        token_count=msg.token_count,
+        created_at=msg.created_at,
+    )
+
 
+def _set_to_detail(
+    jd_set: JDSet,
+    texts: dict[str, str],
+    messages: list[ChatMessage],
+    messages_before: str | None,
+) -> JDSetDetail:
+    """Convert ORM JDSet (with items loaded), its item texts and latest message page
+    to JDSetDetail."""
     items_sorted = sorted(jd_set.items, key=lambda i: i.sort_order)
 
     return JDSetDetail(
@@ -53,7 +248,7 @@ def _set_to_detail(jd_set: JDSet) -> JDSetDetail:
         items=[
             JDItemResponse(
                 id=str(item.id),
-                raw_text=item.raw_text,
+                raw_text=texts[str(item.id)],
                 label_title=item.label_title,
                 label_company=item.label_company,
                 is_muted=item.is_muted,
@@ -62,96 +257,119 @@ def _set_to_detail(jd_set: JDSet) -> JDSetDetail:
             )
             for item in items_sorted
         ],
-        chat_messages=[
-            ChatMessageResponse(
-                id=str(msg.id),
-                role=msg.role,
-                content=msg.content,
-                created_at=msg.created_at,
-            )
-            for msg in all_messages
-        ],
+        chat_messages=[_message_to_response(msg) for msg in messages],
+        messages_before=messages_before,
+        version=jd_set.version,
+        edit_version=jd_set.edit_version,
         updated_at=jd_set.updated_at,
     )
 
 
+async def _load_detail(set_uuid: uuid.UUID, db: AsyncSession) -> JDSetDetail | None:
+    result = await db.execute(
+        select(JDSet).where(JDSet.id == set_uuid).options(selectinload(JDSet.items))
+    )
+    jd_set = result.scalar_one_or_none()
+    if not jd_set:
+        return None
+    texts = await blob_store.item_texts(db, jd_set.items)
+    messages, messages_before = await _message_page(set_uuid, db, settings.chat_page_size)
+    return _set_to_detail(jd_set, texts, messages, messages_before)
+
+
 @router.post("", response_model=JDSetDetail)
-async def create_jd_set(body: JDSetCreate, db: AsyncSession = Depends(get_db)):
+async def create_jd_set(
+    body: JDSetCreate, response: Response, db: AsyncSession = Depends(get_db)
+):
     jd_set = JDSet(name=body.name or "Untitled Workspace")
     jd_set.user_id = None
     db.add(jd_set)
     await db.commit()
     await db.refresh(jd_set)
+    response.headers["ETag"] = _etag(jd_set.edit_version, jd_set.version)
     # New workspace has no items or messages — build response directly
     return JDSetDetail(
         id=str(jd_set.id),
         name=jd_set.name,
         items=[],
         chat_messages=[],
+        version=jd_set.version,
+        edit_version=jd_set.edit_version,
         updated_at=jd_set.updated_at,
     )
 
 
 @router.get("/{jd_set_id}", response_model=JDSetDetail)
-async def get_jd_set(jd_set_id: str, db: AsyncSession = Depends(get_db)):
+async def get_jd_set(
+    jd_set_id: str,
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_db),
+):
     try:
         set_uuid = uuid.UUID(jd_set_id)
     except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid workspace ID")
+        raise HTTPException(status_code=400, detail="Invalid workspace ID") from None
 
-    result = await db.execute(
-        select(JDSet)
-        .where(JDSet.id == set_uuid)
-        .options(
-            selectinload(JDSet.items),
-            selectinload(JDSet.chat_sessions).selectinload(ChatSession.messages),
+    # A primary-key lookup decides both conditional GETs and cache hits
+    row = (
+        await db.execute(
+            select(JDSet.edit_version, JDSet.version).where(JDSet.id == set_uuid)
         )
-    )
-    jd_set = result.scalar_one_or_none()
-    if not jd_set:
+    ).one_or_none()
+    if row is None:
         raise HTTPException(status_code=404, detail="Workspace not found")
-
-    return _set_to_detail(jd_set)
+    edit_version, version = row.edit_version, row.version
+    etag = _etag(edit_version, version)
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # Every edit also bumps version, so version alone keys the cache
+    body = await detail_cache.get(set_uuid, version) if settings.detail_cache_enabled else None
+    if body is None:
+        detail = await _load_detail(set_uuid, db)
+        if not detail:
+            raise HTTPException(status_code=404, detail="Workspace not found")
+        version = detail.version
+        etag = _etag(detail.edit_version, version)
+        body = detail.model_dump_json().encode("utf-8")
+        if settings.detail_cache_enabled:
+            await detail_cache.set(set_uuid, version, body)
+
+    # Already-encoded bytes skip response_model validation and serialization
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 
 @router.put("/{jd_set_id}", response_model=JDSetDetail)
 async def update_jd_set(
-    jd_set_id: str, body: JDSetUpdate, db: AsyncSession = Depends(get_db)
+    jd_set_id: str,
+    body: JDSetUpdate,
+    response: Response,
+    if_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_db),
 ):
     try:
         set_uuid = uuid.UUID(jd_set_id)
     except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid workspace ID")
+        raise HTTPException(status_code=400, detail="Invalid workspace ID") from None
 
-    result = await db.execute(
-        select(JDSet)
-        .where(JDSet.id == set_uuid)
-        .options(
-            selectinload(JDSet.items),
-            selectinload(JDSet.chat_sessions).selectinload(ChatSession.messages),
-        )
-    )
-    jd_set = result.scalar_one_or_none()
-    if not jd_set:
-        raise HTTPException(status_code=404, detail="Workspace not found")
+    await _lock_version(set_uuid, db, if_match)
 
+    values: dict[str, Any] = {
+        "content_version": JDSet.content_version + 1,
+        "edit_version": JDSet.edit_version + 1,
+        "version": JDSet.version + 1,
+    }
     if body.name is not None:
-        jd_set.name = body.name
-
+        values["name"] = body.name
+    await db.execute(update(JDSet).where(JDSet.id == set_uuid).values(**values))
     await db.commit()
-    await db.refresh(jd_set)
+    await detail_cache.invalidate(set_uuid)
 
-    # Re-load relations after refresh
-    result = await db.execute(
-        select(JDSet)
-        .where(JDSet.id == set_uuid)
-        .options(
-            selectinload(JDSet.items),
-            selectinload(JDSet.chat_sessions).selectinload(ChatSession.messages),
-        )
-    )
-    jd_set = result.scalar_one_or_none()
-    return _set_to_detail(jd_set)
+    detail = await _load_detail(set_uuid, db)
+    if detail is None:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+    response.headers["ETag"] = _etag(detail.edit_version, detail.version)
+    return detail
 
 
 @router.delete("/{jd_set_id}")
@@ -159,7 +377,7 @@ async def delete_jd_set(jd_set_id: str, db: AsyncSession = Depends(get_db)):
     try:
         set_uuid = uuid.UUID(jd_set_id)
     except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid workspace ID")
+        raise HTTPException(status_code=400, detail="Invalid workspace ID") from None
 
     result = await db.execute(select(JDSet).where(JDSet.id == set_uuid))
     jd_set = result.scalar_one_or_none()
@@ -168,93 +386,332 @@ async def delete_jd_set(jd_set_id: str, db: AsyncSession = Depends(get_db)):
 
     await db.delete(jd_set)
     await db.commit()
+    await detail_cache.invalidate(set_uuid)
     return {"ok": True}
 
 
+def _content_hash(item: JDItemUpsert, text: str, sort_order: int) -> str:
+    """Hash of every client-controlled column, to skip rewriting unchanged rows."""
+    payload = json.dumps([text, item.label_title, item.label_company, item.is_muted, sort_order])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 @router.put("/{jd_set_id}/items", response_model=list[JDItemResponse])
 async def bulk_sync_items(
-    jd_set_id: str, body: BulkItemsSync, db: AsyncSession = Depends(get_db)
+    jd_set_id: str,
+    body: BulkItemsSync,
+    response: Response,
+    if_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_db),
 ):
     """
-    Bulk sync: frontend sends all current cards. Backend upserts matching IDs
-    and deletes any DB items not in the incoming list.
+    Bulk sync: frontend sends all current cards. Backend upserts changed and new
+    items and deletes any DB items not in the incoming list, in a constant number
+    of statements regardless of item count.
     """
     try:
         set_uuid = uuid.UUID(jd_set_id)
     except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid workspace ID")
-
-    # Verify workspace exists
-    result = await db.execute(select(JDSet).where(JDSet.id == set_uuid))
-    jd_set = result.scalar_one_or_none()
-    if not jd_set:
-        raise HTTPException(status_code=404, detail="Workspace not found")
+        raise HTTPException(status_code=400, detail="Invalid workspace ID") from None
 
-    # Get existing items
-    result = await db.execute(select(JDItem).where(JDItem.jd_set_id == set_uuid))
-    existing_items = {str(item.id): item for item in result.scalars().all()}
+    edit_version, version = await _lock_version(set_uuid, db, if_match)
 
-    incoming_ids: set[str] = set()
-    response_items: list[JDItem] = []
+    # Only the hash and timestamp of existing items are needed to diff
+    result = await db.execute(
+        select(JDItem.id, JDItem.content_hash, JDItem.created_at).where(
+            JDItem.jd_set_id == set_uuid
+        )
+    )
+    existing = {row.id: row for row in result.all()}
 
+    rows: list[dict] = []
+    changed: list[dict] = []
+    texts: dict[uuid.UUID, str] = {}
+    seen: set[uuid.UUID] = set()
     for idx, item_data in enumerate(body.items):
-        item_id = item_data.id
-
-        # Try to match to existing item
-        if item_id and item_id in existing_items:
-            # Update existing
-            item = existing_items[item_id]
-            item.raw_text = item_data.raw_text
-            item.label_title = item_data.label_title
-            item.label_company = item_data.label_company
-            item.is_muted = item_data.is_muted
-            item.sort_order = idx
-            incoming_ids.add(item_id)
-            response_items.append(item)
+        try:
+            item_id = uuid.UUID(item_data.id) if item_data.id else uuid.uuid4()
+        except ValueError:
+            item_id = uuid.uuid4()  # Invalid client ID, generate one
+        if item_id in seen:
+            item_id = uuid.uuid4()
+        seen.add(item_id)
+
+        text = texts[item_id] = normalize_jd_text(item_data.raw_text)
+        row: dict[str, Any] = {
+            "id": item_id,
+            "jd_set_id": set_uuid,
+            # Text lives in jd_blobs; clearing raw_text also migrates legacy rows
+            "raw_text": None,
+            "label_title": item_data.label_title,
+            "label_company": item_data.label_company,
+            "is_muted": item_data.is_muted,
+            "sort_order": idx,
+            "content_hash": _content_hash(item_data, text, idx),
+        }
+        rows.append(row)
+        current = existing.get(item_id)
+        if current is not None and current.content_hash == row["content_hash"]:
+            row["created_at"] = current.created_at
         else:
-            # Create new item, preserving client-provided ID if valid UUID
-            new_item = JDItem(
-                jd_set_id=set_uuid,
-                raw_text=item_data.raw_text,
-                label_title=item_data.label_title,
-                label_company=item_data.label_company,
-                is_muted=item_data.is_muted,
-                sort_order=idx,
+            changed.append(row)
+
+    if changed:
+        blob_hashes = await blob_store.put_many(db, [texts[row["id"]] for row in changed])
+        for row, blob_hash in zip(changed, blob_hashes, strict=True):
+            row["blob_hash"] = blob_hash
+            row["search_vector"] = search_vector(
+                row["label_title"], row["label_company"], texts[row["id"]]
             )
-            if item_id:
-                try:
-                    new_item.id = uuid.UUID(item_id)
-                    incoming_ids.add(item_id)
-                except ValueError:
-                    pass  # Let DB generate ID
-            db.add(new_item)
-            response_items.append(new_item)
-
-    # Delete items no longer present
-    for existing_id, item in existing_items.items():
-        if existing_id not in incoming_ids:
-            await db.delete(item)
-
-    # Touch updated_at on the jd_set
-    jd_set.name = jd_set.name  # triggers onupdate
+        insert_stmt = insert(JDItem).values(changed)
+        excluded = insert_stmt.excluded
+        # A client that has not seen background labels yet sends NULLs for them;
+        # keep stored labels while the text is unchanged, so reordering or muting
+        # does not wipe them and queue the items for extraction again
+        same_text = JDItem.blob_hash == excluded.blob_hash
+        kept_title = case(
+            (and_(same_text, excluded.label_title.is_(None)), JDItem.label_title)
+        )
+        kept_company = case(
+            (and_(same_text, excluded.label_company.is_(None)), JDItem.label_company)
+        )
+        stmt = insert_stmt.on_conflict_do_update(
+            index_elements=[JDItem.id],
+            set_={
+                **{
+                    column: excluded[column]
+                    for column in (
+                        "raw_text",
+                        "blob_hash",
+                        "is_muted",
+                        "sort_order",
+                        "content_hash",
+                    )
+                },
+                "label_title": func.coalesce(excluded.label_title, kept_title),
+                "label_company": func.coalesce(excluded.label_company, kept_company),
+                "search_vector": excluded.search_vector.op("||")(
+                    label_vector(kept_title, kept_company)
+                ),
+                "updated_at": func.now(),
+            },
+            # Never take over an item that belongs to another workspace
+            where=JDItem.jd_set_id == set_uuid,
+        ).returning(JDItem.id, JDItem.created_at, JDItem.label_title, JDItem.label_company)
+        stored = {row.id: row for row in (await db.execute(stmt)).all()}
+        if len(stored) < len(changed):
+            await db.rollback()
+            raise HTTPException(status_code=409, detail="Item ID belongs to another workspace")
+        for row in changed:
+            stored_row = stored[row["id"]]
+            row["created_at"] = stored_row.created_at
+            row["label_title"] = stored_row.label_title
+            row["label_company"] = stored_row.label_company
+        await store_requirements(db, [(row["id"], texts[row["id"]]) for row in changed])
+
+    removed = [item_id for item_id in existing if item_id not in seen]
+    if removed:
+        # One array parameter keeps the statement text identical for any count
+        ids = bindparam("removed_ids", removed, type_=ARRAY(UUID(as_uuid=True)))
+        await db.execute(
+            delete(JDItem).where(JDItem.jd_set_id == set_uuid, JDItem.id == any_(ids))
+        )
 
+    if changed or removed:
+        # Invalidate rendered prompt blocks and keep the listing's counter in step
+        # with the rows, in the same transaction; also touches updated_at
+        item_count = (
+            select(func.count()).select_from(JDItem).where(JDItem.jd_set_id == set_uuid)
+        ).scalar_subquery()
+        bumped = (
+            await db.execute(
+                update(JDSet)
+                .where(JDSet.id == set_uuid)
+                .values(
+                    content_version=JDSet.content_version + 1,
+                    edit_version=JDSet.edit_version + 1,
+                    version=JDSet.version + 1,
+                    item_count=item_count,
+                )
+                .returning(JDSet.edit_version, JDSet.version)
+            )
+        ).one()
+        edit_version, version = bumped.edit_version, bumped.version
+    # Also ends the transaction that holds the row lock
     await db.commit()
-
-    # Refresh all items to get server-generated timestamps
-    for item in response_items:
-        await db.refresh(item)
-
-    response_items.sort(key=lambda i: i.sort_order)
+    if changed or removed:
+        await detail_cache.invalidate(set_uuid)
+    response.headers["ETag"] = _etag(edit_version, version)
+
+    # Label unlabeled items in the background instead of blocking the sync
+    label_queue.enqueue(
+        [
+            LabelJob(
+                item_id=row["id"],
+                jd_set_id=set_uuid,
+                text=texts[row["id"]],
+                blob_hash=row["blob_hash"],
+            )
+            for row in changed
+            if row["label_title"] is None
+            and row["label_company"] is None
+            and texts[row["id"]].strip()
+        ]
+    )
 
     return [
         JDItemResponse(
-            id=str(item.id),
-            raw_text=item.raw_text,
-            label_title=item.label_title,
-            label_company=item.label_company,
-            is_muted=item.is_muted,
-            sort_order=item.sort_order,
-            created_at=item.created_at,
+            id=str(row["id"]),
+            raw_text=texts[row["id"]],
+            label_title=row["label_title"],
+            label_company=row["label_company"],
+            is_muted=row["is_muted"],
+            sort_order=row["sort_order"],
+            created_at=row["created_at"],
         )
-        for item in response_items
+        for row in rows
     ]
+
+
+@router.get("/{jd_set_id}/messages", response_model=ChatMessagePage)
+async def list_messages(
+    jd_set_id: str,
+    before: str | None = None,
+    limit: int | None = Query(default=None, ge=1),
+    db: AsyncSession = Depends(get_db),
+):
+    """Older chat history, newest page first, keyset-paginated on (created_at, id)."""
+    try:
+        set_uuid = uuid.UUID(jd_set_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid workspace ID") from None
+
+    exists = await db.scalar(select(JDSet.id).where(JDSet.id == set_uuid))
+    if not exists:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+
+    limit = min(limit or settings.chat_page_size, settings.chat_page_max_size)
+    messages, next_before = await _message_page(set_uuid, db, limit, before)
+    return ChatMessagePage(
+        messages=[_message_to_response(msg) for msg in messages], next_before=next_before
+    )
+
+
+@router.get("/{jd_set_id}/search", response_model=JDSearchPage)
+async def search_workspace_items(
+    jd_set_id: str,
+    q: str = Query(min_length=1, max_length=500),
+    limit: int | None = Query(default=None, ge=1),
+    offset: int = Query(default=0, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    """Ranked full-text search within one workspace."""
+    try:
+        set_uuid = uuid.UUID(jd_set_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid workspace ID") from None
+
+    exists = await db.scalar(select(JDSet.id).where(JDSet.id == set_uuid))
+    if not exists:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+    return await _search_page(db, q, limit, offset, jd_set_id=set_uuid)
+
+
+@router.get("/{jd_set_id}/similarity", response_model=JDSimilarity)
+async def item_similarity(jd_set_id: str, db: AsyncSession = Depends(get_db)):
+    """Pairwise TF-IDF similarity of the workspace's JDs, computed locally."""
+    try:
+        set_uuid = uuid.UUID(jd_set_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid workspace ID") from None
+
+    exists = await db.scalar(select(JDSet.id).where(JDSet.id == set_uuid))
+    if not exists:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+
+    items = (
+        await db.execute(
+            select(JDItem.id, JDItem.blob_hash, JDItem.raw_text)
+            .where(JDItem.jd_set_id == set_uuid)
+            .order_by(JDItem.sort_order)
+        )
+    ).all()
+    result = await workspace_similarity(db, items)
+    item_ids = [str(item.id) for item in items]
+    matrix = result.matrix.round(4)
+    pairs = sorted(result.pairs, key=lambda p: matrix[p.a, p.b], reverse=True)
+    return JDSimilarity(
+        item_ids=item_ids,
+        matrix=matrix.tolist(),
+        pairs=[
+            JDSimilarityPair(
+                item_a=item_ids[pair.a],
+                item_b=item_ids[pair.b],
+                score=float(matrix[pair.a, pair.b]),
+                shared_terms=pair.shared,
+                distinct_a=pair.only_a,
+                distinct_b=pair.only_b,
+            )
+            for pair in pairs
+        ],
+    )
+
+
+@router.get("/{jd_set_id}/requirements", response_model=JDRequirementsGrid)
+async def requirements_grid(jd_set_id: str, db: AsyncSession = Depends(get_db)):
+    """Locally extracted requirements per item, and which items mention each skill."""
+    try:
+        set_uuid = uuid.UUID(jd_set_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid workspace ID") from None
+
+    exists = await db.scalar(select(JDSet.id).where(JDSet.id == set_uuid))
+    if not exists:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+
+    results = await workspace_requirements(db, set_uuid)
+    mentions: dict[str, list[str]] = {}
+    for item, req in results:
+        for skill_id in req.skills:
+            mentions.setdefault(skill_id, []).append(str(item.id))
+    skills = [
+        requirement_extractor.skills[skill_id]
+        for skill_id in mentions
+        if skill_id in requirement_extractor.skills
+    ]
+    # Most widely required first, so shared requirements lead the grid
+    skills.sort(key=lambda skill: (-len(mentions[skill.id]), skill.category, skill.name))
+    return JDRequirementsGrid(
+        items=[
+            JDItemRequirementsResponse(
+                item_id=str(item.id),
+                label_title=item.label_title,
+                label_company=item.label_company,
+                is_muted=item.is_muted,
+                seniority=req.seniority,
+                years_min=req.years_min,
+                years_max=req.years_max,
+                salary_min=req.salary_min,
+                salary_max=req.salary_max,
+                salary_currency=req.salary_currency,
+                skills=req.skills,
+            )
+            for item, req in results
+        ],
+        skills=[
+            JDSkillRow(
+                id=skill.id, name=skill.name, category=skill.category, item_ids=mentions[skill.id]
+            )
+            for skill in skills
+        ],
+    )
+
+
+@router.get("/{jd_set_id}/labels/status", response_model=LabelStatus)
+async def label_status(jd_set_id: str):
+    try:
+        set_uuid = uuid.UUID(jd_set_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid workspace ID") from None
+
+    return label_queue.status(set_uuid)
@@ -1,7 +1,11 @@
+import json
+
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 
-from app.schemas.label import LabelRequest, LabelResponse
-from app.services.label_extractor import extract_label
+from app.schemas.label import LabelBatchRequest, LabelCacheStats, LabelRequest, LabelResponse
+from app.services.label_cache import label_cache
+from app.services.label_extractor import extract_label, extract_labels_batch
 
 router = APIRouter()
 
@@ -10,3 +14,26 @@ router = APIRouter()
 async def extract_labels(request: LabelRequest):
     result = await extract_label(request.text, request.provider)
     return result
+
+
+@router.post("/extract-batch")
+async def extract_labels_batch_stream(request: LabelBatchRequest):
+    """Stream one NDJSON line per input text as soon as its label is ready."""
+
+    async def line_generator():
+        async for idx, label, error in extract_labels_batch(request.texts, request.provider):
+            if error is not None:
+                yield json.dumps({"index": idx, "error": str(error)}) + "\n"
+            else:
+                yield json.dumps({"index": idx, **label}) + "\n"
+
+    return StreamingResponse(
+        line_generator(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/cache/stats", response_model=LabelCacheStats)
+async def label_cache_stats():
+    return label_cache.stats()
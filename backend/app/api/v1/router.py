@@ -1,6 +1,12 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1 import chat, jd_sets, labels
+from app.db.session import get_db
+from app.services.jd_blobs import storage_report
+from app.services.llm.scheduler import scheduler_stats
+from app.services.metrics import registry
 
 api_router = APIRouter()
 
@@ -12,3 +18,20 @@ api_router.include_router(jd_sets.router, prefix="/jd-sets", tags=["jd-sets"])
 @api_router.get("/health")
 async def health_check():
     return {"status": "ok"}
+
+
+@api_router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@api_router.get("/llm/scheduler")
+async def llm_scheduler_stats():
+    return scheduler_stats()
+
+
+@api_router.get("/storage/jd-blobs")
+async def jd_blob_storage_report(db: AsyncSession = Depends(get_db)):
+    return await storage_report(db)
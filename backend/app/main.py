@@ -1,17 +1,42 @@
+import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.config import settings
 from app.api.v1.router import api_router
+from app.db.session import async_session_factory
+from app.services.chat_writer import chat_writer
+from app.services.jd_blobs import prune_orphan_blobs
+from app.services.label_cache import current_label_models, label_cache
+from app.services.label_queue import label_queue
+from app.services.llm.scheduler import OverloadedError
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    try:
+        await label_cache.invalidate_stale_models(current_label_models())
+    except Exception:
+        logger.warning("could not prune stale label cache entries", exc_info=True)
+    try:
+        async with async_session_factory() as db:
+            pruned = await prune_orphan_blobs(db)
+        if pruned:
+            logger.info("pruned %d unreferenced JD blobs", pruned)
+    except Exception:
+        logger.warning("could not prune unreferenced JD blobs", exc_info=True)
+    await label_queue.start()
+    await chat_writer.start()
     yield
     # Shutdown
+    await label_queue.stop()
+    await chat_writer.stop()
 
 
 app = FastAPI(
@@ -27,6 +52,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-JD-Tokens-Saved"],
 )
 
+
+@app.exception_handler(OverloadedError)
+async def overloaded_handler(request: Request, exc: OverloadedError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+    )
+
+
 app.include_router(api_router, prefix="/api/v1")
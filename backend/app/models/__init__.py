@@ -1,6 +1,18 @@
 from app.models.user import User
 from app.models.jd_set import JDSet
 from app.models.jd_item import JDItem
+from app.models.jd_blob import JDBlob
+from app.models.jd_item_requirements import JDItemRequirements
 from app.models.chat_session import ChatSession, ChatMessage
+from app.models.label_cache import LabelCacheEntry
 
-__all__ = ["User", "JDSet", "JDItem", "ChatSession", "ChatMessage"]
+__all__ = [
+    "User",
+    "JDSet",
+    "JDItem",
+    "JDBlob",
+    "JDItemRequirements",
+    "ChatSession",
+    "ChatMessage",
+    "LabelCacheEntry",
+]
@@ -1,7 +1,7 @@
 import uuid
 
-from sqlalchemy import Boolean, ForeignKey, Integer, String, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Boolean, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base, TimestampMixin
@@ -9,6 +9,9 @@ from app.db.base import Base, TimestampMixin
 
 class JDItem(Base, TimestampMixin):
     __tablename__ = "jd_items"
+    __table_args__ = (
+        Index("ix_jd_items_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -16,10 +19,19 @@ class JDItem(Base, TimestampMixin):
     jd_set_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("jd_sets.id", ondelete="CASCADE"), nullable=False
     )
-    raw_text: Mapped[str] = mapped_column(Text, nullable=False)
+    # Legacy inline text; new rows keep the text in jd_blobs and leave this NULL
+    raw_text: Mapped[str | None] = mapped_column(Text, nullable=True)
+    blob_hash: Mapped[str | None] = mapped_column(
+        String(64), ForeignKey("jd_blobs.hash"), nullable=True, index=True
+    )
     label_title: Mapped[str | None] = mapped_column(String(255), nullable=True)
     label_company: Mapped[str | None] = mapped_column(String(255), nullable=True)
     is_muted: Mapped[bool] = mapped_column(Boolean, default=False)
     sort_order: Mapped[int] = mapped_column(Integer, default=0)
+    # sha256 over the client-controlled columns; unchanged rows are skipped on sync
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # Weighted full-text vector over labels and text, written with the text
+    # (see services.jd_search.search_vector); deferred so item loads skip it
+    search_vector: Mapped[str | None] = mapped_column(TSVECTOR, nullable=True, deferred=True)
 
     jd_set = relationship("JDSet", back_populates="items")
@@ -0,0 +1,31 @@
+import uuid
+
+from sqlalchemy import ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class JDItemRequirements(Base):
+    """Skills and requirements extracted locally from an item's text."""
+
+    __tablename__ = "jd_item_requirements"
+    # "Which JDs ask for X" queries: skills @> ARRAY['kubernetes']
+    __table_args__ = (
+        Index("ix_jd_item_requirements_skills", "skills", postgresql_using="gin"),
+    )
+
+    item_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("jd_items.id", ondelete="CASCADE"), primary_key=True
+    )
+    # Taxonomy skill ids in order of first mention
+    skills: Mapped[list[str]] = mapped_column(ARRAY(String(64)), nullable=False)
+    seniority: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    years_min: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    years_max: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    salary_min: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    salary_max: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    salary_currency: Mapped[str | None] = mapped_column(String(3), nullable=True)
+    # Rows from an older taxonomy or rule set are re-extracted on read
+    extractor_version: Mapped[str] = mapped_column(String(16), nullable=False)
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import String
+from sqlalchemy import Index, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -9,6 +9,11 @@ from app.db.base import Base, TimestampMixin
 
 class JDSet(Base, TimestampMixin):
     __tablename__ = "jd_sets"
+    # Keyset pagination of the listing, overall and per owner
+    __table_args__ = (
+        Index("ix_jd_sets_updated_at_id", "updated_at", "id"),
+        Index("ix_jd_sets_user_updated_at_id", "user_id", "updated_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -17,6 +22,16 @@ class JDSet(Base, TimestampMixin):
         UUID(as_uuid=True), nullable=True
     )
     name: Mapped[str] = mapped_column(String(255), default="Untitled Workspace")
+    # Bumped whenever items change; keys server-side caches of rendered prompts
+    content_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    # Bumped by every mutation visible in the workspace detail; keys the detail
+    # cache and conditional GETs
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1")
+    # Bumped only by user edits (rename, item sync); what If-Match is checked
+    # against, so chat turns and label write-backs never cause a 412
+    edit_version: Mapped[int] = mapped_column(Integer, default=1, server_default="1")
+    # Maintained by the item sync so listing never has to count jd_items
+    item_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
 
     items = relationship("JDItem", back_populates="jd_set", cascade="all, delete-orphan")
     chat_sessions = relationship(
@@ -14,12 +14,31 @@ class JDInput(BaseModel):
 class ChatMessage(BaseModel):
     role: Literal["user", "assistant"]
     content: str
+    token_count: int | None = None
 
 
 class ChatRequest(BaseModel):
-    jd_cards: list[JDInput]
+    # May be omitted when jd_set_id is set; the server then loads the stored items
+    jd_cards: list[JDInput] = []
     messages: list[ChatMessage]
     user_message: str
-    provider: Literal["openai", "anthropic"] = "openai"
+    provider: Literal["openai", "anthropic", "auto"] = "openai"
     model: str | None = None
     jd_set_id: str | None = None
+    use_cache: bool = True
+
+
+class ChatCacheStats(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    hit_rate: float
+    size: int
+    max_size: int
+
+
+class ChatStreamStats(BaseModel):
+    active_streams: int
+    subscribers: int
+    started: int
+    joined: int
@@ -49,24 +49,103 @@ class BulkItemsSync(BaseModel):
     items: list[JDItemUpsert]
 
 
+class LabelStatus(BaseModel):
+    pending: int
+    completed: int
+    failed: int
+
+
+# --- Search ---
+
+class JDSearchHit(BaseModel):
+    item_id: str
+    jd_set_id: str
+    jd_set_name: str
+    label_title: str | None
+    label_company: str | None
+    rank: float
+    snippet: str  # HTML-escaped text with matches wrapped in <mark>
+
+
+class JDSearchPage(BaseModel):
+    hits: list[JDSearchHit]  # best match first
+    next_offset: int | None = None  # offset of the next page, None on the last
+
+
+# --- Similarity ---
+
+class JDSimilarityPair(BaseModel):
+    item_a: str
+    item_b: str
+    score: float
+    shared_terms: list[str]  # contribute most to the similarity
+    distinct_a: list[str]  # weigh much more in item_a than in item_b
+    distinct_b: list[str]
+
+
+class JDSimilarity(BaseModel):
+    item_ids: list[str]  # display order; indexes the matrix rows and columns
+    matrix: list[list[float]]  # cosine similarity of TF-IDF vectors, 0..1
+    pairs: list[JDSimilarityPair]  # every unordered pair, most similar first
+
+
+# --- Requirements ---
+
+class JDItemRequirementsResponse(BaseModel):
+    item_id: str
+    label_title: str | None
+    label_company: str | None
+    is_muted: bool
+    seniority: str | None
+    years_min: int | None
+    years_max: int | None
+    salary_min: int | None  # annual
+    salary_max: int | None
+    salary_currency: str | None
+    skills: list[str]  # skill ids, first mention first
+
+
+class JDSkillRow(BaseModel):
+    id: str
+    name: str
+    category: str
+    item_ids: list[str]  # items that mention the skill
+
+
+class JDRequirementsGrid(BaseModel):
+    items: list[JDItemRequirementsResponse]  # display order
+    skills: list[JDSkillRow]  # most widely mentioned first
+
+
 # --- Chat Messages ---
 
 class ChatMessageResponse(BaseModel):
     id: str
     role: str
     content: str
+    token_count: int | None = None
     created_at: datetime
 
     model_config = {"from_attributes": True}
 
 
+class ChatMessagePage(BaseModel):
+    messages: list[ChatMessageResponse]  # oldest first
+    next_before: str | None = None  # cursor for the next older page, None at the start
+
+
 # --- Full Workspace Detail ---
 
 class JDSetDetail(BaseModel):
     id: str
     name: str
     items: list[JDItemResponse]
+    # Latest page of messages; older pages via GET /jd-sets/{id}/messages
     chat_messages: list[ChatMessageResponse]
+    messages_before: str | None = None
+    version: int
+    # Only rename and item sync bump it; the If-Match guard compares against it
+    edit_version: int
     updated_at: datetime
 
     model_config = {"from_attributes": True}
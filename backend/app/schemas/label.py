@@ -1,13 +1,29 @@
 from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.config import settings
 
 
 class LabelRequest(BaseModel):
     text: str
-    provider: Literal["openai", "anthropic"] = "openai"
+    provider: Literal["openai", "anthropic", "auto"] = "openai"
 
 
 class LabelResponse(BaseModel):
     title: str | None = None
     company: str | None = None
+
+
+class LabelBatchRequest(BaseModel):
+    texts: list[str] = Field(min_length=1, max_length=settings.label_batch_max_size)
+    provider: Literal["openai", "anthropic", "auto"] = "openai"
+
+
+class LabelCacheStats(BaseModel):
+    hits: int
+    db_hits: int
+    misses: int
+    hit_rate: float
+    size: int
+    max_size: int
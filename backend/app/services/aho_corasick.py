@@ -0,0 +1,68 @@
+from collections import deque
+from collections.abc import Hashable, Iterator, Sequence
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class Automaton(Generic[T]):
+    """Aho-Corasick automaton over sequences of symbols.
+
+    Patterns are sequences (here: word tokens) mapped to values. After build(),
+    find() reports every occurrence of every pattern in one left-to-right pass,
+    whatever the number of patterns.
+    """
+
+    def __init__(self):
+        self._goto: list[dict[Hashable, int]] = [{}]
+        self._fail: list[int] = [0]
+        # (pattern length, value) for each pattern ending at the state
+        self._out: list[list[tuple[int, T]]] = [[]]
+        self._built = False
+
+    def add(self, pattern: Sequence[Hashable], value: T) -> None:
+        if self._built:
+            raise RuntimeError("automaton is already built")
+        if not pattern:
+            return
+        state = 0
+        for symbol in pattern:
+            nxt = self._goto[state].get(symbol)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][symbol] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(pattern), value))
+
+    def build(self) -> None:
+        """Compute failure links breadth-first and merge outputs along them."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for symbol, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and symbol not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(symbol, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+
+    @property
+    def states(self) -> int:
+        return len(self._goto)
+
+    def find(self, symbols: Sequence[Hashable]) -> Iterator[tuple[int, int, T]]:
+        """Yield (start, end, value) for every pattern occurrence, by end position."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for end, symbol in enumerate(symbols, start=1):
+            while state and symbol not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(symbol, 0)
+            for length, value in out[state]:
+                yield end - length, end, value
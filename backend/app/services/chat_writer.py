@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import UTC, datetime
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.config import settings
+from app.db.session import async_session_factory
+from app.models.chat_session import ChatMessage, ChatSession
+from app.models.jd_set import JDSet
+from app.services.detail_cache import detail_cache
+
+logger = logging.getLogger(__name__)
+
+MAX_FLUSH_BACKOFF_EXPONENT = 6
+
+
+class ChatMessageWriter:
+    """Write-behind buffer for chat messages produced after a request's DB session
+    is gone. Rows from all requests are flushed together in one multi-row INSERT
+    when the buffer fills up or the flush interval passes, and drained on stop.
+
+    A failed flush puts its rows back and is retried with backoff; the INSERT
+    skips ids that already landed, so a retry never duplicates a message. Rows
+    whose chat session was deleted meanwhile (with its workspace) are dropped,
+    never retried, so they cannot hold up everyone else's messages.
+    """
+
+    def __init__(self, flush_size: int, flush_interval: float, drain_timeout: float):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.drain_timeout = drain_timeout
+        self._rows: list[dict] = []
+        self._flush_now = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._failures = 0
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._flusher())
+
+    async def stop(self) -> None:
+        """Stop the flusher, then keep flushing until the buffer is empty or
+        drain_timeout passes."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        deadline = time.monotonic() + self.drain_timeout
+        while self._rows:
+            if await self.flush():
+                continue
+            delay = min(self._backoff(), deadline - time.monotonic())
+            if delay <= 0:
+                logger.error("dropping %d unsaved chat messages at shutdown", len(self._rows))
+                self._rows = []
+                break
+            await asyncio.sleep(delay)
+
+    def _backoff(self) -> float:
+        return self.flush_interval * 2 ** min(self._failures, MAX_FLUSH_BACKOFF_EXPONENT)
+
+    def enqueue(
+        self, session_id: uuid.UUID, role: str, content: str, token_count: int | None = None
+    ) -> None:
+        self._rows.append(
+            {
+                "id": uuid.uuid4(),
+                "session_id": session_id,
+                "role": role,
+                "content": content,
+                "token_count": token_count,
+                # Stamp now so ordering reflects when the message finished, not the flush
+                "created_at": datetime.now(UTC),
+            }
+        )
+        if len(self._rows) >= self.flush_size:
+            self._flush_now.set()
+
+    async def _flusher(self) -> None:
+        while True:
+            try:
+                # Back off while the database keeps failing
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self._backoff())
+            except TimeoutError:
+                pass
+            self._flush_now.clear()
+            await self.flush()
+
+    async def _write(self, rows: list[dict]) -> list[uuid.UUID]:
+        """Insert the rows whose session still exists; the ids of the workspaces
+        whose version was bumped."""
+        async with async_session_factory() as db:
+            session_ids = {row["session_id"] for row in rows}
+            live = set(
+                (
+                    await db.execute(select(ChatSession.id).where(ChatSession.id.in_(session_ids)))
+                ).scalars()
+            )
+            orphans = [row for row in rows if row["session_id"] not in live]
+            if orphans:
+                logger.warning(
+                    "dropping %d chat messages for deleted sessions %s",
+                    len(orphans),
+                    sorted({str(row["session_id"]) for row in orphans}),
+                )
+                rows = [row for row in rows if row["session_id"] in live]
+            if not rows:
+                return []
+            await db.execute(
+                insert(ChatMessage)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=[ChatMessage.id])
+            )
+            # New messages change the workspace detail, so invalidate its ETag
+            result = await db.execute(
+                update(JDSet)
+                .where(
+                    JDSet.id.in_(select(ChatSession.jd_set_id).where(ChatSession.id.in_(live)))
+                )
+                .values(version=JDSet.version + 1)
+                .returning(JDSet.id)
+            )
+            set_ids = list(result.scalars().all())
+            await db.commit()
+        return set_ids
+
+    async def _write_each(self, rows: list[dict]) -> list[uuid.UUID]:
+        """Write rows one at a time, dropping those the database rejects, so one
+        bad row cannot keep the rest of its batch from landing."""
+        set_ids: list[uuid.UUID] = []
+        for row in rows:
+            try:
+                set_ids += await self._write([row])
+            except IntegrityError:
+                logger.warning(
+                    "dropping chat message %s for session %s: rejected by the database",
+                    row["id"],
+                    row["session_id"],
+                    exc_info=True,
+                )
+        return set_ids
+
+    async def flush(self) -> bool:
+        """Write the buffered rows; False if they were put back for a retry."""
+        if not self._rows:
+            return True
+        batch, self._rows = self._rows, []
+        try:
+            try:
+                set_ids = await self._write(batch)
+            except IntegrityError:
+                # Typically a session deleted between the check and the INSERT
+                set_ids = await self._write_each(batch)
+        except (Exception, asyncio.CancelledError) as e:
+            # Ahead of newer rows so messages keep their order
+            self._rows = batch + self._rows
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._failures += 1
+            logger.warning(
+                "persisting %d chat messages failed; will retry", len(batch), exc_info=True
+            )
+            return False
+        self._failures = 0
+        for set_id in set(set_ids):
+            await detail_cache.invalidate(set_id)
+        return True
+
+chat_writer = ChatMessageWriter(
+    settings.chat_writer_flush_size,
+    settings.chat_writer_flush_interval,
+    settings.chat_writer_drain_seconds,
+)
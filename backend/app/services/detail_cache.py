@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from app.config import settings
+from app.services.metrics import registry, stats_samples
+
+logger = logging.getLogger(__name__)
+
+# (jd set id, version)
+CacheKey = tuple[uuid.UUID, int]
+
+# Rough per-entry bookkeeping cost on top of the body itself
+ENTRY_OVERHEAD_BYTES = 200
+
+
+class SharedTier(ABC):
+    """Cache tier shared between worker processes."""
+
+    @abstractmethod
+    async def get(self, key: CacheKey) -> bytes | None: ...
+
+    @abstractmethod
+    async def set(self, key: CacheKey, body: bytes) -> None: ...
+
+    @abstractmethod
+    async def invalidate(self, jd_set_id: uuid.UUID) -> None:
+        """Drop every cached version of a workspace."""
+        ...
+
+
+class SQLiteSharedTier(SharedTier):
+    """Shared tier backed by a SQLite file, usable by workers on one host.
+    With path ":memory:" it is process-local, which is enough for tests."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jd_set_detail_cache ("
+                "jd_set_id TEXT NOT NULL, version INTEGER NOT NULL, body BLOB NOT NULL, "
+                "PRIMARY KEY (jd_set_id, version))"
+            )
+
+    def _run(self, sql: str, params: tuple) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    async def get(self, key: CacheKey) -> bytes | None:
+        rows = await asyncio.to_thread(
+            self._run,
+            "SELECT body FROM jd_set_detail_cache WHERE jd_set_id = ? AND version = ?",
+            (str(key[0]), key[1]),
+        )
+        return rows[0][0] if rows else None
+
+    async def set(self, key: CacheKey, body: bytes) -> None:
+        await asyncio.to_thread(
+            self._run,
+            "INSERT OR REPLACE INTO jd_set_detail_cache VALUES (?, ?, ?)",
+            (str(key[0]), key[1], body),
+        )
+
+    async def invalidate(self, jd_set_id: uuid.UUID) -> None:
+        await asyncio.to_thread(
+            self._run, "DELETE FROM jd_set_detail_cache WHERE jd_set_id = ?", (str(jd_set_id),)
+        )
+
+
+class DetailCache:
+    """Encoded JSON of GET /jd-sets/{id}, keyed by workspace id and version.
+
+    A version bump alone makes old entries unreachable; writers also invalidate
+    explicitly so memory is released and deleted workspaces disappear at once.
+    The local LRU tier is bounded by bytes; the optional shared tier is consulted
+    on local misses and failures there only cost a rebuild.
+    """
+
+    def __init__(self, max_bytes: int, shared: SharedTier | None = None):
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self._entries: OrderedDict[CacheKey, bytes] = OrderedDict()
+        self._versions: dict[uuid.UUID, set[int]] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _store(self, key: CacheKey, body: bytes) -> None:
+        if len(body) + ENTRY_OVERHEAD_BYTES > self.max_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = body
+        self._versions.setdefault(key[0], set()).add(key[1])
+        self.bytes += len(body) + ENTRY_OVERHEAD_BYTES
+        while self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key: CacheKey) -> None:
+        body = self._entries.pop(key, None)
+        if body is None:
+            return
+        self.bytes -= len(body) + ENTRY_OVERHEAD_BYTES
+        versions = self._versions[key[0]]
+        versions.discard(key[1])
+        if not versions:
+            del self._versions[key[0]]
+
+    async def get(self, jd_set_id: uuid.UUID, version: int) -> bytes | None:
+        key = (jd_set_id, version)
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+        if self.shared is not None:
+            try:
+                body = await self.shared.get(key)
+            except Exception:
+                logger.warning("shared detail cache read failed", exc_info=True)
+            if body is not None:
+                self._store(key, body)
+                self.shared_hits += 1
+                return body
+        self.misses += 1
+        return None
+
+    async def set(self, jd_set_id: uuid.UUID, version: int, body: bytes) -> None:
+        key = (jd_set_id, version)
+        # Older versions of this workspace can never be served again
+        for old in [v for v in self._versions.get(jd_set_id, ()) if v < version]:
+            self._drop((jd_set_id, old))
+        self._store(key, body)
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, body)
+            except Exception:
+                logger.warning("shared detail cache write failed", exc_info=True)
+
+    async def invalidate(self, jd_set_id: uuid.UUID) -> None:
+        for version in list(self._versions.get(jd_set_id, ())):
+            self._drop((jd_set_id, version))
+        if self.shared is not None:
+            try:
+                await self.shared.invalidate(jd_set_id)
+            except Exception:
+                logger.warning("shared detail cache invalidation failed", exc_info=True)
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+detail_cache = DetailCache(
+    settings.detail_cache_max_bytes,
+    SQLiteSharedTier(path) if (path := settings.detail_cache_sqlite_path) else None,
+)
+registry.collector(lambda: stats_samples("jd_set_detail_cache", detail_cache.stats()))
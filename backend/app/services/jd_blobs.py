@@ -0,0 +1,285 @@
+import hashlib
+import logging
+import unicodedata
+import zlib
+from collections import Counter, OrderedDict
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any, cast
+
+from sqlalchemy import CursorResult, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.jd_blob import JDBlob
+from app.models.jd_item import JDItem
+from app.services.metrics import registry, stats_samples
+
+logger = logging.getLogger(__name__)
+
+# Optional preset dictionary trained on JD text (see train_dictionary), used
+# for new blobs; none ships until one is trained on a representative corpus
+# (benchmarks/bench_jd_blobs.py --train), and blobs use plain zlib meanwhile.
+# Never edit it in place: stored blobs name the dictionary they were
+# compressed with, and a replaced dictionary must be kept as a retired one.
+DICTIONARY_PATH = Path(__file__).with_name("jd_blob_dictionary.txt")
+# zlib only looks back 32 KiB, so a larger dictionary is wasted
+MAX_DICTIONARY_SIZE = 32 * 1024
+COMPRESSION_LEVEL = 9
+# Unreferenced blobs younger than this survive pruning: a sync may have
+# written them and not yet committed the items that point at them
+PRUNE_GRACE = timedelta(hours=1)
+
+
+def normalize_jd_text(text: str) -> str:
+    """Canonical form that is stored and hashed: NFC with LF line endings."""
+    return unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+
+
+def jd_blob_hash(text: str) -> str:
+    return hashlib.sha256(normalize_jd_text(text).encode("utf-8")).hexdigest()
+
+
+def dictionary_id(dictionary: bytes) -> str:
+    return hashlib.sha256(dictionary).hexdigest()[:8]
+
+
+def retired_dictionary_path(dict_id: str) -> Path:
+    """Where a dictionary that is no longer current is kept, so blobs
+    compressed with it stay readable."""
+    return DICTIONARY_PATH.with_name(f"{DICTIONARY_PATH.stem}.{dict_id}.txt")
+
+
+def train_dictionary(texts: Iterable[str], size: int = MAX_DICTIONARY_SIZE) -> bytes:
+    """Build a zlib preset dictionary from the lines and word n-grams that recur
+    across documents, weighted by bytes saved. The most valuable segments go last,
+    where back-references from the compressed text are shortest."""
+    doc_freq: Counter[str] = Counter()
+    for text in texts:
+        segments: set[str] = set()
+        for line in normalize_jd_text(text).split("\n"):
+            line = line.strip()
+            if len(line) >= 8:
+                segments.add(line)
+            words = line.split()
+            for n in (3, 5, 8):
+                segments.update(" ".join(words[i : i + n]) for i in range(len(words) - n + 1))
+        doc_freq.update(segments)
+
+    candidates = sorted(
+        ((freq - 1) * len(seg.encode("utf-8")), seg) for seg, freq in doc_freq.items() if freq > 1
+    )
+    chosen: list[str] = []
+    total = 0
+    for _, segment in reversed(candidates[-20000:]):
+        cost = len(segment.encode("utf-8")) + 1
+        if total + cost > size or any(segment in c for c in chosen):
+            continue
+        chosen.append(segment)
+        total += cost
+    return "\n".join(reversed(chosen)).encode("utf-8")
+
+
+class BlobCodec:
+    """zlib with an optional preset dictionary; the codec name records which.
+
+    Compresses with the current dictionary and decompresses with whichever
+    registered dictionary a blob names, so replacing the dictionary never
+    strands blobs written with an older one.
+    """
+
+    def __init__(self, dictionary: bytes, retired: Iterable[bytes] = ()):
+        self.dictionaries: dict[str, bytes] = {}
+        for old in retired:
+            self.register(old)
+        self.default = "zlib"
+        if dictionary:
+            self.default = f"zlib+dict:{self.register(dictionary)}"
+
+    def register(self, dictionary: bytes) -> str:
+        dict_id = dictionary_id(dictionary)
+        self.dictionaries[dict_id] = dictionary[-MAX_DICTIONARY_SIZE:]
+        return dict_id
+
+    def compress(self, text: str) -> tuple[str, bytes]:
+        data = text.encode("utf-8")
+        if self.default == "zlib":
+            return self.default, zlib.compress(data, COMPRESSION_LEVEL)
+        zdict = self.dictionaries[self.default.split(":", 1)[1]]
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=zdict)
+        return self.default, compressor.compress(data) + compressor.flush()
+
+    def decompress(self, codec: str, body: bytes) -> str:
+        if codec == "zlib":
+            return zlib.decompress(body).decode("utf-8")
+        name, _, dict_id = codec.partition(":")
+        if name != "zlib+dict" or dict_id not in self.dictionaries:
+            raise ValueError(f"Unknown JD blob codec {codec!r}")
+        decompressor = zlib.decompressobj(zdict=self.dictionaries[dict_id])
+        return (decompressor.decompress(body) + decompressor.flush()).decode("utf-8")
+
+
+def load_codec() -> BlobCodec:
+    dictionary = DICTIONARY_PATH.read_bytes() if DICTIONARY_PATH.exists() else b""
+    retired = []
+    for path in sorted(DICTIONARY_PATH.parent.glob(f"{DICTIONARY_PATH.stem}.*.txt")):
+        old = path.read_bytes()
+        if path != retired_dictionary_path(dictionary_id(old)):
+            raise ValueError(f"{path.name} does not match its id; dictionaries must never change")
+        retired.append(old)
+    return BlobCodec(dictionary, retired)
+
+
+def blob_row(codec: BlobCodec, text: str) -> dict:
+    """A jd_blobs row for already-normalized text."""
+    data = text.encode("utf-8")
+    name, body = codec.compress(text)
+    return {
+        "hash": hashlib.sha256(data).hexdigest(),
+        "codec": name,
+        "body": body,
+        "raw_size": len(data),
+        "stored_size": len(body),
+    }
+
+
+class BlobStore:
+    """Reads and writes JD text through jd_blobs.
+
+    Decompressed texts are kept in an LRU bounded by bytes, so hot workspaces
+    are served without touching jd_blobs or zlib.
+    """
+
+    def __init__(self, codec: BlobCodec, max_bytes: int):
+        self.codec = codec
+        self.max_bytes = max_bytes
+        self._texts: OrderedDict[str, str] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, blob_hash: str, text: str) -> None:
+        if blob_hash in self._texts:
+            self._texts.move_to_end(blob_hash)
+            return
+        self._texts[blob_hash] = text
+        self.bytes += len(text)
+        while self.bytes > self.max_bytes and self._texts:
+            _, evicted = self._texts.popitem(last=False)
+            self.bytes -= len(evicted)
+
+    async def put_many(self, db: AsyncSession, texts: Iterable[str]) -> list[str]:
+        """Store texts (normalizing them) and return their hashes in order."""
+        hashes: list[str] = []
+        rows: dict[str, dict] = {}
+        for text in texts:
+            text = normalize_jd_text(text)
+            blob_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            hashes.append(blob_hash)
+            if blob_hash not in rows:
+                rows[blob_hash] = blob_row(self.codec, text)
+                self._remember(blob_hash, text)
+        if rows:
+            stmt = insert(JDBlob).values(list(rows.values()))
+            # Re-using an old blob makes it young again, so a concurrent prune
+            # (which re-checks the age after waiting for this row) keeps it
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[JDBlob.hash],
+                    set_={"created_at": func.now()},
+                    where=JDBlob.created_at < func.now() - PRUNE_GRACE / 2,
+                )
+            )
+        return hashes
+
+    async def get_many(self, db: AsyncSession, hashes: Iterable[str]) -> dict[str, str]:
+        result: dict[str, str] = {}
+        missing: list[str] = []
+        for blob_hash in set(hashes):
+            text = self._texts.get(blob_hash)
+            if text is None:
+                missing.append(blob_hash)
+            else:
+                self._texts.move_to_end(blob_hash)
+                result[blob_hash] = text
+        self.hits += len(result)
+        self.misses += len(missing)
+        if missing:
+            rows = await db.execute(
+                select(JDBlob.hash, JDBlob.codec, JDBlob.body).where(JDBlob.hash.in_(missing))
+            )
+            for blob_hash, codec, body in rows.all():
+                text = self.codec.decompress(codec, body)
+                self._remember(blob_hash, text)
+                result[blob_hash] = text
+        return result
+
+    async def item_texts(self, db: AsyncSession, items: Iterable[JDItem]) -> dict[str, str]:
+        """Text of each item by item id, for blob-backed and legacy inline rows alike."""
+        items = list(items)
+        texts = await self.get_many(db, [i.blob_hash for i in items if i.blob_hash])
+        return {
+            str(item.id): texts.get(item.blob_hash, "") if item.blob_hash else item.raw_text or ""
+            for item in items
+        }
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._texts),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+async def prune_orphan_blobs(db: AsyncSession, grace: timedelta = PRUNE_GRACE) -> int:
+    """Delete blobs no item references. Blobs written or re-used within the grace
+    period are kept, so a concurrent sync that has put its blobs but not yet
+    committed its items never loses them."""
+    referenced = select(JDItem.id).where(JDItem.blob_hash == JDBlob.hash).exists()
+    cutoff = datetime.now(UTC) - grace
+    result = cast(
+        CursorResult[Any],
+        await db.execute(delete(JDBlob).where(~referenced, JDBlob.created_at < cutoff)),
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def storage_report(db: AsyncSession) -> dict[str, int | float]:
+    """Bytes JD text would take stored inline per item vs. what jd_blobs holds."""
+    logical, items = (
+        await db.execute(
+            select(func.coalesce(func.sum(JDBlob.raw_size), 0), func.count(JDItem.id))
+            .select_from(JDItem)
+            .join(JDBlob, JDBlob.hash == JDItem.blob_hash)
+        )
+    ).one()
+    unique, stored, blobs = (
+        await db.execute(
+            select(
+                func.coalesce(func.sum(JDBlob.raw_size), 0),
+                func.coalesce(func.sum(JDBlob.stored_size), 0),
+                func.count(),
+            )
+        )
+    ).one()
+    return {
+        "items": items,
+        "blobs": blobs,
+        "logical_bytes": logical,
+        "unique_bytes": unique,
+        "stored_bytes": stored,
+        "dedup_saved_bytes": logical - unique,
+        "compression_saved_bytes": unique - stored,
+        "saved_ratio": 1 - stored / logical if logical else 0.0,
+    }
+
+
+blob_store = BlobStore(load_codec(), settings.jd_blob_cache_max_bytes)
+registry.collector(lambda: stats_samples("jd_blob_text_cache", blob_store.stats()))
@@ -0,0 +1,141 @@
+import html
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy import ColumnElement, String, Text, bindparam, cast, func, literal_column, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.jd_item import JDItem
+from app.models.jd_set import JDSet
+from app.services.jd_blobs import blob_store
+
+SEARCH_CONFIG = "english"
+# ts_headline marks matches with these; they are swapped for <mark> after escaping
+_START, _STOP = "\x02", "\x03"
+HEADLINE_OPTIONS = (
+    f'StartSel="{_START}", StopSel="{_STOP}", '
+    'MaxFragments=2, MaxWords=30, MinWords=12, FragmentDelimiter=" … "'
+)
+
+
+def _config() -> ColumnElement:
+    # Inlined: a bound regconfig parameter would need a driver-side codec
+    return literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+
+
+def _weighted(value, weight: str) -> ColumnElement:
+    vector = func.to_tsvector(_config(), func.coalesce(cast(value, Text), ""))
+    return func.setweight(vector, literal_column(f"'{weight}'::\"char\""))
+
+
+def label_vector(title, company) -> ColumnElement:
+    """Label part of an item's search vector: title ranks A, company B."""
+    return _weighted(title, "A").op("||")(_weighted(company, "B"))
+
+
+def search_vector(title, company, body) -> ColumnElement:
+    """Weighted tsvector stored in jd_items.search_vector; the body ranks C.
+
+    The text lives compressed in jd_blobs, so Postgres can't generate this
+    column; writers compute it from the text they already hold."""
+    return label_vector(title, company).op("||")(_weighted(body, "C"))
+
+
+@dataclass
+class SearchHit:
+    item_id: uuid.UUID
+    jd_set_id: uuid.UUID
+    jd_set_name: str
+    label_title: str | None
+    label_company: str | None
+    rank: float
+    snippet: str
+
+
+def _mark(headline: str) -> str:
+    return html.escape(headline).replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+async def search_items(
+    db: AsyncSession,
+    query: str,
+    limit: int,
+    offset: int = 0,
+    jd_set_id: uuid.UUID | None = None,
+    owner_id: uuid.UUID | None = None,
+) -> tuple[list[SearchHit], bool]:
+    """Items matching a web-style query (quotes, OR, -word), best first.
+
+    Matching goes through the GIN index on search_vector; only the page that is
+    returned has its text loaded for snippets. Returns the hits and whether
+    more follow.
+    """
+    tsquery = func.websearch_to_tsquery(_config(), query)
+    rank = func.ts_rank_cd(JDItem.search_vector, tsquery)
+    stmt = (
+        select(
+            JDItem.id,
+            JDItem.jd_set_id,
+            JDSet.name,
+            JDItem.label_title,
+            JDItem.label_company,
+            JDItem.blob_hash,
+            JDItem.raw_text,
+            rank.label("rank"),
+        )
+        .join(JDSet, JDSet.id == JDItem.jd_set_id)
+        .where(JDItem.search_vector.op("@@")(tsquery))
+        .order_by(rank.desc(), JDItem.id)
+        .offset(offset)
+        .limit(limit + 1)
+    )
+    if jd_set_id is not None:
+        stmt = stmt.where(JDItem.jd_set_id == jd_set_id)
+    if owner_id is not None:
+        stmt = stmt.where(JDSet.user_id == owner_id)
+
+    rows = (await db.execute(stmt)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return [], False
+
+    texts = await blob_store.get_many(db, [row.blob_hash for row in rows if row.blob_hash])
+    bodies = [
+        (texts.get(row.blob_hash, "") if row.blob_hash else row.raw_text or "")
+        .replace(_START, "")
+        .replace(_STOP, "")
+        for row in rows
+    ]
+    # One round trip highlights the whole page with Postgres' own parser
+    page = (
+        func.unnest(
+            bindparam("ids", [str(row.id) for row in rows], type_=ARRAY(String)),
+            bindparam("bodies", bodies, type_=ARRAY(Text)),
+        )
+        .table_valued("id", "body")
+        .render_derived(name="page")
+    )
+    headlines = dict(
+        (
+            await db.execute(
+                select(
+                    page.c.id,
+                    func.ts_headline(_config(), page.c.body, tsquery, HEADLINE_OPTIONS),
+                ).select_from(page)
+            )
+        ).all()
+    )
+    return [
+        SearchHit(
+            item_id=row.id,
+            jd_set_id=row.jd_set_id,
+            jd_set_name=row.name,
+            label_title=row.label_title,
+            label_company=row.label_company,
+            rank=row.rank,
+            snippet=_mark(headlines.get(str(row.id), "")),
+        )
+        for row in rows
+    ], has_more
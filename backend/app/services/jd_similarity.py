@@ -0,0 +1,190 @@
+import asyncio
+import itertools
+import math
+import re
+from collections import Counter, OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.services.jd_blobs import blob_store, jd_blob_hash
+from app.services.metrics import registry, stats_samples
+
+# Keeps "c++", "c#", "node.js" and "ci/cd"-style parts intact; trailing dots are dropped
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./\-][a-z0-9+#]+)*")
+STOP_WORDS = frozenset(
+    {
+        "a", "about", "above", "after", "all", "also", "an", "and", "any", "are", "as",
+        "at", "be", "been", "being", "both", "but", "by", "can", "could", "do", "does",
+        "each", "etc", "for", "from", "had", "has", "have", "how", "if", "in", "into", "is",
+        "it", "its", "may", "more", "most", "must", "not", "of", "on", "or", "our", "out",
+        "over", "per", "such", "than", "that", "the", "their", "them", "then", "there",
+        "these", "they", "this", "those", "through", "to", "under", "up", "us", "via",
+        "was", "we", "well", "were", "what", "when", "where", "which", "while", "who",
+        "will", "with", "within", "would", "you", "your",
+    }
+)
+# Upper bound on elements held per batch of pair computations
+PAIR_BATCH_ELEMENTS = 4_000_000
+
+
+@dataclass(frozen=True)
+class TermVector:
+    """Sublinear term frequencies of one text; IDF is applied per workspace."""
+
+    terms: tuple[str, ...]
+    weights: np.ndarray  # float32, aligned with terms
+
+
+@dataclass
+class PairTerms:
+    a: int
+    b: int
+    shared: list[str]
+    only_a: list[str]
+    only_b: list[str]
+
+
+@dataclass
+class SimilarityResult:
+    matrix: np.ndarray  # (n, n) cosine similarity
+    pairs: list[PairTerms]  # every unordered pair, in (a, b) order
+
+
+def vectorize(text: str) -> TermVector:
+    """Unigrams and adjacent-word bigrams, stop words removed, weights 1 + log(tf)."""
+    tokens = [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOP_WORDS]
+    counts = Counter(tokens)
+    counts.update(f"{a} {b}" for a, b in itertools.pairwise(tokens))
+    terms = tuple(counts)
+    weights = np.fromiter(
+        (1 + math.log(counts[t]) for t in terms), dtype=np.float32, count=len(terms)
+    )
+    return TermVector(terms, weights)
+
+
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the k largest scores in each row, largest first."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.empty((scores.shape[0], 0), dtype=np.intp)
+    idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, idx, axis=1), axis=1)
+    return np.take_along_axis(idx, order, axis=1)
+
+
+def _named(terms: np.ndarray, idx: np.ndarray, scores: np.ndarray) -> list[str]:
+    return [terms[i] for i, s in zip(idx, scores[idx], strict=True) if s > 0]
+
+
+def similarity(vectors: list[TermVector], top_terms: int) -> SimilarityResult:
+    """Pairwise TF-IDF cosine similarity plus, per pair, the terms contributing
+    most to it and the terms that most set each side apart."""
+    vocab: dict[str, int] = {}
+    columns = [
+        np.fromiter(
+            (vocab.setdefault(t, len(vocab)) for t in v.terms), dtype=np.intp, count=len(v.terms)
+        )
+        for v in vectors
+    ]
+    n = len(vectors)
+    x = np.zeros((n, len(vocab)), dtype=np.float32)
+    for row, (cols, vector) in enumerate(zip(columns, vectors, strict=True)):
+        x[row, cols] = vector.weights
+
+    # Smoothed IDF over the workspace: terms every JD shares weigh least
+    df = np.count_nonzero(x, axis=0)
+    x *= (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    x /= np.where(norms == 0, 1, norms)
+    matrix = np.clip(x @ x.T, 0.0, 1.0)
+
+    terms = np.array(list(vocab), dtype=object)
+    a_idx, b_idx = np.triu_indices(n, k=1)
+    pairs: list[PairTerms] = []
+    batch = max(1, PAIR_BATCH_ELEMENTS // max(1, len(vocab)))
+    for start in range(0, len(a_idx), batch):
+        a, b = a_idx[start : start + batch], b_idx[start : start + batch]
+        shared = x[a] * x[b]
+        diff = x[a] - x[b]
+        top_shared = _top(shared, top_terms)
+        top_a = _top(diff, top_terms)
+        top_b = _top(-diff, top_terms)
+        for row in range(len(a)):
+            pairs.append(
+                PairTerms(
+                    a=int(a[row]),
+                    b=int(b[row]),
+                    shared=_named(terms, top_shared[row], shared[row]),
+                    only_a=_named(terms, top_a[row], diff[row]),
+                    only_b=_named(terms, top_b[row], -diff[row]),
+                )
+            )
+    return SimilarityResult(matrix, pairs)
+
+
+class VectorCache:
+    """Term vectors keyed by text hash, so a sync only re-vectorizes changed items
+    and identical texts across workspaces share one entry."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, TermVector] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text_hash: str) -> TermVector | None:
+        vector = self._entries.get(text_hash)
+        if vector is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(text_hash)
+        self.hits += 1
+        return vector
+
+    def set(self, text_hash: str, vector: TermVector) -> None:
+        self._entries[text_hash] = vector
+        self._entries.move_to_end(text_hash)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+async def item_vectors(db: AsyncSession, items: Iterable) -> list[TermVector]:
+    """Vectors of items with blob_hash/raw_text, loading text only for cache misses."""
+    items = list(items)
+    keys = [item.blob_hash or jd_blob_hash(item.raw_text or "") for item in items]
+    cached = [vector_cache.get(key) for key in keys]
+    misses = [item for item, vector in zip(items, cached, strict=True) if vector is None]
+    missing = [item.blob_hash for item in misses if item.blob_hash]
+    texts = await blob_store.get_many(db, missing) if missing else {}
+    vectors: list[TermVector] = []
+    for item, key, vector in zip(items, keys, cached, strict=True):
+        if vector is None:
+            text = texts.get(item.blob_hash, "") if item.blob_hash else item.raw_text or ""
+            vector = vectorize(text)
+            vector_cache.set(key, vector)
+        vectors.append(vector)
+    return vectors
+
+
+async def workspace_similarity(db: AsyncSession, items: Iterable) -> SimilarityResult:
+    vectors = await item_vectors(db, items)
+    # NumPy releases the GIL for the heavy parts; keep the event loop free
+    return await asyncio.to_thread(similarity, vectors, settings.similarity_top_terms)
+
+
+vector_cache = VectorCache(settings.similarity_vector_cache_size)
+registry.collector(lambda: stats_samples("jd_similarity_vector_cache", vector_cache.stats()))
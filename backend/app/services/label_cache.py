@@ -0,0 +1,143 @@
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, cast
+
+from sqlalchemy import CursorResult, and_, delete, not_, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import settings
+from app.db.session import async_session_factory
+from app.models.label_cache import LabelCacheEntry
+from app.services.llm.auto_provider import composite_model
+from app.services.metrics import registry, stats_samples
+
+logger = logging.getLogger(__name__)
+
+# Providers only ever see the first LABEL_TEXT_LIMIT characters of a JD
+LABEL_TEXT_LIMIT = 3000
+
+Label = dict[str, str | None]
+
+
+def normalize_label_text(text: str) -> str:
+    """Truncate like the providers do, then collapse whitespace."""
+    return " ".join(text[:LABEL_TEXT_LIMIT].split())
+
+
+def label_cache_key(text: str, provider: str, model: str) -> str:
+    payload = f"{provider}\0{model}\0{normalize_label_text(text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LabelCache:
+    """Two-tier label cache: a bounded in-process LRU in front of the label_cache table."""
+
+    def __init__(self, max_entries: int, persist: bool = True):
+        self.max_entries = max_entries
+        self.persist = persist
+        self._entries: OrderedDict[str, Label] = OrderedDict()
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, label: Label) -> None:
+        self._entries[key] = label
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Label | None:
+        label = self._entries.get(key)
+        if label is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(label)
+
+        if self.persist:
+            try:
+                async with async_session_factory() as db:
+                    row = await db.get(LabelCacheEntry, key)
+            except SQLAlchemyError:
+                logger.warning("label cache lookup failed", exc_info=True)
+                row = None
+            if row is not None:
+                label = {"title": row.title, "company": row.company}
+                self._remember(key, label)
+                self.hits += 1
+                self.db_hits += 1
+                return dict(label)
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, provider: str, model: str, label: Label) -> None:
+        # Don't pin failed extractions; the next request should retry the LLM
+        if not label.get("title") and not label.get("company"):
+            return
+
+        label = {"title": label.get("title"), "company": label.get("company")}
+        self._remember(key, label)
+
+        if not self.persist:
+            return
+        try:
+            async with async_session_factory() as db:
+                await db.execute(
+                    insert(LabelCacheEntry)
+                    .values(key=key, provider=provider, model=model, **label)
+                    .on_conflict_do_nothing(index_elements=[LabelCacheEntry.key])
+                )
+                await db.commit()
+        except SQLAlchemyError:
+            logger.warning("label cache write failed", exc_info=True)
+
+    async def invalidate_stale_models(self, current_models: dict[str, str]) -> int:
+        """Drop persisted entries whose provider's label model is no longer configured.
+
+        In-process entries are keyed by model as well, so they can never be served
+        for a different model and simply age out of the LRU.
+        """
+        if not self.persist:
+            return 0
+        current = or_(
+            *(
+                and_(LabelCacheEntry.provider == provider, LabelCacheEntry.model == model)
+                for provider, model in current_models.items()
+            )
+        )
+        async with async_session_factory() as db:
+            result = cast(
+                CursorResult[Any],
+                await db.execute(delete(LabelCacheEntry).where(not_(current))),
+            )
+            await db.commit()
+        return result.rowcount or 0
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "max_size": self.max_entries,
+        }
+
+
+label_cache = LabelCache(settings.label_cache_size, persist=settings.label_cache_persist)
+registry.collector(lambda: stats_samples("label_cache", label_cache.stats()))
+
+
+def current_label_models() -> dict[str, str]:
+    models = {
+        "openai": settings.openai_label_model,
+        "anthropic": settings.anthropic_label_model,
+    }
+    models["auto"] = composite_model(models)
+    return models
@@ -1,6 +1,86 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+from app.config import settings
+from app.services.label_cache import label_cache, label_cache_key
+from app.services.label_heuristics import extract_label_heuristic
+from app.services.llm.base import LLMProvider
 from app.services.llm.factory import get_provider
 
+Label = dict[str, str | None]
+
+# Singleflight: one provider call per cache key, shared by every concurrent caller
+_inflight: dict[str, asyncio.Task] = {}
+_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+def _get_semaphore(provider: str) -> asyncio.Semaphore:
+    if provider not in _semaphores:
+        _semaphores[provider] = asyncio.Semaphore(settings.label_concurrency)
+    return _semaphores[provider]
+
+
+async def _extract_uncached(llm: LLMProvider, text: str, provider: str, key: str) -> Label:
+    async with _get_semaphore(provider):
+        label = await llm.extract_label(text)
+    await label_cache.set(key, provider, llm.label_model, label)
+    return label
+
+
+def _forget_inflight(key: str, task: asyncio.Task) -> None:
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    # Mark the exception as retrieved even if every waiter went away
+    if not task.cancelled():
+        task.exception()
+
+
+async def extract_label(text: str, provider: str = "openai") -> Label:
+    # Zero-network fast path for postings with an obvious title/company header
+    guess = extract_label_heuristic(text)
+    if guess.confidence >= settings.label_heuristic_threshold:
+        return guess.as_label()
 
-async def extract_label(text: str, provider: str = "openai") -> dict[str, str | None]:
     llm = get_provider(provider)
-    return await llm.extract_label(text)
+    key = label_cache_key(text, provider, llm.label_model)
+
+    cached = await label_cache.get(key)
+    if cached is not None:
+        return cached
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_extract_uncached(llm, text, provider, key))
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _forget_inflight(key, t))
+    # Shield so one disconnecting caller doesn't cancel the call for the others
+    return dict(await asyncio.shield(task))
+
+
+async def extract_labels_batch(
+    texts: list[str], provider: str = "openai"
+) -> AsyncIterator[tuple[int, Label | None, Exception | None]]:
+    """Yield (index, label, error) for every text, in completion order.
+
+    Identical texts within the batch are extracted once and fanned back out.
+    """
+    llm = get_provider(provider)
+    groups: dict[str, list[int]] = {}
+    for idx, text in enumerate(texts):
+        groups.setdefault(label_cache_key(text, provider, llm.label_model), []).append(idx)
+
+    async def run(indices: list[int]) -> tuple[list[int], Label | None, Exception | None]:
+        try:
+            return indices, await extract_label(texts[indices[0]], provider), None
+        except Exception as e:  # noqa: BLE001 - reported per item in the yielded tuple
+            return indices, None, e
+
+    tasks = [asyncio.create_task(run(indices)) for indices in groups.values()]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            indices, label, error = await next_done
+            for idx in indices:
+                yield idx, label, error
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,216 @@
+import re
+from dataclasses import dataclass
+
+# Only the header of a posting is inspected; titles and companies live up top
+HEADER_LINES = 12
+
+COMPANY_SUFFIXES = {
+    "inc", "inc.", "incorporated", "llc", "l.l.c.", "llp", "ltd", "ltd.", "limited",
+    "corp", "corp.", "corporation", "co", "co.", "company", "plc", "gmbh", "ag", "sa",
+    "s.a.", "sas", "bv", "b.v.", "nv", "n.v.", "oy", "ab", "as", "pty", "pte", "kk",
+    "srl", "s.r.l.", "spa", "s.p.a.", "technologies", "technology", "labs",
+    "laboratories", "group", "holdings", "systems", "solutions", "software",
+    "partners", "ventures", "studios", "health", "bank", "capital", "consulting",
+    "networks", "analytics", "robotics", "therapeutics", "ai",
+}
+
+ROLE_WORDS = {
+    "engineer", "developer", "programmer", "architect", "scientist", "analyst",
+    "designer", "manager", "director", "lead", "head", "officer", "specialist",
+    "consultant", "administrator", "coordinator", "associate", "intern", "researcher",
+    "technician", "representative", "recruiter", "accountant", "strategist",
+    "writer", "editor", "marketer", "owner", "president", "vp", "sre", "devops",
+    "partner", "advisor", "executive", "assistant", "nurse", "teacher", "counsel",
+}
+
+# Whole-value location markers: a "company" made only of these is a location
+LOCATION_WORDS = {
+    "remote", "hybrid", "onsite", "on-site", "anywhere", "worldwide", "global",
+    "us", "usa", "u.s.", "uk", "eu", "emea", "apac", "latam", "nyc", "sf", "bay", "area",
+    "united", "states", "kingdom", "america", "north", "south", "east", "west", "central",
+    "new", "york", "san", "francisco", "jose", "diego", "los", "angeles", "las", "vegas",
+    "seattle", "boston", "chicago", "austin", "denver", "atlanta", "miami", "dallas",
+    "houston", "portland", "pittsburgh", "philadelphia", "washington", "dc", "d.c.",
+    "toronto", "vancouver", "montreal", "london", "dublin", "berlin", "munich",
+    "amsterdam", "paris", "madrid", "barcelona", "lisbon", "stockholm", "zurich",
+    "warsaw", "prague", "tel", "aviv", "singapore", "tokyo", "sydney", "melbourne",
+    "bangalore", "bengaluru", "hyderabad", "city", "county", "canada", "germany",
+    "france", "spain", "ireland", "netherlands", "sweden", "switzerland", "poland",
+    "israel", "india", "japan", "australia", "brazil", "mexico",
+}
+# US states and Canadian provinces after a comma: "Austin, TX", "Toronto, ON"
+REGION_CODES = {
+    "al", "ak", "az", "ar", "ca", "co", "ct", "de", "fl", "ga", "hi", "id", "il", "in",
+    "ia", "ks", "ky", "la", "me", "md", "ma", "mi", "mn", "ms", "mo", "mt", "ne", "nv",
+    "nh", "nj", "nm", "ny", "nc", "nd", "oh", "ok", "or", "pa", "ri", "sc", "sd", "tn",
+    "tx", "ut", "vt", "va", "wa", "wv", "wi", "wy", "on", "bc", "qc", "ab", "mb", "sk",
+    "ns", "nb", "nl", "pe",
+}
+
+_FIELD_TITLE_RE = re.compile(
+    r"^\s*(?:job\s+title|position(?:\s+title)?|role|title|job)\s*[:\-–—]\s*(?P<value>.+?)\s*$",
+    re.IGNORECASE,
+)
+_FIELD_COMPANY_RE = re.compile(
+    r"^\s*(?:company(?:\s+name)?|employer|organi[sz]ation|hiring\s+company)\s*[:\-–—]\s*"
+    r"(?P<value>.+?)\s*$",
+    re.IGNORECASE,
+)
+_AT_RE = re.compile(r"^\s*(?P<title>.{3,90}?)\s+(?:at|@)\s+(?P<company>.{2,80}?)\s*$")
+_SEPARATOR_RE = re.compile(r"\s+[|\-–—·]\s+")
+_HIRING_RE = re.compile(
+    r"^\s*(?P<company>[A-Z][\w&.'-]*(?:\s+[A-Z][\w&.'-]*){0,4})\s+is\s+hiring\s+"
+    r"(?:an?\s+)?(?P<title>[^.!]{3,80})"
+)
+_COMPANY_PHRASE_RES = [
+    re.compile(r"^\s*(?i:about)\s+(?P<company>[A-Z][\w&.,' -]{1,60}?)\s*:?\s*$"),
+    re.compile(
+        r"\b(?i:join|at)\s+(?P<company>[A-Z][\w&.'-]*(?:\s+[A-Z][\w&.'-]*){0,4}),?\s+"
+        r"(?i:we|our|you)\b"
+    ),
+]
+_MARKDOWN_RE = re.compile(r"[*_`]+|^[#>\s]+")
+_TRAILING_NOISE_RE = re.compile(r"\s*[\(\[].*?[\)\]]\s*$|[\s,;:!]+$")
+
+
+@dataclass
+class HeuristicLabel:
+    title: str | None
+    company: str | None
+    confidence: float
+
+    def as_label(self) -> dict[str, str | None]:
+        return {"title": self.title, "company": self.company}
+
+
+def _clean(value: str) -> str | None:
+    value = _TRAILING_NOISE_RE.sub("", value.strip())
+    # Keep the dot on abbreviations like "Inc." but drop sentence punctuation
+    if value.endswith(".") and value.split()[-1].lower() not in COMPANY_SUFFIXES:
+        value = value.rstrip(".")
+    if not value or len(value) > 120:
+        return None
+    return value
+
+
+def _words(value: str) -> list[str]:
+    return re.findall(r"[a-z][a-z.&]*", value.lower())
+
+
+def _looks_like_title(value: str) -> bool:
+    return any(word.rstrip(".") in ROLE_WORDS for word in _words(value))
+
+
+def _looks_like_location(value: str) -> bool:
+    """"Remote", "New York", "Austin, TX", "Stockholm, Sweden (Hybrid)"."""
+    parts = [p.strip() for p in re.split(r"[,/()]", value.lower()) if p.strip()]
+    if len(parts) > 1 and parts[-1].rstrip(".") in REGION_CODES:
+        return True
+    words = [w for part in parts for w in part.replace("-", " ").split()]
+    return bool(words) and all(w.strip(".") in LOCATION_WORDS or w in LOCATION_WORDS for w in words)
+
+
+def _company_score(value: str) -> float:
+    """How much a string looks like a company name, in [0, 1]."""
+    words = value.split()
+    if not words or len(words) > 6 or _looks_like_title(value) or _looks_like_location(value):
+        return 0.0
+    if words[-1].lower().strip(",") in COMPANY_SUFFIXES:
+        return 1.0
+    if all(w[0].isupper() or not w[0].isalpha() for w in words):
+        return 0.8
+    return 0.4
+
+
+def _header_lines(text: str) -> list[str]:
+    lines = (_MARKDOWN_RE.sub("", line).strip() for line in text.splitlines())
+    return [line for line in lines if line][:HEADER_LINES]
+
+
+def extract_label_heuristic(text: str) -> HeuristicLabel:
+    """Guess title and company from layout patterns without calling an LLM.
+
+    Confidence is the weaker of the two field confidences, so a label is only
+    trusted when both fields were found by a strong pattern.
+    """
+    lines = _header_lines(text)
+    title: tuple[str, float] | None = None
+    company: tuple[str, float] | None = None
+
+    def offer_title(value: str | None, confidence: float) -> None:
+        nonlocal title
+        if value and (title is None or confidence > title[1]):
+            title = (value, confidence)
+
+    def offer_company(value: str | None, confidence: float) -> None:
+        nonlocal company
+        if value and (company is None or confidence > company[1]):
+            company = (value, confidence)
+
+    for line in lines:
+        # Explicit "Job Title: ..." / "Company: ..." fields
+        if match := _FIELD_TITLE_RE.match(line):
+            offer_title(_clean(match["value"]), 0.95)
+            continue
+        if match := _FIELD_COMPANY_RE.match(line):
+            offer_company(_clean(match["value"]), 0.95)
+            continue
+
+        # "<Title> at <Company>"
+        if (match := _AT_RE.match(line)) and _looks_like_title(match["title"]):
+            candidate = _clean(match["company"])
+            score = _company_score(candidate) if candidate else 0.0
+            if score:
+                offer_title(_clean(match["title"]), 0.9)
+                offer_company(candidate, 0.6 + 0.3 * score)
+                continue
+
+        # "<Title> - <Company>" or "<Company> | <Title>"
+        parts = _SEPARATOR_RE.split(line)
+        if len(parts) == 2:
+            first, second = (_clean(p) for p in parts)
+            if first and second:
+                # "Software Engineer - New York": a location, not a company
+                if _looks_like_title(first) and _looks_like_location(second):
+                    offer_title(first, 0.85)
+                    continue
+                if _looks_like_title(first) and _company_score(second):
+                    offer_title(first, 0.85)
+                    offer_company(second, 0.55 + 0.3 * _company_score(second))
+                    continue
+                if _looks_like_title(second) and _company_score(first):
+                    offer_title(second, 0.85)
+                    offer_company(first, 0.55 + 0.3 * _company_score(first))
+                    continue
+
+        # "<Company> is hiring a <Title>"
+        if (match := _HIRING_RE.match(line)) and _looks_like_title(match["title"]):
+            offer_title(_clean(match["title"]), 0.85)
+            offer_company(_clean(match["company"]), 0.85)
+            continue
+
+        for pattern in _COMPANY_PHRASE_RES:
+            if match := pattern.search(line):
+                candidate = _clean(match["company"])
+                if candidate and _company_score(candidate):
+                    offer_company(candidate, 0.5 + 0.3 * _company_score(candidate))
+                break
+
+    # A bare role line near the top is usually the title, and a short
+    # capitalized line right under it is often the company
+    if title is None:
+        for idx, line in enumerate(lines[:3]):
+            if _looks_like_title(line) and len(line) <= 80:
+                offer_title(_clean(line), 0.7)
+                if idx + 1 < len(lines) and _company_score(lines[idx + 1]) >= 0.8:
+                    offer_company(_clean(lines[idx + 1]), 0.6)
+                break
+
+    # Half a label is only a hint
+    if title is None:
+        if company is None:
+            return HeuristicLabel(title=None, company=None, confidence=0.0)
+        return HeuristicLabel(title=None, company=company[0], confidence=company[1] * 0.5)
+    if company is None:
+        return HeuristicLabel(title=title[0], company=None, confidence=title[1] * 0.5)
+    return HeuristicLabel(title=title[0], company=company[0], confidence=min(title[1], company[1]))
@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import cast
+
+from sqlalchemy import Table, bindparam, update
+
+from app.config import settings
+from app.db.session import async_session_factory
+from app.models.jd_item import JDItem
+from app.models.jd_set import JDSet
+from app.services.detail_cache import detail_cache
+from app.services.jd_search import label_vector
+from app.services.label_extractor import extract_label
+
+logger = logging.getLogger(__name__)
+
+# Status is only kept for this many recently touched workspaces
+MAX_TRACKED_WORKSPACES = 1024
+# Texts that could not be labeled, remembered so re-syncs don't pay for them again
+MAX_UNLABELABLE = 10000
+MAX_FLUSH_BACKOFF_EXPONENT = 6
+
+
+@dataclass
+class LabelJob:
+    item_id: uuid.UUID
+    jd_set_id: uuid.UUID
+    text: str
+    blob_hash: str
+    attempt: int = 0
+
+
+@dataclass
+class WorkspaceLabelStatus:
+    pending: set[uuid.UUID] = field(default_factory=set)
+    completed: int = 0
+    failed: int = 0
+
+
+class LabelQueue:
+    """Background labeler for synced items that arrived without a label.
+
+    Workers pull jobs from an asyncio queue and retry failures with exponential
+    backoff. Results are buffered and written back in batched UPDATEs that never
+    overwrite a label the user set in the meantime; a failed write is retried on
+    the next flush. Texts that still fail after every retry, or that come back
+    with no label, are remembered by content hash for negative_ttl seconds and
+    not enqueued again in that time.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_retries: int,
+        backoff_seconds: float,
+        flush_size: int,
+        flush_interval: float,
+        provider: str,
+        negative_ttl: float,
+        drain_timeout: float,
+    ):
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.provider = provider
+        self.negative_ttl = negative_ttl
+        self.drain_timeout = drain_timeout
+        self._queue: asyncio.Queue[LabelJob] = asyncio.Queue()
+        self._results: list[dict] = []
+        self._flush_now = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self._status: OrderedDict[uuid.UUID, WorkspaceLabelStatus] = OrderedDict()
+        # blob hash -> monotonic time until which the text is not retried
+        self._unlabelable: OrderedDict[str, float] = OrderedDict()
+        self._flush_failures = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._flusher()))
+
+    async def stop(self) -> None:
+        """Give queued jobs and their retries drain_timeout seconds to finish, then
+        cancel the workers and write back every buffered result."""
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=self.drain_timeout)
+            except TimeoutError:
+                logger.warning("label queue stopped with %d jobs left", self._queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        while not self._queue.empty():
+            self._finish(self._queue.get_nowait(), ok=False)
+            self._queue.task_done()
+        await self._flush()
+        if self._results:
+            logger.error("dropping %d unwritten labels at shutdown", len(self._results))
+            self._results = []
+
+    def _is_unlabelable(self, blob_hash: str) -> bool:
+        until = self._unlabelable.get(blob_hash)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            del self._unlabelable[blob_hash]
+            return False
+        return True
+
+    def _mark_unlabelable(self, blob_hash: str) -> None:
+        self._unlabelable[blob_hash] = time.monotonic() + self.negative_ttl
+        self._unlabelable.move_to_end(blob_hash)
+        while len(self._unlabelable) > MAX_UNLABELABLE:
+            self._unlabelable.popitem(last=False)
+
+    def enqueue(self, jobs: list[LabelJob]) -> None:
+        for job in jobs:
+            status = self._touch(job.jd_set_id)
+            if self._is_unlabelable(job.blob_hash):
+                status.failed += 1
+                continue
+            if job.item_id in status.pending:
+                continue
+            status.pending.add(job.item_id)
+            self._queue.put_nowait(job)
+
+    def status(self, jd_set_id: uuid.UUID) -> dict[str, int]:
+        status = self._status.get(jd_set_id) or WorkspaceLabelStatus()
+        return {
+            "pending": len(status.pending),
+            "completed": status.completed,
+            "failed": status.failed,
+        }
+
+    def _touch(self, jd_set_id: uuid.UUID) -> WorkspaceLabelStatus:
+        status = self._status.get(jd_set_id)
+        if status is None or not status.pending:
+            # Start counting afresh for each new wave of work
+            status = WorkspaceLabelStatus()
+            self._status[jd_set_id] = status
+        self._status.move_to_end(jd_set_id)
+        while len(self._status) > MAX_TRACKED_WORKSPACES:
+            self._status.popitem(last=False)
+        return status
+
+    def _finish(self, job: LabelJob, ok: bool) -> None:
+        status = self._status.get(job.jd_set_id)
+        if status is None:
+            return
+        status.pending.discard(job.item_id)
+        if ok:
+            status.completed += 1
+        else:
+            status.failed += 1
+
+    async def _label(self, job: LabelJob) -> dict[str, str | None] | None:
+        """Extract with retries; the job stays with this worker while it backs off,
+        so stop() can wait for it instead of losing a pending timer."""
+        while True:
+            try:
+                return await extract_label(job.text, self.provider)
+            except Exception:
+                if job.attempt >= self.max_retries:
+                    logger.warning("labeling item %s failed", job.item_id, exc_info=True)
+                    return None
+                job.attempt += 1
+                await asyncio.sleep(self.backoff_seconds * 2 ** (job.attempt - 1))
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                label = await self._label(job)
+            except asyncio.CancelledError:
+                self._finish(job, ok=False)
+                raise
+            finally:
+                self._queue.task_done()
+
+            if label is None or not (label.get("title") or label.get("company")):
+                self._mark_unlabelable(job.blob_hash)
+                self._finish(job, ok=False)
+                continue
+
+            self._results.append(
+                {
+                    "b_id": job.item_id,
+                    "b_set_id": job.jd_set_id,
+                    "b_hash": job.blob_hash,
+                    "b_title": label.get("title"),
+                    "b_company": label.get("company"),
+                }
+            )
+            self._finish(job, ok=True)
+            if len(self._results) >= self.flush_size:
+                self._flush_now.set()
+
+    async def _flusher(self) -> None:
+        while True:
+            try:
+                # Back off while the database keeps failing
+                backoff = 2 ** min(self._flush_failures, MAX_FLUSH_BACKOFF_EXPONENT)
+                await asyncio.wait_for(
+                    self._flush_now.wait(), timeout=self.flush_interval * backoff
+                )
+            except TimeoutError:
+                pass
+            self._flush_now.clear()
+            await self._flush()
+
+    async def _flush(self) -> None:
+        if not self._results:
+            return
+        batch, self._results = self._results, []
+
+        table = cast(Table, JDItem.__table__)
+        stmt = (
+            update(table)
+            .where(
+                table.c.id == bindparam("b_id"),
+                # Skip rows whose text changed or that got a label in the meantime
+                table.c.blob_hash == bindparam("b_hash"),
+                table.c.label_title.is_(None),
+                table.c.label_company.is_(None),
+            )
+            .values(
+                label_title=bindparam("b_title"),
+                label_company=bindparam("b_company"),
+                # The vector held only body terms while the labels were NULL
+                search_vector=table.c.search_vector.op("||")(
+                    label_vector(bindparam("b_title"), bindparam("b_company"))
+                ),
+            )
+        )
+        set_ids_by_row = [row.pop("b_set_id") for row in batch]
+        set_ids = set(set_ids_by_row)
+        try:
+            async with async_session_factory() as db:
+                await db.execute(stmt, batch)
+                # Labels appear in the rendered prompt block
+                await db.execute(
+                    update(JDSet)
+                    .where(JDSet.id.in_(set_ids))
+                    .values(
+                        content_version=JDSet.content_version + 1, version=JDSet.version + 1
+                    )
+                )
+                await db.commit()
+        except (Exception, asyncio.CancelledError) as e:
+            for row, set_id in zip(batch, set_ids_by_row, strict=True):
+                row["b_set_id"] = set_id
+            # Ahead of newer results so the next flush writes them first
+            self._results = batch + self._results
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._flush_failures += 1
+            logger.warning("writing %d labels failed; will retry", len(batch), exc_info=True)
+            return
+        self._flush_failures = 0
+        for set_id in set_ids:
+            await detail_cache.invalidate(set_id)
+
+
+label_queue = LabelQueue(
+    workers=settings.label_queue_workers,
+    max_retries=settings.label_queue_max_retries,
+    backoff_seconds=settings.label_queue_backoff_seconds,
+    flush_size=settings.label_queue_flush_size,
+    flush_interval=settings.label_queue_flush_interval,
+    provider=settings.label_queue_provider,
+    negative_ttl=settings.label_queue_negative_ttl_seconds,
+    drain_timeout=settings.label_queue_drain_seconds,
+)
@@ -1,10 +1,14 @@
 import json
+import logging
 from typing import AsyncIterator
 
 from anthropic import AsyncAnthropic
 
 from app.config import settings
 from app.services.llm.base import LLMProvider, PromptParts
+from app.services.llm.telemetry import CallTimer, Usage
+
+logger = logging.getLogger(__name__)
 
 
 class AnthropicProvider(LLMProvider):
@@ -27,6 +31,9 @@ class AnthropicProvider(LLMProvider):
                 "cache_control": {"type": "ephemeral"},  # Breakpoint 2
             },
         ]
+        if prompt_parts.jd_trailer:
+            # Volatile workspace state goes after the breakpoint, uncached
+            system_blocks.append({"type": "text", "text": prompt_parts.jd_trailer})
 
         messages = []
         history = prompt_parts.history
@@ -47,34 +54,62 @@ class AnthropicProvider(LLMProvider):
         # Ensure messages alternate roles (Anthropic requires this)
         messages = self._ensure_alternating_roles(messages)
 
-        async with self.client.messages.stream(
-            model=self.chat_model,
-            max_tokens=4096,
-            system=system_blocks,
-            messages=messages,
-        ) as stream:
-            async for text in stream.text_stream:
-                yield text
+        with CallTimer("anthropic", self.chat_model, "chat") as timer:
+            async with self.client.messages.stream(
+                model=self.chat_model,
+                max_tokens=4096,
+                system=system_blocks,
+                messages=messages,
+            ) as stream:
+                timer.connected()
+                async for text in stream.text_stream:
+                    timer.token()
+                    yield text
+                usage = (await stream.get_final_message()).usage
+            timer.usage(
+                Usage(
+                    input_tokens=usage.input_tokens,
+                    output_tokens=usage.output_tokens,
+                    cache_read_tokens=usage.cache_read_input_tokens,
+                    cache_creation_tokens=usage.cache_creation_input_tokens,
+                )
+            )
+
+        logger.info(
+            "anthropic chat usage model=%s input=%s output=%s cache_read=%s cache_creation=%s",
+            self.chat_model,
+            usage.input_tokens,
+            usage.output_tokens,
+            usage.cache_read_input_tokens,
+            usage.cache_creation_input_tokens,
+        )
 
     async def extract_label(self, jd_text: str) -> dict[str, str | None]:
         truncated = jd_text[:3000]
 
-        response = await self.client.messages.create(
-            model=self.label_model,
-            max_tokens=100,
-            messages=[
-                {
-                    "role": "user",
-                    "content": (
-                        "Extract the job title and company name from the following "
-                        "job description. Return ONLY valid JSON: "
-                        '{\"title\": \"...\", \"company\": \"...\"}. '
-                        "If not found, use null for that field.\n\n"
-                        f"{truncated}"
-                    ),
-                }
-            ],
-        )
+        with CallTimer("anthropic", self.label_model, "label") as timer:
+            response = await self.client.messages.create(
+                model=self.label_model,
+                max_tokens=100,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": (
+                            "Extract the job title and company name from the following "
+                            "job description. Return ONLY valid JSON: "
+                            '{\"title\": \"...\", \"company\": \"...\"}. '
+                            "If not found, use null for that field.\n\n"
+                            f"{truncated}"
+                        ),
+                    }
+                ],
+            )
+            timer.usage(
+                Usage(
+                    input_tokens=response.usage.input_tokens,
+                    output_tokens=response.usage.output_tokens,
+                )
+            )
 
         content = response.content[0].text
         try:
@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+
+from app.config import settings
+from app.services.llm.base import LLMProvider, PromptParts
+
+logger = logging.getLogger(__name__)
+
+# TTFT samples kept per provider for the rolling percentile estimates
+TTFT_WINDOW = 50
+MIN_SAMPLES = 5
+# Weight of the newest outcome in the exponentially-decayed error rate
+ERROR_DECAY = 0.2
+# Tokens a provider stream may run ahead of the consumer
+STREAM_BUFFER = 64
+
+
+class _End:
+    """Queued after the last token of a stream."""
+
+
+# What a stream task hands the consumer: a token, the error it failed with, or the end
+_Item = str | Exception | _End
+
+
+def composite_model(models: dict[str, str]) -> str:
+    """Model id of the auto provider, built from each provider's model."""
+    return "+".join(f"{name}:{model}" for name, model in models.items())
+
+
+def _status_code(error: Exception) -> int | None:
+    return getattr(error, "status_code", None) or getattr(
+        getattr(error, "response", None), "status_code", None
+    )
+
+
+class ProviderHealth:
+    """Rolling TTFT and error-rate estimate for one provider."""
+
+    def __init__(self):
+        self.ttft: deque[float] = deque(maxlen=TTFT_WINDOW)
+        self.error_rate = 0.0
+        self.cooldown_until = 0.0
+
+    def record_success(self, ttft: float | None = None) -> None:
+        if ttft is not None:
+            self.ttft.append(ttft)
+        self.error_rate *= 1 - ERROR_DECAY
+
+    def record_slow(self, elapsed: float) -> None:
+        """A hedged call that lost the race; its TTFT was at least `elapsed`."""
+        self.ttft.append(elapsed)
+
+    def record_error(self, error: Exception) -> None:
+        self.error_rate = self.error_rate * (1 - ERROR_DECAY) + ERROR_DECAY
+        status = _status_code(error)
+        if status is None or status == 429 or status >= 500:
+            self.cooldown_until = time.monotonic() + settings.llm_error_cooldown_seconds
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    def percentile(self, pct: float) -> float | None:
+        if len(self.ttft) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self.ttft)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+    def score(self) -> float:
+        """Expected TTFT inflated by the error rate; lower is better."""
+        p50 = self.percentile(0.5)
+        if p50 is None:
+            p50 = settings.llm_hedge_default_delay_ms / 1000
+        return p50 * (1 + 4 * self.error_rate)
+
+    def hedge_delay(self) -> float:
+        p95 = self.percentile(0.95)
+        if p95 is None:
+            return settings.llm_hedge_default_delay_ms / 1000
+        return max(settings.llm_hedge_min_delay_ms / 1000, p95)
+
+    def snapshot(self) -> dict[str, float | bool | None]:
+        return {
+            "ttft_p50": self.percentile(0.5),
+            "ttft_p95": self.percentile(0.95),
+            "error_rate": self.error_rate,
+            "healthy": self.healthy,
+        }
+
+
+async def _pump(stream: AsyncIterator[str], queue: asyncio.Queue[_Item]) -> None:
+    """Drain one provider stream into `queue`. The stream is only ever advanced,
+    closed and cancelled from this task."""
+    try:
+        async for token in stream:
+            await queue.put(token)
+    except Exception as e:  # noqa: BLE001 - handed to the consumer, which re-raises it
+        await queue.put(e)
+    else:
+        await queue.put(_End())
+
+
+class _Attempt:
+    """One provider call in flight: the task streaming it and the consumer's
+    pending read of its next item."""
+
+    def __init__(self, name: str, stream: AsyncIterator[str]):
+        self.name = name
+        self.started = time.monotonic()
+        self.queue: asyncio.Queue[_Item] = asyncio.Queue(maxsize=STREAM_BUFFER)
+        self.task = asyncio.create_task(_pump(stream, self.queue))
+        self.next: asyncio.Task[_Item] = asyncio.create_task(self.queue.get())
+
+    async def cancel(self) -> None:
+        self.next.cancel()
+        self.task.cancel()
+        await asyncio.gather(self.next, self.task, return_exceptions=True)
+
+
+class AutoProvider(LLMProvider):
+    """Routes each call to the fastest healthy provider.
+
+    Chat streams are hedged: if the chosen provider has not produced a first
+    token within its p95 TTFT, the runner-up is started as well and whichever
+    yields first wins; the other call is cancelled.
+    """
+
+    def __init__(self, providers: dict[str, LLMProvider]):
+        self.providers = providers
+        self.health = {name: ProviderHealth() for name in providers}
+        self.chat_model = composite_model({n: p.chat_model for n, p in providers.items()})
+        self.label_model = composite_model({n: p.label_model for n, p in providers.items()})
+
+    def ranked(self) -> list[str]:
+        return sorted(
+            self.providers,
+            key=lambda name: (not self.health[name].healthy, self.health[name].score()),
+        )
+
+    async def stream_chat(self, prompt_parts: PromptParts) -> AsyncIterator[str]:
+        ranked = self.ranked()
+        attempts: list[_Attempt] = []
+
+        def launch(name: str) -> None:
+            attempts.append(_Attempt(name, self.providers[name].stream_chat(prompt_parts)))
+
+        launch(ranked[0])
+        backups = ranked[1:]
+        winner: _Attempt | None = None
+        first: _Item = _End()
+        last_error: Exception | None = None
+        try:
+            while attempts and winner is None:
+                can_hedge = settings.llm_hedge_enabled and backups and len(attempts) == 1
+                timeout = self.health[attempts[0].name].hedge_delay() if can_hedge else None
+                done, _ = await asyncio.wait(
+                    [a.next for a in attempts], timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    logger.info("hedging %s with %s", attempts[0].name, backups[0])
+                    launch(backups.pop(0))
+                    continue
+
+                for attempt in [a for a in attempts if a.next in done]:
+                    attempts.remove(attempt)
+                    item = attempt.next.result()
+                    if isinstance(item, Exception):
+                        self.health[attempt.name].record_error(item)
+                        last_error = item
+                        await attempt.cancel()
+                        # Fail over straight away if nothing else is in flight
+                        if not attempts and backups:
+                            launch(backups.pop(0))
+                        continue
+                    self.health[attempt.name].record_success(time.monotonic() - attempt.started)
+                    winner, first = attempt, item
+                    break
+        finally:
+            for attempt in attempts:
+                if winner is not None:
+                    self.health[attempt.name].record_slow(time.monotonic() - attempt.started)
+                await attempt.cancel()
+
+        if winner is None:
+            raise last_error or RuntimeError("No LLM provider available")
+
+        try:
+            item = first
+            while not isinstance(item, _End):
+                if isinstance(item, Exception):
+                    self.health[winner.name].record_error(item)
+                    raise item
+                yield item
+                item = await winner.queue.get()
+        finally:
+            await winner.cancel()
+
+    async def extract_label(self, jd_text: str) -> dict[str, str | None]:
+        last_error: Exception | None = None
+        for name in self.ranked():
+            try:
+                label = await self.providers[name].extract_label(jd_text)
+            except Exception as e:  # noqa: BLE001 - re-raised once every provider failed
+                self.health[name].record_error(e)
+                last_error = e
+                continue
+            self.health[name].record_success()
+            return label
+        raise last_error or RuntimeError("No LLM provider available")
+
+    def health_snapshot(self) -> dict[str, dict]:
+        return {name: health.snapshot() for name, health in self.health.items()}
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
-from typing import AsyncIterator
 
 from app.schemas.chat import ChatMessage, JDInput
 
@@ -11,11 +11,19 @@ class PromptParts:
     jd_block: str
     history: list[ChatMessage]
     user_message: str
+    # Volatile workspace state kept out of the cached jd_block (stable layout only)
+    jd_trailer: str = ""
+    jd_tokens_saved: int = 0
 
 
 class LLMProvider(ABC):
+    # Model used for stream_chat; part of the response cache key
+    chat_model: str
+    # Model used for extract_label; part of the label cache key
+    label_model: str
+
     @abstractmethod
-    async def stream_chat(self, prompt_parts: PromptParts) -> AsyncIterator[str]:
+    def stream_chat(self, prompt_parts: PromptParts) -> AsyncIterator[str]:
         """Yield tokens as they are generated."""
         ...
 
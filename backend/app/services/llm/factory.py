@@ -1,6 +1,8 @@
+from app.services.llm.auto_provider import AutoProvider
 from app.services.llm.base import LLMProvider
 from app.services.llm.openai_provider import OpenAIProvider
 from app.services.llm.anthropic_provider import AnthropicProvider
+from app.services.llm.scheduler import ScheduledProvider, get_scheduler
 
 _providers: dict[str, LLMProvider] = {}
 
@@ -8,9 +10,13 @@ _providers: dict[str, LLMProvider] = {}
 def get_provider(name: str = "openai") -> LLMProvider:
     if name not in _providers:
         if name == "openai":
-            _providers[name] = OpenAIProvider()
+            _providers[name] = ScheduledProvider(OpenAIProvider(), get_scheduler(name))
         elif name == "anthropic":
-            _providers[name] = AnthropicProvider()
+            _providers[name] = ScheduledProvider(AnthropicProvider(), get_scheduler(name))
+        elif name == "auto":
+            _providers[name] = AutoProvider(
+                {"openai": get_provider("openai"), "anthropic": get_provider("anthropic")}
+            )
         else:
             raise ValueError(f"Unknown provider: {name}")
     return _providers[name]
@@ -0,0 +1,40 @@
+import uuid
+from collections import OrderedDict
+
+from app.config import settings
+from app.services.llm.prompt_builder import RenderedJDBlock
+
+# (jd set id, content version, render settings)
+CacheKey = tuple[uuid.UUID, int, str]
+
+
+class JDBlockCache:
+    """Rendered JD blocks per workspace content version.
+
+    Entries never go stale: any change to a workspace's items bumps its
+    content_version, so old keys simply stop being asked for and age out.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[CacheKey, RenderedJDBlock] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: CacheKey) -> RenderedJDBlock | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key: CacheKey, rendered: RenderedJDBlock) -> None:
+        self._entries[key] = rendered
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+jd_block_cache = JDBlockCache(settings.jd_block_cache_size)
@@ -0,0 +1,171 @@
+import hashlib
+import re
+from dataclasses import dataclass
+
+from app.services.llm.tokens import count_tokens
+
+MIN_PARAGRAPH_WORDS = 12
+MIN_SENTENCE_WORDS = 8
+
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_BULLET_RE = re.compile(r"^(?:[-*•·]|\d+[.)])\s+")
+
+# "reasonable accommodation" is only boilerplate next to hiring-process words;
+# alone it can be part of a real benefits sentence
+_ACCOMMODATION = r"reasonable accommodations?"
+_HIRING_CONTEXT = r"(?:appl(?:y|icant|ication)|interview|hiring|recruit|disabilit)"
+
+# Known boilerplate classes that carry no signal for comparing roles; matched
+# per sentence, so only the sentences that say it are removed
+BOILERPLATE_CLASSES: dict[str, re.Pattern] = {
+    "equal opportunity statement": re.compile(
+        r"equal (?:employment )?opportunity|without regard to (?:race|age|sex|religion)"
+        r"|affirmative action employer|e-verify|protected veteran status"
+        rf"|{_ACCOMMODATION}[^.!?]*{_HIRING_CONTEXT}|{_HIRING_CONTEXT}[^.!?]*{_ACCOMMODATION}",
+        re.IGNORECASE,
+    ),
+    "privacy notice": re.compile(
+        r"applicant privacy (?:notice|policy)|by submitting (?:your|this) application"
+        r"|we (?:will )?process your personal data",
+        re.IGNORECASE,
+    ),
+}
+
+# A paragraph as lines of sentences, so it can be put back together as written
+Paragraph = list[list[str]]
+
+
+@dataclass
+class DedupResult:
+    texts: list[str]
+    shared_sections: list[str]
+    tokens_saved: int
+
+
+def _words(text: str) -> list[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def _fingerprint(text: str) -> str:
+    return hashlib.sha1(" ".join(_words(text)).encode("utf-8")).hexdigest()
+
+
+def _boilerplate_class(sentence: str) -> str | None:
+    for name, pattern in BOILERPLATE_CLASSES.items():
+        if pattern.search(sentence):
+            return name
+    return None
+
+
+def _parse(text: str) -> list[Paragraph]:
+    return [
+        [_SENTENCE_SPLIT_RE.split(line.strip()) for line in p.strip().split("\n") if line.strip()]
+        for p in _PARAGRAPH_SPLIT_RE.split(text.strip())
+        if p.strip()
+    ]
+
+
+def _render(paragraph: Paragraph) -> str:
+    return "\n".join(" ".join(sentences) for sentences in paragraph)
+
+
+def _strip_boilerplate(paragraphs: list[Paragraph], markers: bool) -> list[Paragraph]:
+    """Remove boilerplate sentences. With `markers`, the first removal of each
+    class in the JD leaves a one-line note in its place."""
+    result: list[Paragraph] = []
+    noted: set[str] = set()
+    for paragraph in paragraphs:
+        lines: Paragraph = []
+        notes: list[str] = []
+        for sentences in paragraph:
+            kept = []
+            for sentence in sentences:
+                boilerplate = _boilerplate_class(sentence)
+                if boilerplate is None:
+                    kept.append(sentence)
+                elif markers and boilerplate not in noted:
+                    noted.add(boilerplate)
+                    notes.append(f"[{boilerplate} omitted]")
+            if kept:
+                lines.append(kept)
+        if lines:
+            result.append(lines)
+        result.extend([[note]] for note in notes)
+    return result
+
+
+def dedupe_jd_texts(texts: list[str], mode: str) -> DedupResult:
+    """Collapse boilerplate and text repeated across JDs.
+
+    Sentences of a known boilerplate class are removed: "shared" leaves a
+    one-line marker per class, "drop" leaves nothing. In both modes, paragraphs
+    and sentences that repeat (modulo case and punctuation) in two or more JDs
+    move into numbered shared sections, and every JD that had them keeps a
+    reference in place, so no JD loses a requirement that another JD shares.
+    """
+    if mode not in ("shared", "drop") or not texts:
+        return DedupResult(texts=list(texts), shared_sections=[], tokens_saved=0)
+
+    jds = [_strip_boilerplate(_parse(text), markers=mode == "shared") for text in texts]
+
+    # Which JDs each long-enough paragraph and sentence appears in
+    paragraph_jds: dict[str, set[int]] = {}
+    for jd_idx, paragraphs in enumerate(jds):
+        for paragraph in paragraphs:
+            rendered = _render(paragraph)
+            if len(_words(rendered)) >= MIN_PARAGRAPH_WORDS:
+                paragraph_jds.setdefault(_fingerprint(rendered), set()).add(jd_idx)
+
+    def shared_paragraph(paragraph: Paragraph) -> str | None:
+        fp = _fingerprint(_render(paragraph))
+        return fp if len(paragraph_jds.get(fp, ())) > 1 else None
+
+    sentence_jds: dict[str, set[int]] = {}
+    for jd_idx, paragraphs in enumerate(jds):
+        for paragraph in paragraphs:
+            if shared_paragraph(paragraph):
+                continue
+            for sentences in paragraph:
+                for sentence in sentences:
+                    if len(_words(sentence)) >= MIN_SENTENCE_WORDS:
+                        sentence_jds.setdefault(_fingerprint(sentence), set()).add(jd_idx)
+
+    sections: list[str] = []
+    section_numbers: dict[str, int] = {}
+
+    def reference(fp: str, text: str) -> int:
+        if fp not in section_numbers:
+            section_numbers[fp] = len(sections) + 1
+            sections.append(f"[S{section_numbers[fp]}] {text}")
+        return section_numbers[fp]
+
+    new_texts: list[str] = []
+    for paragraphs in jds:
+        out: list[str] = []
+        for paragraph in paragraphs:
+            if fp := shared_paragraph(paragraph):
+                out.append(f"[See shared section S{reference(fp, _render(paragraph))}]")
+                continue
+            lines = []
+            for sentences in paragraph:
+                kept = []
+                for sentence in sentences:
+                    fp = _fingerprint(sentence)
+                    if len(sentence_jds.get(fp, ())) > 1:
+                        bullet = _BULLET_RE.match(sentence)
+                        prefix = bullet.group() if bullet else ""
+                        number = reference(fp, sentence[len(prefix) :])
+                        kept.append(f"{prefix}[See S{number}]")
+                    else:
+                        kept.append(sentence)
+                lines.append(" ".join(kept))
+            out.append("\n".join(lines))
+        new_texts.append("\n\n".join(out))
+
+    before = sum(count_tokens(text) for text in texts)
+    after = sum(count_tokens(text) for text in new_texts) + sum(count_tokens(s) for s in sections)
+    return DedupResult(
+        texts=new_texts, shared_sections=sections, tokens_saved=max(0, before - after)
+    )
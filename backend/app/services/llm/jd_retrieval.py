@@ -0,0 +1,292 @@
+import hashlib
+import math
+import re
+import uuid
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+from app.config import settings
+from app.schemas.chat import ChatRequest, JDInput
+from app.services.jd_similarity import STOP_WORDS, TOKEN_RE
+from app.services.llm.tokens import count_tokens
+from app.services.metrics import registry, stats_samples
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Heading text -> section kind; first match wins
+SECTION_KINDS = [
+    (kind, re.compile(pattern, re.IGNORECASE))
+    for kind, pattern in (
+        ("about", r"^about (?!you)|who we are|our company|our mission"),
+        ("benefits", r"benefit|perk|what we offer|compensation|salary|\bpay\b|why join"),
+        (
+            "requirements",
+            (
+                r"requirement|qualification|you('|’)?ll need|looking for|who you are|you have"
+                r"|skills|experience|must have|nice to have|bonus|preferred"
+            ),
+        ),
+        (
+            "responsibilities",
+            r"responsibilit|you('|’)?ll do|you will do|you will|the role|your role|day to day",
+        ),
+        ("about", r"about|company|mission|our team"),
+    )
+]
+_BULLET_RE = re.compile(r"^\s*(?:[-*•·]|\d+[.)])\s")
+MAX_HEADING_WORDS = 8
+
+
+@dataclass(frozen=True)
+class Chunk:
+    kind: str  # header, about, responsibilities, requirements, benefits, other
+    heading: str
+    text: str
+
+
+@dataclass(frozen=True)
+class ItemChunks:
+    """An item's chunks with the term counts BM25 needs; depends only on the text."""
+
+    chunks: tuple[Chunk, ...]
+    counts: tuple[Counter, ...]
+    lengths: tuple[int, ...]
+
+
+def _heading(line: str) -> str | None:
+    """The heading text if the line looks like a section heading."""
+    text = line.strip().lstrip("#").strip().rstrip(":").strip()
+    if not text or _BULLET_RE.match(line) or len(text.split()) > MAX_HEADING_WORDS:
+        return None
+    if line.rstrip().endswith(":") or line.lstrip().startswith("#"):
+        return text
+    if not text.endswith((".", ",", ";")) and any(p.search(text) for _, p in SECTION_KINDS):
+        return text
+    return None
+
+
+def _kind(heading: str) -> str:
+    for kind, pattern in SECTION_KINDS:
+        if pattern.search(heading):
+            return kind
+    return "other"
+
+
+def split_chunks(text: str, max_tokens: int) -> list[Chunk]:
+    """Split a JD into sections at headings, and long sections into chunks of at
+    most ~max_tokens on line boundaries. Text before the first heading (title,
+    company, location) becomes the "header" chunk."""
+    sections: list[tuple[str, str, list[str]]] = [("header", "", [])]
+    for line in text.split("\n"):
+        heading = _heading(line)
+        if heading is not None:
+            sections.append((_kind(heading), heading, []))
+        elif line.strip():
+            sections[-1][2].append(line.rstrip())
+
+    chunks: list[Chunk] = []
+    for kind, heading, lines in sections:
+        current: list[str] = []
+        used = 0
+        for line in lines:
+            cost = count_tokens(line)
+            if current and used + cost > max_tokens:
+                chunks.append(Chunk(kind, heading, "\n".join(current)))
+                current, used = [], 0
+            current.append(line)
+            used += cost
+        if current:
+            chunks.append(Chunk(kind, heading, "\n".join(current)))
+    return chunks
+
+
+def _stem(token: str) -> str:
+    """Plural and -ing/-ed stripping, enough for "requirements" to meet "requirement"."""
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(token) > len(suffix) + 3 and token.endswith(suffix) and not token.endswith("ss"):
+            return token[: -len(suffix)]
+    return token
+
+
+def terms(text: str) -> list[str]:
+    return [
+        _stem(t) for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOP_WORDS
+    ]
+
+
+def index_item(text: str, max_tokens: int) -> ItemChunks:
+    chunks = split_chunks(text, max_tokens)
+    counts = []
+    lengths = []
+    for chunk in chunks:
+        chunk_terms = terms(f"{chunk.heading}\n{chunk.text}")
+        counts.append(Counter(chunk_terms))
+        lengths.append(len(chunk_terms))
+    return ItemChunks(tuple(chunks), tuple(counts), tuple(lengths))
+
+
+class WorkspaceIndex:
+    """BM25 corpus statistics over every chunk of a workspace's items.
+
+    sync() diffs the workspace's text hashes against the last call and only
+    adds or removes the contributions of items that changed.
+    """
+
+    def __init__(self):
+        self.items: Counter[str] = Counter()  # text hash -> copies in the workspace
+        self.df: Counter[str] = Counter()
+        self.chunks = 0
+        self.total_length = 0
+
+    def _apply(self, item: ItemChunks, sign: int) -> None:
+        for counts, length in zip(item.counts, item.lengths, strict=True):
+            for term in counts:
+                self.df[term] += sign
+            self.chunks += sign
+            self.total_length += sign * length
+
+    def sync(self, items: dict[str, ItemChunks], hashes: list[str]) -> None:
+        wanted = Counter(hashes)
+        for text_hash, copies in (wanted - self.items).items():
+            for _ in range(copies):
+                self._apply(items[text_hash], 1)
+        for text_hash, copies in (self.items - wanted).items():
+            for _ in range(copies):
+                self._apply(items[text_hash], -1)
+        self.items = wanted
+        self.df = +self.df  # drop terms no chunk has any more
+
+    def scores(self, query: list[str], item: ItemChunks) -> list[float]:
+        if not self.chunks:
+            return [0.0] * len(item.chunks)
+        avg_length = self.total_length / self.chunks or 1.0
+        idf = {
+            term: math.log(1 + (self.chunks - self.df[term] + 0.5) / (self.df[term] + 0.5))
+            for term in set(query)
+            if self.df[term]
+        }
+        result = []
+        for counts, length in zip(item.counts, item.lengths, strict=True):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+            score = 0.0
+            for term, weight in idf.items():
+                tf = counts.get(term)
+                if tf:
+                    score += weight * tf * (BM25_K1 + 1) / (tf + norm)
+            result.append(score)
+        return result
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class RetrievalIndex:
+    """Chunked items cached by text hash, and per-workspace BM25 statistics kept
+    in step with them, so edits re-chunk only the items that changed."""
+
+    def __init__(self, max_items: int, max_workspaces: int):
+        self.max_items = max_items
+        self.max_workspaces = max_workspaces
+        self._items: OrderedDict[str, ItemChunks] = OrderedDict()
+        self._workspaces: OrderedDict[uuid.UUID | str, WorkspaceIndex] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _item(self, text_hash: str, text: str) -> ItemChunks:
+        item = self._items.get(text_hash)
+        if item is not None:
+            self._items.move_to_end(text_hash)
+            self.hits += 1
+            return item
+        self.misses += 1
+        item = index_item(text, settings.jd_retrieval_chunk_tokens)
+        self._items[text_hash] = item
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+        return item
+
+    def workspace(
+        self, key: uuid.UUID | str, texts: list[str]
+    ) -> tuple[WorkspaceIndex, list[ItemChunks]]:
+        hashes = [_text_hash(text) for text in texts]
+        items = [self._item(h, text) for h, text in zip(hashes, texts, strict=True)]
+        by_hash = dict(zip(hashes, items, strict=True))
+        index = self._workspaces.get(key)
+        if index is None or any(h not in self._items for h in index.items):
+            # New, or an item it counted was evicted: rebuild from scratch
+            index = WorkspaceIndex()
+        else:
+            by_hash.update({h: self._items[h] for h in index.items})
+        index.sync(by_hash, hashes)
+        self._workspaces[key] = index
+        self._workspaces.move_to_end(key)
+        while len(self._workspaces) > self.max_workspaces:
+            self._workspaces.popitem(last=False)
+        return index, items
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "items": len(self._items),
+            "workspaces": len(self._workspaces),
+        }
+
+
+@dataclass
+class Retrieved:
+    chunks: list[Chunk]  # document order
+    total: int
+    omitted_tokens: int
+
+
+def retrieve(
+    jd_cards: list[JDInput], query: str, key: uuid.UUID | str | None, per_jd: int
+) -> list[Retrieved]:
+    """The per_jd chunks of each JD that best match the query, by BM25 over all
+    the workspace's chunks. A JD nothing matches keeps its first chunk."""
+    texts = [jd.text.strip() for jd in jd_cards]
+    key = key or "inline:" + _text_hash("\0".join(_text_hash(t) for t in texts))
+    index, items = retrieval_index.workspace(key, texts)
+    query_terms = terms(query)
+
+    results = []
+    for item in items:
+        scores = index.scores(query_terms, item)
+        ranked = sorted(
+            (i for i in range(len(scores)) if scores[i] > 0), key=lambda i: -scores[i]
+        )[:per_jd]
+        keep = sorted(ranked) or [0][: len(item.chunks)]
+        results.append(
+            Retrieved(
+                chunks=[item.chunks[i] for i in keep],
+                total=len(item.chunks),
+                omitted_tokens=sum(
+                    count_tokens(c.text) for i, c in enumerate(item.chunks) if i not in keep
+                ),
+            )
+        )
+    return results
+
+
+def retrieval_query(request: ChatRequest) -> str:
+    """The latest question plus the user's few before it, so a follow-up like
+    "and the salary there?" still retrieves what the thread is about."""
+    count = settings.jd_retrieval_history_messages
+    earlier = [msg.content for msg in request.messages if msg.role == "user"]
+    return "\n".join([*(earlier[-count:] if count > 0 else []), request.user_message])
+
+
+def use_retrieval(jd_count: int) -> bool:
+    mode = settings.jd_retrieval_mode
+    return mode == "always" or (mode == "auto" and jd_count >= settings.jd_retrieval_min_jds)
+
+
+retrieval_index = RetrievalIndex(
+    settings.jd_retrieval_cache_items, settings.jd_retrieval_cache_workspaces
+)
+registry.collector(lambda: stats_samples("jd_retrieval_index", retrieval_index.stats()))
@@ -1,10 +1,14 @@
 import json
+import logging
 from typing import AsyncIterator
 
 from openai import AsyncOpenAI
 
 from app.config import settings
 from app.services.llm.base import LLMProvider, PromptParts
+from app.services.llm.telemetry import CallTimer, Usage
+
+logger = logging.getLogger(__name__)
 
 
 class OpenAIProvider(LLMProvider):
@@ -18,6 +22,9 @@ class OpenAIProvider(LLMProvider):
         system_content = (
             prompt_parts.system_instructions + "\n\n" + prompt_parts.jd_block
         )
+        if prompt_parts.jd_trailer:
+            # Volatile workspace state after the cacheable prefix
+            system_content += "\n\n" + prompt_parts.jd_trailer
 
         messages = [{"role": "system", "content": system_content}]
 
@@ -26,36 +33,70 @@ class OpenAIProvider(LLMProvider):
 
         messages.append({"role": "user", "content": prompt_parts.user_message})
 
-        stream = await self.client.chat.completions.create(
-            model=self.chat_model,
-            messages=messages,
-            stream=True,
-            max_tokens=4096,
-        )
+        with CallTimer("openai", self.chat_model, "chat") as timer:
+            stream = await self.client.chat.completions.create(
+                model=self.chat_model,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True},
+                max_tokens=4096,
+            )
+            timer.connected()
 
-        async for chunk in stream:
-            if chunk.choices and chunk.choices[0].delta.content:
-                yield chunk.choices[0].delta.content
+            usage = None
+            async for chunk in stream:
+                if chunk.usage:
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    timer.token()
+                    yield chunk.choices[0].delta.content
+
+            if usage:
+                details = usage.prompt_tokens_details
+                cached = details.cached_tokens if details else 0
+                timer.usage(
+                    Usage(
+                        input_tokens=usage.prompt_tokens,
+                        output_tokens=usage.completion_tokens,
+                        cache_read_tokens=cached,
+                    )
+                )
+                logger.info(
+                    "openai chat usage model=%s input=%s output=%s cached=%s",
+                    self.chat_model,
+                    usage.prompt_tokens,
+                    usage.completion_tokens,
+                    cached,
+                )
 
     async def extract_label(self, jd_text: str) -> dict[str, str | None]:
         truncated = jd_text[:3000]
 
-        response = await self.client.chat.completions.create(
-            model=self.label_model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "Extract the job title and company name from the following "
-                        "job description. Return JSON: {\"title\": \"...\", \"company\": \"...\"}. "
-                        "If not found, use null for that field."
-                    ),
-                },
-                {"role": "user", "content": truncated},
-            ],
-            response_format={"type": "json_object"},
-            max_tokens=100,
-        )
+        with CallTimer("openai", self.label_model, "label") as timer:
+            response = await self.client.chat.completions.create(
+                model=self.label_model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": (
+                            "Extract the job title and company name from the following "
+                            "job description. "
+                            "Return JSON: {\"title\": \"...\", \"company\": \"...\"}. "
+                            "If not found, use null for that field."
+                        ),
+                    },
+                    {"role": "user", "content": truncated},
+                ],
+                response_format={"type": "json_object"},
+                max_tokens=100,
+            )
+            if response.usage:
+                timer.usage(
+                    Usage(
+                        input_tokens=response.usage.prompt_tokens,
+                        output_tokens=response.usage.completion_tokens,
+                    )
+                )
 
         content = response.choices[0].message.content
         try:
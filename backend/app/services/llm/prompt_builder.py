@@ -1,5 +1,16 @@
-from app.schemas.chat import ChatRequest, JDInput
+import hashlib
+import re
+import uuid
+from collections import OrderedDict
+from typing import NamedTuple
+
+from app.config import settings
+from app.schemas.chat import ChatMessage, ChatRequest, JDInput
 from app.services.llm.base import PromptParts
+from app.services.llm.jd_dedup import dedupe_jd_texts
+from app.services.llm.jd_retrieval import retrieval_query, retrieve, use_retrieval
+from app.services.llm.tokens import count_tokens
+from app.services.requirements import requirement_extractor
 
 SYSTEM_INSTRUCTIONS = """You are JD-Compare AI, an expert career advisor that helps candidates compare and analyze multiple job descriptions side by side.
 
@@ -21,43 +32,248 @@ OUTPUT FORMAT:
 
 MAX_HISTORY_MESSAGES = 15
 
+RETRIEVAL_NOTE = (
+    "NOTE: This workspace is large, so each JD below is shown only as the sections most "
+    "relevant to the recent questions, not in full. If something is not in an excerpt, say "
+    "it was not among the excerpts shown rather than that the JD lacks it."
+)
+
+SUMMARY_HEADER = "[Summary of earlier conversation]"
+SUMMARY_LINE_CHARS = 200
+SUMMARY_CACHE_SIZE = 256
+
+_FIRST_SENTENCE_RE = re.compile(r"^(.+?[.!?])(?:\s|$)", re.DOTALL)
+_summary_cache: OrderedDict[str, str] = OrderedDict()
+
+
+class RenderedJDBlock(NamedTuple):
+    block: str
+    trailer: str
+    tokens_saved: int
+
+
+def _jd_label(jd: JDInput, fallback: str) -> str:
+    label = jd.label_title or fallback
+    if jd.label_company:
+        label = f"{label} @ {jd.label_company}"
+    return label
+
+
+def _jd_ref(jd: JDInput) -> str:
+    """Short content hash that names a JD independently of its position."""
+    return hashlib.sha256(jd.text.strip().encode("utf-8")).hexdigest()[:8]
+
+
+def _build_jd_block(
+    jd_cards: list[JDInput],
+    dedup_mode: str = "off",
+    layout: str = "ordered",
+    requirements: bool = False,
+) -> RenderedJDBlock:
+    """Render the JD block.
 
-def _build_jd_block(jd_cards: list[JDInput]) -> str:
+    The "ordered" layout numbers JDs in display order with their status inline.
+    The "stable" layout emits bodies in content-hash order and moves everything
+    that changes on mute/reorder into a small trailer, so the block itself stays
+    byte-identical for provider prompt caching. With `requirements`, each JD
+    starts with a one-line summary of its locally extracted requirements.
+    """
     if not jd_cards:
-        return "=== NO JOB DESCRIPTIONS PROVIDED ==="
+        return RenderedJDBlock("=== NO JOB DESCRIPTIONS PROVIDED ===", "", 0)
+
+    stable = layout == "stable"
+    refs = [_jd_ref(jd) for jd in jd_cards]
+    order = sorted(range(len(jd_cards)), key=lambda i: refs[i]) if stable else range(len(jd_cards))
+    cards = [jd_cards[i] for i in order]
+    dedup = dedupe_jd_texts([jd.text for jd in cards], dedup_mode)
 
     lines = ["=== JOB DESCRIPTIONS ===\n"]
-    active_count = 0
-    muted_count = 0
+    if dedup.shared_sections:
+        lines.append("--- SHARED SECTIONS (referenced by the JDs below) ---")
+        lines.extend(dedup.shared_sections)
+        lines.append("")
+
+    for i, (jd, text) in enumerate(zip(cards, dedup.texts, strict=True), start=1):
+        if stable:
+            ref = _jd_ref(jd)
+            lines.append(f"--- JD {ref}: {_jd_label(jd, 'Untitled')} ---")
+        else:
+            status = "MUTED" if jd.is_muted else "ACTIVE"
+            lines.append(f"--- JOB {i}: {_jd_label(jd, f'Job {i}')} [{status}] ---")
+        if requirements and (
+            summary := requirement_extractor.summary(requirement_extractor.extract(jd.text))
+        ):
+            lines.append(summary)
+        lines.append(text.strip())
+        lines.append("")
 
-    for i, jd in enumerate(jd_cards, start=1):
-        label = jd.label_title or f"Job {i}"
-        if jd.label_company:
-            label = f"{label} @ {jd.label_company}"
+    lines.append("=== END JOB DESCRIPTIONS ===")
+    muted_count = sum(1 for jd in jd_cards if jd.is_muted)
+    counts = f"Total Active JDs: {len(jd_cards) - muted_count} | Muted JDs: {muted_count}"
 
+    if not stable:
+        lines.append(counts)
+        return RenderedJDBlock("\n".join(lines), "", dedup.tokens_saved)
+
+    trailer = ["=== CURRENT WORKSPACE STATE (display order) ==="]
+    for i, (jd, ref) in enumerate(zip(jd_cards, refs, strict=True), start=1):
         status = "MUTED" if jd.is_muted else "ACTIVE"
-        if jd.is_muted:
-            muted_count += 1
-        else:
-            active_count += 1
+        trailer.append(f"{i}. JD {ref}: {_jd_label(jd, 'Untitled')} [{status}]")
+    trailer.append(counts)
+    return RenderedJDBlock("\n".join(lines), "\n".join(trailer), dedup.tokens_saved)
+
+
+def _build_retrieved_jd_block(
+    jd_cards: list[JDInput], query: str, key: uuid.UUID | None = None, requirements: bool = False
+) -> RenderedJDBlock:
+    """Render each JD as its label header plus only the sections most relevant to
+    the query. `key` names the workspace whose retrieval index to reuse."""
+    if not jd_cards:
+        return RenderedJDBlock("=== NO JOB DESCRIPTIONS PROVIDED ===", "", 0)
 
-        lines.append(f"--- JOB {i}: {label} [{status}] ---")
-        lines.append(jd.text.strip())
+    retrieved = retrieve(jd_cards, query, key, settings.jd_retrieval_chunks_per_jd)
+    lines = [
+        "=== JOB DESCRIPTIONS (EXCERPTS) ===",
+        RETRIEVAL_NOTE,
+        "",
+    ]
+    for i, (jd, result) in enumerate(zip(jd_cards, retrieved, strict=True), start=1):
+        status = "MUTED" if jd.is_muted else "ACTIVE"
+        lines.append(
+            f"--- JOB {i}: {_jd_label(jd, f'Job {i}')} [{status}] "
+            f"({len(result.chunks)} of {result.total} sections) ---"
+        )
+        if requirements and (
+            summary := requirement_extractor.summary(requirement_extractor.extract(jd.text))
+        ):
+            lines.append(summary)
+        for chunk in result.chunks:
+            if chunk.heading:
+                lines.append(f"[{chunk.heading}]")
+            lines.append(chunk.text)
         lines.append("")
 
     lines.append("=== END JOB DESCRIPTIONS ===")
-    lines.append(f"Total Active JDs: {active_count} | Muted JDs: {muted_count}")
+    muted_count = sum(1 for jd in jd_cards if jd.is_muted)
+    lines.append(f"Total Active JDs: {len(jd_cards) - muted_count} | Muted JDs: {muted_count}")
+    return RenderedJDBlock("\n".join(lines), "", sum(r.omitted_tokens for r in retrieved))
+
+
+def _message_tokens(msg: ChatMessage) -> int:
+    if msg.token_count is None:
+        msg.token_count = count_tokens(msg.content)
+    return msg.token_count
+
+
+def _history_budget(model: str | None) -> int:
+    return settings.chat_history_token_budgets.get(model or "", settings.chat_history_token_budget)
+
+
+def _summary_line(msg: ChatMessage) -> str:
+    text = " ".join(msg.content.split())
+    match = _FIRST_SENTENCE_RE.match(text)
+    line = match.group(1) if match else text
+    if len(line) > SUMMARY_LINE_CHARS:
+        line = line[: SUMMARY_LINE_CHARS - 3].rstrip() + "..."
+    speaker = "User" if msg.role == "user" else "Assistant"
+    return f"- {speaker}: {line}"
+
+
+def _summarize_history(messages: list[ChatMessage], max_tokens: int) -> str:
+    """Extractive rolling summary of older turns, cached per summarized range."""
+    digest = hashlib.sha256()
+    for msg in messages:
+        digest.update(f"{msg.role}\0{msg.content}\0".encode())
+    key = f"{digest.hexdigest()}:{max_tokens}"
+
+    summary = _summary_cache.get(key)
+    if summary is not None:
+        _summary_cache.move_to_end(key)
+        return summary
+
+    # Keep the most recent lines that fit the summary budget
+    lines: list[str] = []
+    used = count_tokens(SUMMARY_HEADER)
+    for msg in reversed(messages):
+        line = _summary_line(msg)
+        cost = count_tokens(line)
+        if used + cost > max_tokens:
+            break
+        lines.append(line)
+        used += cost
+    omitted = len(messages) - len(lines)
+    if omitted:
+        lines.append(f"- ({omitted} earlier messages omitted)")
+    summary = "\n".join([SUMMARY_HEADER, *reversed(lines)])
 
-    return "\n".join(lines)
+    _summary_cache[key] = summary
+    while len(_summary_cache) > SUMMARY_CACHE_SIZE:
+        _summary_cache.popitem(last=False)
+    return summary
+
+
+def _select_history(messages: list[ChatMessage], model: str | None) -> list[ChatMessage]:
+    """Keep the newest messages that fit the model's token budget and fold the rest
+    into a single summary message."""
+    budget = _history_budget(model)
+    total = sum(_message_tokens(msg) for msg in messages)
+    if total <= budget:
+        return list(messages)
+
+    summary_budget = min(settings.chat_history_summary_tokens, budget // 4)
+    remaining = budget - summary_budget
+    kept: list[ChatMessage] = []
+    for msg in reversed(messages):
+        cost = _message_tokens(msg)
+        if cost > remaining:
+            break
+        kept.append(msg)
+        remaining -= cost
+    kept.reverse()
+
+    older = messages[: len(messages) - len(kept)]
+    summary = _summarize_history(older, summary_budget)
+    return [ChatMessage(role="user", content=summary, token_count=count_tokens(summary)), *kept]
+
+
+def render_jd_block(
+    jd_cards: list[JDInput], query: str | None = None, key: uuid.UUID | None = None
+) -> RenderedJDBlock:
+    """Render the JD block with the configured preprocessing and layout. Given a
+    retrieval query, large workspaces get only the passages relevant to it."""
+    if query is not None and use_retrieval(len(jd_cards)):
+        return _build_retrieved_jd_block(
+            jd_cards, query, key, settings.jd_requirements_summary
+        )
+    return _build_jd_block(
+        jd_cards, settings.jd_dedup_mode, settings.jd_block_layout, settings.jd_requirements_summary
+    )
+
+
+def jd_block_render_key() -> str:
+    """Identifies the settings that affect render_jd_block output."""
+    return (
+        f"dedup={settings.jd_dedup_mode};layout={settings.jd_block_layout};"
+        f"requirements={settings.jd_requirements_summary}"
+    )
 
 
-def build_prompt_parts(request: ChatRequest) -> PromptParts:
-    jd_block = _build_jd_block(request.jd_cards)
-    history = request.messages[-MAX_HISTORY_MESSAGES:]
+def build_prompt_parts(
+    request: ChatRequest,
+    model: str | None = None,
+    rendered_jd_block: RenderedJDBlock | None = None,
+) -> PromptParts:
+    rendered = rendered_jd_block or render_jd_block(request.jd_cards, retrieval_query(request))
+    if settings.chat_history_mode == "tokens":
+        history = _select_history(request.messages, model)
+    else:
+        history = request.messages[-MAX_HISTORY_MESSAGES:]
 
     return PromptParts(
         system_instructions=SYSTEM_INSTRUCTIONS,
-        jd_block=jd_block,
+        jd_block=rendered.block,
+        jd_trailer=rendered.trailer,
         history=history,
         user_message=request.user_message,
+        jd_tokens_saved=rendered.tokens_saved,
     )
@@ -0,0 +1,85 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+
+from app.config import settings
+from app.services.llm.base import PromptParts
+from app.services.metrics import registry, stats_samples
+
+
+def prompt_cache_key(prompt_parts: PromptParts, provider: str, model: str) -> str:
+    """Hash everything that determines a completion: provider, model and the full prompt."""
+    digest = hashlib.sha256()
+    fields = [
+        provider,
+        model,
+        prompt_parts.system_instructions,
+        prompt_parts.jd_block,
+        prompt_parts.jd_trailer,
+    ]
+    for msg in prompt_parts.history:
+        fields.extend((msg.role, msg.content))
+    fields.append(prompt_parts.user_message)
+    for value in fields:
+        digest.update(value.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """Exact-match cache of completed chat responses, stored as their token sequence."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, tuple[str, ...]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> tuple[str, ...] | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] < time.monotonic():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, tokens: list[str]) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, tuple(tokens))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "max_size": self.max_entries,
+        }
+
+
+async def replay_tokens(tokens: tuple[str, ...], delay_ms: float = 0) -> AsyncIterator[str]:
+    """Yield cached tokens like a live stream, optionally paced."""
+    for token in tokens:
+        if delay_ms:
+            await asyncio.sleep(delay_ms / 1000)
+        yield token
+
+
+response_cache = ResponseCache(settings.chat_cache_size, settings.chat_cache_ttl_seconds)
+registry.collector(lambda: stats_samples("chat_response_cache", response_cache.stats()))
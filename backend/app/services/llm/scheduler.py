@@ -0,0 +1,318 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+
+from app.config import settings
+from app.services.llm.base import LLMProvider, PromptParts
+from app.services.llm.telemetry import queue_wait_seconds
+from app.services.llm.tokens import count_tokens
+from app.services.metrics import Sample, registry
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class OverloadedError(Exception):
+    """Raised instead of queueing a request past its wait budget."""
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"{provider} is overloaded, retry in {retry_after:.0f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Refills continuously at per_minute / 60 per second up to per_minute.
+    A limit of 0 disables the bucket."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay_for(self, amount: float, now: float) -> float:
+        if self.capacity <= 0:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        if self.capacity > 0:
+            self.level -= min(amount, self.capacity)
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    tokens: int = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+@dataclass
+class _WaitStats:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+
+class AdmissionScheduler:
+    """Per-provider admission control.
+
+    Requests are admitted against requests/min and tokens/min buckets. When the
+    buckets are empty they queue in strict priority order, each priority with a
+    bounded wait; a full queue or an exhausted wait fails fast with
+    OverloadedError. A 429 pauses admission for the provider's retry-after.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_queue_depth: int,
+        max_wait: dict[Priority, float],
+    ):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_queue_depth = max_queue_depth
+        self.max_wait = max_wait
+        self.paused_until = 0.0
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self.wait_stats = {priority: _WaitStats() for priority in Priority}
+        self.admitted = 0
+        self.rejected = 0
+        self.throttled = 0
+
+    def _delay(self, tokens: int, now: float) -> float:
+        return max(
+            self.paused_until - now,
+            self.requests.delay_for(1, now),
+            self.tokens.delay_for(tokens, now),
+        )
+
+    def _admit(self, tokens: int) -> None:
+        self.requests.take(1)
+        self.tokens.take(tokens)
+        self.admitted += 1
+
+    def _pending(self) -> list[_Waiter]:
+        return [w for w in self._waiters if not w.future.done()]
+
+    def _dispatch(self) -> None:
+        self._timer = None
+        while self._waiters:
+            head = self._waiters[0]
+            if head.future.done():
+                heapq.heappop(self._waiters)
+                continue
+            delay = self._delay(head.tokens, time.monotonic())
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self._admit(head.tokens)
+            head.future.set_result(None)
+
+    async def acquire(self, priority: Priority, tokens: int) -> float:
+        """Wait for admission; returns the time spent queued in seconds."""
+        start = time.monotonic()
+        if not self._pending() and self._delay(tokens, start) <= 0:
+            self._admit(tokens)
+            self._record_wait(priority, 0.0)
+            return 0.0
+
+        if len(self._pending()) >= self.max_queue_depth:
+            self.rejected += 1
+            raise OverloadedError(self.name, max(1.0, self._delay(tokens, start)))
+
+        waiter = _Waiter(
+            priority, next(self._seq), tokens, asyncio.get_running_loop().create_future()
+        )
+        heapq.heappush(self._waiters, waiter)
+        if self._timer is None:
+            self._dispatch()
+
+        try:
+            async with asyncio.timeout(self.max_wait[priority]):
+                await waiter.future
+        except TimeoutError:
+            if not (waiter.future.done() and not waiter.future.cancelled()):
+                waiter.future.cancel()
+                self.rejected += 1
+                retry_after = max(1.0, self._delay(tokens, time.monotonic()))
+                raise OverloadedError(self.name, retry_after) from None
+        waited = time.monotonic() - start
+        self._record_wait(priority, waited)
+        return waited
+
+    def _record_wait(self, priority: Priority, seconds: float) -> None:
+        self.wait_stats[priority].record(seconds)
+        queue_wait_seconds.observe(seconds, provider=self.name, priority=priority.name.lower())
+
+    def throttle(self, retry_after: float) -> None:
+        """Pause admission after an upstream 429."""
+        self.throttled += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+        logger.warning("%s rate limited; pausing admission for %.1fs", self.name, retry_after)
+
+    def stats(self) -> dict:
+        pending = self._pending()
+        return {
+            "queue_depth": {
+                p.name.lower(): sum(w.priority == p for w in pending) for p in Priority
+            },
+            "wait_seconds": {
+                p.name.lower(): {
+                    "count": s.count,
+                    "avg": s.total / s.count if s.count else 0.0,
+                    "max": s.max,
+                }
+                for p, s in self.wait_stats.items()
+            },
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "throttled": self.throttled,
+            "paused_for": max(0.0, self.paused_until - time.monotonic()),
+        }
+
+
+def _retry_after(error: Exception, attempt: int) -> float | None:
+    """Seconds to back off for a 429, or None if the error isn't a rate limit."""
+    response = getattr(error, "response", None)
+    statuses = (getattr(error, "status_code", None), getattr(response, "status_code", None))
+    if 429 not in statuses:
+        return None
+    headers = getattr(response, "headers", None) or {}
+    if value := headers.get("retry-after-ms"):
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    if value := headers.get("retry-after"):
+        try:
+            return float(value)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return float(2**attempt)
+
+
+def _estimate_tokens(prompt_parts: PromptParts) -> int:
+    prompt = [
+        prompt_parts.system_instructions,
+        prompt_parts.jd_block,
+        prompt_parts.jd_trailer,
+        prompt_parts.user_message,
+    ]
+    history = sum(msg.token_count or count_tokens(msg.content) for msg in prompt_parts.history)
+    expected_output = settings.llm_expected_output_tokens
+    return sum(count_tokens(part) for part in prompt) + history + expected_output
+
+
+class ScheduledProvider(LLMProvider):
+    """Runs a provider's calls through its AdmissionScheduler: chat as interactive,
+    label extraction as background. 429s before the first token are retried after
+    the provider's retry-after."""
+
+    def __init__(self, inner: LLMProvider, scheduler: AdmissionScheduler):
+        self.inner = inner
+        self.scheduler = scheduler
+        self.chat_model = inner.chat_model
+        self.label_model = inner.label_model
+
+    async def stream_chat(self, prompt_parts: PromptParts) -> AsyncIterator[str]:
+        tokens = _estimate_tokens(prompt_parts)
+        for attempt in range(settings.llm_rate_limit_retries + 1):
+            await self.scheduler.acquire(Priority.INTERACTIVE, tokens)
+            started = False
+            try:
+                async for token in self.inner.stream_chat(prompt_parts):
+                    started = True
+                    yield token
+                return
+            except Exception as e:
+                retry_after = _retry_after(e, attempt)
+                if retry_after is None or started:
+                    raise
+                self.scheduler.throttle(retry_after)
+                if attempt == settings.llm_rate_limit_retries:
+                    raise OverloadedError(self.scheduler.name, retry_after) from e
+
+    async def extract_label(self, jd_text: str) -> dict[str, str | None]:
+        tokens = count_tokens(jd_text[:3000]) + 100
+        for attempt in range(settings.llm_rate_limit_retries + 1):
+            await self.scheduler.acquire(Priority.BACKGROUND, tokens)
+            try:
+                return await self.inner.extract_label(jd_text)
+            except Exception as e:
+                retry_after = _retry_after(e, attempt)
+                if retry_after is None:
+                    raise
+                self.scheduler.throttle(retry_after)
+                if attempt == settings.llm_rate_limit_retries:
+                    raise OverloadedError(self.scheduler.name, retry_after) from e
+        raise AssertionError("unreachable")
+
+
+_schedulers: dict[str, AdmissionScheduler] = {}
+
+
+def get_scheduler(name: str) -> AdmissionScheduler:
+    if name not in _schedulers:
+        _schedulers[name] = AdmissionScheduler(
+            name,
+            requests_per_minute=getattr(settings, f"{name}_requests_per_minute"),
+            tokens_per_minute=getattr(settings, f"{name}_tokens_per_minute"),
+            max_queue_depth=settings.llm_max_queue_depth,
+            max_wait={
+                Priority.INTERACTIVE: settings.llm_interactive_max_wait_seconds,
+                Priority.BACKGROUND: settings.llm_background_max_wait_seconds,
+            },
+        )
+    return _schedulers[name]
+
+
+def scheduler_stats() -> dict[str, dict]:
+    return {name: scheduler.stats() for name, scheduler in _schedulers.items()}
+
+
+def _scheduler_samples() -> list[Sample]:
+    samples: list[Sample] = []
+    for name, scheduler in _schedulers.items():
+        stats = scheduler.stats()
+        for priority, depth in stats["queue_depth"].items():
+            labels = {"provider": name, "priority": priority}
+            samples.append(("llm_scheduler_queue_depth", labels, depth))
+        for field_name in ("admitted", "rejected", "throttled", "paused_for"):
+            samples.append((f"llm_scheduler_{field_name}", {"provider": name}, stats[field_name]))
+    return samples
+
+
+registry.collector(_scheduler_samples)
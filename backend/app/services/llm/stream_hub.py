@@ -0,0 +1,97 @@
+import asyncio
+from collections.abc import AsyncIterator, Callable
+
+from app.services.metrics import registry, stats_samples
+
+
+class _Broadcast:
+    """Tokens of one upstream stream, replayable from the start by any subscriber."""
+
+    def __init__(self):
+        self.tokens: list[str] = []
+        self.done = False
+        self.error: Exception | None = None
+        self.subscribers = 0
+        self.task: asyncio.Task | None = None
+        self._changed = asyncio.Event()
+
+    def notify(self) -> None:
+        # Wake everyone waiting now; later waiters get a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self) -> None:
+        await self._changed.wait()
+
+
+class StreamHub:
+    """Shares one upstream LLM stream between identical concurrent requests.
+
+    The first subscriber for a key starts the upstream call; later subscribers
+    get the tokens produced so far and then follow live. The upstream call is
+    cancelled only once every subscriber has gone away.
+    """
+
+    def __init__(self):
+        self._streams: dict[str, _Broadcast] = {}
+        self.started = 0
+        self.joined = 0
+
+    async def _pump(self, key: str, broadcast: _Broadcast, upstream: AsyncIterator[str]) -> None:
+        try:
+            async for token in upstream:
+                broadcast.tokens.append(token)
+                broadcast.notify()
+        except Exception as e:  # noqa: BLE001 - re-raised in every subscriber
+            broadcast.error = e
+        finally:
+            broadcast.done = True
+            broadcast.notify()
+            # Finished streams aren't joinable; completed answers live in the response cache
+            if self._streams.get(key) is broadcast:
+                del self._streams[key]
+
+    async def subscribe(
+        self, key: str, start: Callable[[], AsyncIterator[str]]
+    ) -> AsyncIterator[str]:
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            broadcast = _Broadcast()
+            self._streams[key] = broadcast
+            broadcast.task = asyncio.create_task(self._pump(key, broadcast, start()))
+            self.started += 1
+        else:
+            self.joined += 1
+
+        broadcast.subscribers += 1
+        index = 0
+        try:
+            while True:
+                if index < len(broadcast.tokens):
+                    index += 1
+                    yield broadcast.tokens[index - 1]
+                elif broadcast.done:
+                    if broadcast.error is not None:
+                        raise broadcast.error
+                    return
+                else:
+                    await broadcast.wait()
+        finally:
+            broadcast.subscribers -= 1
+            if broadcast.subscribers == 0 and not broadcast.done:
+                if self._streams.get(key) is broadcast:
+                    del self._streams[key]
+                if broadcast.task is not None:
+                    broadcast.task.cancel()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "active_streams": len(self._streams),
+            "subscribers": sum(b.subscribers for b in self._streams.values()),
+            "started": self.started,
+            "joined": self.joined,
+        }
+
+
+stream_hub = StreamHub()
+registry.collector(lambda: stats_samples("chat_stream_hub", stream_hub.stats()))
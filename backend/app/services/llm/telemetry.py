@@ -0,0 +1,116 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Self
+
+from app.services.metrics import RATE_BUCKETS, TOKEN_BUCKETS, registry
+
+LLM_LABELS = ("provider", "model", "operation")
+
+queue_wait_seconds = registry.histogram(
+    "llm_queue_wait_seconds",
+    "Time a call waited for admission by the provider scheduler",
+    ("provider", "priority"),
+)
+connect_seconds = registry.histogram(
+    "llm_connect_seconds", "Time until the provider accepted the request", LLM_LABELS
+)
+ttft_seconds = registry.histogram(
+    "llm_time_to_first_token_seconds", "Time from request to first streamed token", LLM_LABELS
+)
+inter_token_seconds = registry.histogram(
+    "llm_inter_token_seconds",
+    "Gap between consecutive streamed chunks",
+    LLM_LABELS,
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+duration_seconds = registry.histogram(
+    "llm_request_duration_seconds", "Total provider call duration", LLM_LABELS + ("outcome",)
+)
+output_tokens_per_second = registry.histogram(
+    "llm_output_tokens_per_second",
+    "Output tokens per second after the first token",
+    LLM_LABELS,
+    buckets=RATE_BUCKETS,
+)
+tokens = registry.histogram(
+    "llm_tokens",
+    "Tokens per call by kind: input, output, cache_read, cache_creation",
+    LLM_LABELS + ("kind",),
+    buckets=TOKEN_BUCKETS,
+)
+chat_ttft_seconds = registry.histogram(
+    "chat_time_to_first_token_seconds",
+    "Time from chat request to the first token sent to the client",
+    ("provider", "source"),
+)
+chat_duration_seconds = registry.histogram(
+    "chat_stream_duration_seconds",
+    "Duration of a chat stream as seen by the client",
+    ("provider", "source", "outcome"),
+)
+
+
+@dataclass
+class Usage:
+    """Token usage reported by the provider for one call."""
+
+    input_tokens: int | None = None
+    output_tokens: int | None = None
+    cache_read_tokens: int | None = None
+    cache_creation_tokens: int | None = None
+
+
+# Usage of the provider call serving the current chat request. The record is
+# mutable so tasks spawned for the stream (which copy the context) fill it in.
+current_usage: ContextVar[Usage | None] = ContextVar("current_usage", default=None)
+
+
+class CallTimer:
+    """Times one provider call. Providers call `connected()` once the request is
+    accepted, `token()` per streamed chunk and `usage()` when usage arrives."""
+
+    def __init__(self, provider: str, model: str, operation: str):
+        self.labels = {"provider": provider, "model": model, "operation": operation}
+        self.start = time.perf_counter()
+        self.first_token: float | None = None
+        self.last_token: float | None = None
+        self.reported: Usage | None = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def connected(self) -> None:
+        connect_seconds.observe(time.perf_counter() - self.start, **self.labels)
+
+    def token(self) -> None:
+        now = time.perf_counter()
+        if self.last_token is None:
+            self.first_token = now
+            ttft_seconds.observe(now - self.start, **self.labels)
+        else:
+            inter_token_seconds.observe(now - self.last_token, **self.labels)
+        self.last_token = now
+
+    def usage(self, usage: Usage) -> None:
+        self.reported = usage
+        for kind in ("input", "output", "cache_read", "cache_creation"):
+            value = getattr(usage, f"{kind}_tokens")
+            if value is not None:
+                tokens.observe(value, kind=kind, **self.labels)
+        if self.labels["operation"] == "chat" and (request_usage := current_usage.get()):
+            vars(request_usage).update(vars(usage))
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        end = time.perf_counter()
+        if exc_type is None:
+            outcome = "ok"
+        elif issubclass(exc_type, Exception):
+            outcome = "error"
+        else:
+            # CancelledError or GeneratorExit: the client went away
+            outcome = "cancelled"
+        duration_seconds.observe(end - self.start, outcome=outcome, **self.labels)
+        output = self.reported.output_tokens if self.reported else None
+        if outcome == "ok" and output and self.first_token is not None and end > self.first_token:
+            output_tokens_per_second.observe(output / (end - self.first_token), **self.labels)
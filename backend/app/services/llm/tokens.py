@@ -0,0 +1,11 @@
+import re
+from functools import lru_cache
+
+# Rough BPE stand-in: words split into <=4 char pieces, punctuation on its own.
+# Close enough to tiktoken/Claude counts for budgeting, with no dependency.
+_TOKEN_RE = re.compile(r"\w{1,4}|[^\w\s]")
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    return len(_TOKEN_RE.findall(text))
@@ -0,0 +1,311 @@
+import hashlib
+import json
+import logging
+import re
+import time
+import uuid
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.jd_item import JDItem
+from app.models.jd_item_requirements import JDItemRequirements
+from app.services.aho_corasick import Automaton
+from app.services.jd_blobs import blob_store
+
+logger = logging.getLogger(__name__)
+
+# Skill taxonomy: {category: {name: [aliases]}}. Aliases match case-insensitively
+# on word boundaries; "=Alias" matches case-sensitively. The name itself is
+# matched too, case-sensitively if listed as "=Name" and not at all if "-Name".
+TAXONOMY_PATH = Path(__file__).with_name("skill_taxonomy.json")
+# Bump when the rules below change so stored extractions are recomputed
+RULES_VERSION = 1
+
+# Words, keeping "c++", "c#", ".net", "node.js" and "r&d" whole; "/" and "-" split
+TOKEN_RE = re.compile(r"\.?[A-Za-z0-9][A-Za-z0-9+#&]*(?:\.[A-Za-z0-9+#&]+)*")
+
+# Checked against the title lines, most senior first
+SENIORITY_PATTERNS = [
+    (level, re.compile(pattern, re.IGNORECASE))
+    for level, pattern in (
+        ("director", r"\b(?:director|head of|vp|vice president)\b"),
+        ("manager", r"\bmanager\b"),
+        ("principal", r"\bprincipal\b"),
+        ("staff", r"\bstaff\b"),
+        ("lead", r"\blead\b"),
+        ("senior", r"\b(?:senior|sr)\b"),
+        ("mid", r"\b(?:mid[- ]?level|intermediate)\b"),
+        ("junior", r"\b(?:junior|jr|entry[- ]level|graduate|new grad)\b"),
+        ("intern", r"\b(?:intern|internship)\b"),
+    )
+]
+TITLE_LINES = 2
+
+YEARS_RE = re.compile(
+    r"(?<![\d.])(\d{1,2})\s*(?:\+|plus)?\s*(?:(?:-|–|to)\s*(\d{1,2})\s*\+?\s*)?(?:years?|yrs?)\b",
+    re.IGNORECASE,
+)
+# How far from a year count the word "experience" may be
+YEARS_CONTEXT_CHARS = 60
+
+_AMOUNT = r"(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s?([kK])?"
+SALARY_RE = re.compile(
+    rf"([$£€])\s?{_AMOUNT}\s*(?:-|–|—|to)\s*[$£€]?\s?{_AMOUNT}"
+    r"(?:\s*(USD|CAD|AUD|NZD|SGD|EUR|GBP|CHF))?"
+)
+CURRENCY_SYMBOLS = {"$": "USD", "£": "GBP", "€": "EUR"}
+# Bounds for a plausible annual salary; rules out hourly rates and funding rounds
+SALARY_RANGE = (10_000, 5_000_000)
+
+SUMMARY_MAX_SKILLS = 15
+
+
+@dataclass(frozen=True)
+class Skill:
+    id: str
+    name: str
+    category: str
+
+
+@dataclass
+class Requirements:
+    skills: list[str] = field(default_factory=list)  # skill ids, first mention first
+    seniority: str | None = None
+    years_min: int | None = None
+    years_max: int | None = None
+    salary_min: int | None = None
+    salary_max: int | None = None
+    salary_currency: str | None = None
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text)
+
+
+def _seniority(text: str) -> str | None:
+    title = "\n".join([line for line in text.split("\n", 8) if line.strip()][:TITLE_LINES])
+    for level, pattern in SENIORITY_PATTERNS:
+        if pattern.search(title):
+            return level
+    return None
+
+
+def _years(text: str) -> tuple[int | None, int | None]:
+    """Strictest stated minimum, and the upper end of any range."""
+    lowest: int | None = None
+    highest: int | None = None
+    lower = text.lower()
+    for match in YEARS_RE.finditer(text):
+        start, end = match.span()
+        context = lower[max(0, start - YEARS_CONTEXT_CHARS) : end + YEARS_CONTEXT_CHARS]
+        if "experience" not in context:
+            continue
+        lo = int(match.group(1))
+        hi = int(match.group(2)) if match.group(2) else None
+        if lo > 30 or (hi is not None and not lo <= hi <= 40):
+            continue
+        lowest = lo if lowest is None else max(lowest, lo)
+        if hi is not None:
+            highest = hi if highest is None else max(highest, hi)
+    return lowest, highest
+
+
+def _amount(digits: str, k: str | None, scale_k: bool) -> float:
+    value = float(digits.replace(",", ""))
+    return value * 1000 if k or scale_k else value
+
+
+def _salary(text: str) -> tuple[int | None, int | None, str | None]:
+    for match in SALARY_RE.finditer(text):
+        symbol, lo, lo_k, hi, hi_k, code = match.groups()
+        low_value = float(lo.replace(",", ""))
+        # "$150-180k": the suffix applies to both ends
+        low = _amount(lo, lo_k, scale_k=bool(hi_k) and low_value < 1000)
+        high = _amount(hi, hi_k, scale_k=False)
+        if SALARY_RANGE[0] <= low <= high <= SALARY_RANGE[1]:
+            return int(low), int(high), code or CURRENCY_SYMBOLS[symbol]
+    return None, None, None
+
+
+class RequirementExtractor:
+    """Skill taxonomy compiled into one word-level Aho-Corasick automaton, plus
+    regexes for seniority, years of experience and salary ranges.
+
+    Built once per process and shared; extraction is pure and thread-safe.
+    """
+
+    def __init__(self, taxonomy: dict[str, dict[str, list[str]]], version: str):
+        self.version = version
+        self.skills: dict[str, Skill] = {}
+        self.automaton: Automaton[tuple[str, tuple[str, ...] | None]] = Automaton()
+        for category, entries in taxonomy.items():
+            for name, aliases in entries.items():
+                skill = Skill(id=name.lower(), name=name, category=category)
+                self.skills[skill.id] = skill
+                if f"={name}" not in aliases and f"-{name}" not in aliases:
+                    aliases = [name, *aliases]
+                for alias in aliases:
+                    if alias.startswith("-"):
+                        continue
+                    exact = alias.startswith("=")
+                    tokens = tokenize(alias.lstrip("="))
+                    self.automaton.add(
+                        [t.lower() for t in tokens],
+                        (skill.id, tuple(tokens) if exact else None),
+                    )
+        self.automaton.build()
+
+    @classmethod
+    def load(cls, path: Path = TAXONOMY_PATH) -> "RequirementExtractor":
+        data = path.read_bytes()
+        digest = hashlib.sha256(data + f"rules={RULES_VERSION}".encode()).hexdigest()
+        return cls(json.loads(data), digest[:16])
+
+    def find_skills(self, text: str) -> list[str]:
+        tokens = tokenize(text)
+        found: list[tuple[int, int, str]] = []
+        for start, end, (skill_id, exact) in self.automaton.find([t.lower() for t in tokens]):
+            if exact is None or tuple(tokens[start:end]) == exact:
+                found.append((start, end, skill_id))
+        # Leftmost-longest: "Spring Boot" wins over the "Spring" inside it
+        found.sort(key=lambda m: (m[0], m[0] - m[1]))
+        skills: dict[str, None] = {}
+        covered = 0
+        for start, end, skill_id in found:
+            if start >= covered:
+                skills.setdefault(skill_id)
+                covered = end
+        return list(skills)
+
+    def extract(self, text: str) -> Requirements:
+        years_min, years_max = _years(text)
+        salary_min, salary_max, currency = _salary(text)
+        return Requirements(
+            skills=self.find_skills(text),
+            seniority=_seniority(text),
+            years_min=years_min,
+            years_max=years_max,
+            salary_min=salary_min,
+            salary_max=salary_max,
+            salary_currency=currency,
+        )
+
+    def summary(self, req: Requirements) -> str:
+        """One compact line for the prompt, e.g.
+        "Extracted: senior | 5+ yrs | USD 150,000-180,000 | Skills: Go, PostgreSQL"."""
+        parts: list[str] = []
+        if req.seniority:
+            parts.append(req.seniority)
+        if req.years_min is not None:
+            years = f"{req.years_min}-{req.years_max}" if req.years_max else f"{req.years_min}+"
+            parts.append(f"{years} yrs")
+        if req.salary_min is not None:
+            parts.append(f"{req.salary_currency} {req.salary_min:,}-{req.salary_max:,}")
+        if req.skills:
+            shown = req.skills[:SUMMARY_MAX_SKILLS]
+            names = [self.skills[s].name for s in shown if s in self.skills]
+            parts.append("Skills: " + ", ".join(names))
+        return "Extracted: " + " | ".join(parts) if parts else ""
+
+
+def _to_requirements(row: JDItemRequirements) -> Requirements:
+    return Requirements(
+        skills=list(row.skills),
+        seniority=row.seniority,
+        years_min=row.years_min,
+        years_max=row.years_max,
+        salary_min=row.salary_min,
+        salary_max=row.salary_max,
+        salary_currency=row.salary_currency,
+    )
+
+
+async def store_requirements(
+    db: AsyncSession, items: Iterable[tuple[uuid.UUID, str]]
+) -> dict[uuid.UUID, Requirements]:
+    """Extract and upsert requirements for (item id, text) pairs in one statement.
+    The caller commits."""
+    extracted = {item_id: requirement_extractor.extract(text) for item_id, text in items}
+    if not extracted:
+        return extracted
+    stmt = insert(JDItemRequirements).values(
+        [
+            {
+                "item_id": item_id,
+                "extractor_version": requirement_extractor.version,
+                **asdict(req),
+            }
+            for item_id, req in extracted.items()
+        ]
+    )
+    columns = [c.name for c in JDItemRequirements.__table__.columns if c.name != "item_id"]
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[JDItemRequirements.item_id],
+            set_={column: stmt.excluded[column] for column in columns},
+        )
+    )
+    return extracted
+
+
+async def workspace_requirements(db: AsyncSession, jd_set_id: uuid.UUID) -> list[tuple]:
+    """(item row, Requirements) per item in display order. Items never extracted,
+    or extracted by an older taxonomy, are extracted now and stored."""
+    rows = (
+        await db.execute(
+            select(
+                JDItem.id,
+                JDItem.label_title,
+                JDItem.label_company,
+                JDItem.is_muted,
+                JDItem.blob_hash,
+                JDItem.raw_text,
+                JDItemRequirements,
+            )
+            .outerjoin(JDItemRequirements, JDItemRequirements.item_id == JDItem.id)
+            .where(JDItem.jd_set_id == jd_set_id)
+            .order_by(JDItem.sort_order)
+        )
+    ).all()
+
+    stale = [
+        row
+        for row in rows
+        if row.JDItemRequirements is None
+        or row.JDItemRequirements.extractor_version != requirement_extractor.version
+    ]
+    fresh: dict[uuid.UUID, Requirements] = {}
+    if stale:
+        texts = await blob_store.get_many(db, [row.blob_hash for row in stale if row.blob_hash])
+        fresh = await store_requirements(
+            db,
+            [
+                (row.id, texts.get(row.blob_hash, "") if row.blob_hash else row.raw_text or "")
+                for row in stale
+            ],
+        )
+        await db.commit()
+    return [
+        (row, fresh[row.id] if row.id in fresh else _to_requirements(row.JDItemRequirements))
+        for row in rows
+    ]
+
+
+def _load() -> RequirementExtractor:
+    start = time.perf_counter()
+    extractor = RequirementExtractor.load()
+    logger.info(
+        "skill taxonomy: %d skills, %d automaton states, built in %.0f ms",
+        len(extractor.skills),
+        extractor.automaton.states,
+        (time.perf_counter() - start) * 1e3,
+    )
+    return extractor
+
+
+requirement_extractor = _load()
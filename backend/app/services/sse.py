@@ -0,0 +1,87 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+import orjson
+
+_TOKEN_PREFIX = 'data: {"token": '
+_FRAME_SUFFIX = "}\n\n"
+
+
+def token_frame(token: str) -> str:
+    """SSE frame for a token, built from a fixed template instead of a dict."""
+    return _TOKEN_PREFIX + orjson.dumps(token).decode() + _FRAME_SUFFIX
+
+
+def event_frame(payload: dict) -> str:
+    return "data: " + orjson.dumps(payload).decode() + "\n\n"
+
+
+async def coalesce_tokens(
+    tokens: AsyncIterator[str], flush_bytes: int, flush_interval_ms: float
+) -> AsyncIterator[str]:
+    """Merge small provider deltas into larger chunks.
+
+    A chunk is emitted once it reaches flush_bytes or once flush_interval_ms has
+    passed since its first token arrived, whichever comes first. With both
+    limits at 0 tokens pass through unchanged.
+    """
+    if flush_bytes <= 0 and flush_interval_ms <= 0:
+        async for token in tokens:
+            yield token
+        return
+
+    loop = asyncio.get_running_loop()
+    interval = flush_interval_ms / 1000 if flush_interval_ms > 0 else None
+    buffer: list[str] = []
+    size = 0
+    first_at = 0.0
+    finished = False
+    error: Exception | None = None
+    # Set when a chunk starts, fills up, or the stream ends; the consumer only
+    # wakes for those, not for every token
+    wake = asyncio.Event()
+
+    async def pump() -> None:
+        nonlocal size, first_at, finished, error
+        try:
+            async for token in tokens:
+                if not buffer:
+                    first_at = loop.time()
+                    wake.set()
+                buffer.append(token)
+                size += len(token.encode("utf-8"))
+                if flush_bytes > 0 and size >= flush_bytes:
+                    wake.set()
+        except Exception as e:  # noqa: BLE001 - re-raised in the consumer below
+            error = e
+        finished = True
+        wake.set()
+
+    pump_task = asyncio.create_task(pump())
+    try:
+        while True:
+            await wake.wait()
+            wake.clear()
+            full = flush_bytes > 0 and size >= flush_bytes
+            if buffer and not full and not finished:
+                try:
+                    if interval is None:
+                        await wake.wait()
+                    else:
+                        async with asyncio.timeout_at(first_at + interval):
+                            await wake.wait()
+                except TimeoutError:
+                    pass
+                wake.clear()
+
+            if buffer:
+                chunk = "".join(buffer)
+                buffer.clear()
+                size = 0
+                yield chunk
+            if finished and not buffer:
+                if error is not None:
+                    raise error
+                break
+    finally:
+        pump_task.cancel()
@@ -0,0 +1,152 @@
+"""Sync latency and statement count vs item count: the per-row ORM sync against
+the set-based upsert in PUT /jd-sets/{id}/items.
+
+Needs the Postgres database from DATABASE_URL with migrations applied. Each run
+creates a scratch workspace and deletes it afterwards.
+
+Usage (from backend/):
+    python -m benchmarks.bench_bulk_sync --sizes 10 50 200 --rounds 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from fastapi import Response
+from sqlalchemy import event, select
+
+from app.api.v1.jd_sets import bulk_sync_items
+from app.db.session import async_session_factory, engine
+from app.models.jd_item import JDItem
+from app.models.jd_set import JDSet
+from app.schemas.jd_set import BulkItemsSync, JDItemUpsert
+
+PARAGRAPH = (
+    "We are looking for an engineer to design, build and operate services on AWS. "
+    "You will own features end to end and work closely with product and design.\n\n"
+)
+
+
+class _StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args) -> None:
+        self.count += 1
+
+
+async def _legacy_sync(set_uuid: uuid.UUID, body: BulkItemsSync, db) -> list[JDItem]:
+    """The previous implementation: per-row ORM updates, deletes and refreshes."""
+    result = await db.execute(select(JDSet).where(JDSet.id == set_uuid))
+    jd_set = result.scalar_one()
+    result = await db.execute(select(JDItem).where(JDItem.jd_set_id == set_uuid))
+    existing_items = {str(item.id): item for item in result.scalars().all()}
+
+    incoming_ids: set[str] = set()
+    response_items: list[JDItem] = []
+    for idx, item_data in enumerate(body.items):
+        if item_data.id and item_data.id in existing_items:
+            item = existing_items[item_data.id]
+            item.raw_text = item_data.raw_text
+            item.label_title = item_data.label_title
+            item.label_company = item_data.label_company
+            item.is_muted = item_data.is_muted
+            item.sort_order = idx
+            incoming_ids.add(item_data.id)
+            response_items.append(item)
+        else:
+            new_item = JDItem(
+                jd_set_id=set_uuid,
+                raw_text=item_data.raw_text,
+                label_title=item_data.label_title,
+                label_company=item_data.label_company,
+                is_muted=item_data.is_muted,
+                sort_order=idx,
+            )
+            if item_data.id:
+                new_item.id = uuid.UUID(item_data.id)
+                incoming_ids.add(item_data.id)
+            db.add(new_item)
+            response_items.append(new_item)
+
+    for existing_id, item in existing_items.items():
+        if existing_id not in incoming_ids:
+            await db.delete(item)
+    jd_set.content_version = JDSet.content_version + 1
+    await db.commit()
+    for item in response_items:
+        await db.refresh(item)
+    return response_items
+
+
+def _payload(size: int, edit: int) -> BulkItemsSync:
+    """`size` cards with stable IDs; card 0 is edited on every round like an autosave."""
+    items = []
+    for i in range(size):
+        text = f"Senior Engineer #{i} at Company {i}\n\n" + PARAGRAPH * 8
+        if i == 0:
+            text += f"\n(edit {edit})"
+        items.append(
+            JDItemUpsert(
+                id=str(uuid.UUID(int=i + 1)),
+                raw_text=text,
+                label_title=f"Senior Engineer #{i}",
+                label_company=f"Company {i}",
+            )
+        )
+    return BulkItemsSync(items=items)
+
+
+async def _bench(name: str, size: int, rounds: int, counter: _StatementCounter) -> None:
+    async with async_session_factory() as db:
+        jd_set = JDSet(name=f"bench {name} {size}")
+        db.add(jd_set)
+        await db.commit()
+        set_uuid = jd_set.id
+
+    latencies: list[float] = []
+    statements: list[int] = []
+    try:
+        for round_no in range(rounds + 1):
+            body = _payload(size, round_no)
+            async with async_session_factory() as db:
+                counter.count = 0
+                start = time.perf_counter()
+                if name == "legacy":
+                    await _legacy_sync(set_uuid, body, db)
+                else:
+                    await bulk_sync_items(str(set_uuid), body, Response(), if_match=None, db=db)
+                elapsed = time.perf_counter() - start
+            # Round 0 inserts everything; the rest are steady-state autosaves
+            if round_no:
+                latencies.append(elapsed)
+                statements.append(counter.count)
+    finally:
+        async with async_session_factory() as db:
+            await db.delete(await db.get(JDSet, set_uuid))
+            await db.commit()
+
+    print(
+        f"{name:<8} items={size:>4}  p50={statistics.median(latencies) * 1e3:7.2f} ms  "
+        f"max={max(latencies) * 1e3:7.2f} ms  statements={statistics.median(statements):.0f}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    counter = _StatementCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    for size in args.sizes:
+        await _bench("legacy", size, args.rounds, counter)
+        await _bench("upsert", size, args.rounds, counter)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
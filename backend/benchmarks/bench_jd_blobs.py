@@ -0,0 +1,90 @@
+"""Space saved by content-addressed, dictionary-compressed JD storage, and the cost
+of reading it back.
+
+The dictionary is evaluated on held-out documents: it is trained on every other
+document of the corpus and measured on the rest. --train writes the shipped
+dictionary from the full corpus; the previous one is kept as a retired dictionary
+so blobs already compressed with it stay readable. Every blob written afterwards
+names the dictionary for good, so train on a representative export of real JDs
+(JSON lines with a "text" field), not the small fixture corpus.
+
+Usage (from backend/):
+    python -m benchmarks.bench_jd_blobs --copies 5
+    python -m benchmarks.bench_jd_blobs --train --corpus jds.jsonl
+"""
+
+import argparse
+import json
+import time
+import zlib
+from pathlib import Path
+
+from app.services.jd_blobs import (
+    DICTIONARY_PATH,
+    BlobCodec,
+    blob_row,
+    dictionary_id,
+    normalize_jd_text,
+    retired_dictionary_path,
+    train_dictionary,
+)
+
+CORPUS = Path(__file__).parent / "fixtures" / "jd_corpus.jsonl"
+# Fewer documents than this train a dictionary of one-off phrases
+MIN_TRAINING_DOCS = 1000
+
+
+def _load(path: Path) -> list[str]:
+    with path.open() as f:
+        return [normalize_jd_text(json.loads(line)["text"]) for line in f if line.strip()]
+
+
+def _report(docs: list[str], copies: int) -> None:
+    train, test = docs[::2], docs[1::2]
+    codec = BlobCodec(train_dictionary(train))
+    raw = sum(len(d.encode("utf-8")) for d in test)
+    plain = sum(len(zlib.compress(d.encode("utf-8"), 9)) for d in test)
+    with_dict = sum(blob_row(codec, d)["stored_size"] for d in test)
+    print(f"held-out documents: {len(test)}, {raw} bytes")
+    print(f"  zlib                {plain:>8} bytes  ({plain / raw:.1%} of raw)")
+    print(f"  zlib + dictionary   {with_dict:>8} bytes  ({with_dict / raw:.1%} of raw)")
+
+    # Every posting pasted into `copies` workspaces, as inline rows vs blobs
+    inline = raw * copies
+    print(f"\n{copies} copies of each document:")
+    print(f"  inline text         {inline:>8} bytes")
+    print(f"  jd_blobs            {with_dict:>8} bytes  ({1 - with_dict / inline:.1%} saved)")
+
+    rows = [blob_row(codec, d) for d in test]
+    start = time.perf_counter()
+    rounds = 200
+    for _ in range(rounds):
+        for row in rows:
+            codec.decompress(row["codec"], row["body"])
+    per_doc = (time.perf_counter() - start) / (rounds * len(rows))
+    print(f"\ndecompress: {per_doc * 1e6:.1f} µs per document (LRU hits skip this)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--copies", type=int, default=5)
+    parser.add_argument("--corpus", type=Path, default=CORPUS)
+    parser.add_argument("--train", action="store_true", help="rewrite the shipped dictionary")
+    args = parser.parse_args()
+
+    docs = _load(args.corpus)
+    if args.train:
+        if len(docs) < MIN_TRAINING_DOCS:
+            parser.error(f"--train needs at least {MIN_TRAINING_DOCS} documents, got {len(docs)}")
+        dictionary = train_dictionary(docs)
+        if DICTIONARY_PATH.exists():
+            current = DICTIONARY_PATH.read_bytes()
+            retired_dictionary_path(dictionary_id(current)).write_bytes(current)
+        DICTIONARY_PATH.write_bytes(dictionary)
+        print(f"wrote {len(dictionary)} byte dictionary to {DICTIONARY_PATH}")
+        return
+    _report(docs, args.copies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Full-text search latency over many stored JDs, and the plan Postgres picks.
+
+Needs the Postgres database from DATABASE_URL with migrations applied. Seeds a
+scratch workspace with --items postings built from the fixture corpus (each
+with a unique marker line so blobs don't all dedup) and deletes it afterwards.
+
+Usage (from backend/):
+    python -m benchmarks.bench_jd_search --items 100000 --rounds 20
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from pathlib import Path
+
+from sqlalchemy import delete, text
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db.session import async_session_factory, engine
+from app.models.jd_item import JDItem
+from app.models.jd_set import JDSet
+from app.services.jd_blobs import blob_store, normalize_jd_text
+from app.services.jd_search import search_items, search_vector
+
+CORPUS = Path(__file__).parent / "fixtures" / "jd_corpus.jsonl"
+QUERIES = ["kubernetes", "kubernetes on-call", '"machine learning" -intern', "python OR golang"]
+BATCH_SIZE = 1000
+
+
+def _corpus() -> list[str]:
+    with CORPUS.open() as f:
+        return [normalize_jd_text(json.loads(line)["text"]) for line in f]
+
+
+async def _seed(set_uuid: uuid.UUID, count: int) -> None:
+    docs = _corpus()
+    for start in range(0, count, BATCH_SIZE):
+        async with async_session_factory() as db:
+            texts = [
+                f"{docs[i % len(docs)]}\nReference {i}"
+                for i in range(start, min(start + BATCH_SIZE, count))
+            ]
+            hashes = await blob_store.put_many(db, texts)
+            await db.execute(
+                insert(JDItem).values(
+                    [
+                        {
+                            "jd_set_id": set_uuid,
+                            "blob_hash": blob_hash,
+                            "label_title": f"Engineer {start + n}",
+                            "sort_order": start + n,
+                            "search_vector": search_vector(f"Engineer {start + n}", None, body),
+                        }
+                        for n, (body, blob_hash) in enumerate(zip(texts, hashes, strict=True))
+                    ]
+                )
+            )
+            await db.commit()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    async with async_session_factory() as db:
+        jd_set = JDSet(name="bench search")
+        db.add(jd_set)
+        await db.commit()
+        set_uuid = jd_set.id
+
+    try:
+        start = time.perf_counter()
+        await _seed(set_uuid, args.items)
+        print(f"seeded {args.items} items in {time.perf_counter() - start:.1f} s")
+        async with async_session_factory() as db:
+            await db.execute(text("ANALYZE jd_items"))
+            for query in QUERIES:
+                latencies = []
+                for _ in range(args.rounds):
+                    start = time.perf_counter()
+                    hits, _ = await search_items(db, query, 20)
+                    latencies.append(time.perf_counter() - start)
+                print(
+                    f"{query!r:<30} hits={len(hits):>3}  "
+                    f"p50={statistics.median(latencies) * 1e3:7.2f} ms  "
+                    f"max={max(latencies) * 1e3:7.2f} ms"
+                )
+            plan = await db.execute(
+                text(
+                    "EXPLAIN SELECT id FROM jd_items WHERE search_vector @@ "
+                    "websearch_to_tsquery('english'::regconfig, 'kubernetes on-call')"
+                )
+            )
+            print("\n" + "\n".join(row[0] for row in plan))
+    finally:
+        async with async_session_factory() as db:
+            # Core delete so the FK cascade removes items without loading them
+            await db.execute(delete(JDSet).where(JDSet.id == set_uuid))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
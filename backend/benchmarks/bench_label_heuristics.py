@@ -0,0 +1,89 @@
+"""Accuracy and latency of the heuristic label extractor against the labeled corpus.
+
+Usage (from backend/):
+    python -m benchmarks.bench_label_heuristics
+    python -m benchmarks.bench_label_heuristics --llm openai   # also score the LLM path
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+
+from app.config import settings
+from app.services.label_heuristics import extract_label_heuristic
+
+CORPUS = Path(__file__).parent / "fixtures" / "labeled_jds.jsonl"
+
+
+def _norm(value: str | None) -> str:
+    return " ".join((value or "").lower().split())
+
+
+def _matches(label: dict, expected: dict) -> bool:
+    return _norm(label.get("title")) == _norm(expected["title"]) and _norm(
+        label.get("company")
+    ) == _norm(expected["company"])
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def bench_heuristic(corpus: list[dict], threshold: float, repeat: int) -> None:
+    latencies: list[float] = []
+    accepted = correct = 0
+    for doc in corpus:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            guess = extract_label_heuristic(doc["text"])
+            latencies.append(time.perf_counter() - start)
+        if guess.confidence >= threshold:
+            accepted += 1
+            correct += _matches(guess.as_label(), doc)
+
+    print(f"heuristic (threshold={threshold})")
+    print(f"  coverage      {accepted}/{len(corpus)} docs answered without the LLM")
+    print(f"  precision     {correct}/{accepted} correct when answered" if accepted else "")
+    print(f"  latency mean  {statistics.mean(latencies) * 1e6:.1f} us/doc")
+    print(f"  latency p95   {_percentile(latencies, 0.95) * 1e6:.1f} us/doc")
+
+
+async def bench_llm(corpus: list[dict], provider: str) -> None:
+    from app.services.llm.factory import get_provider
+
+    llm = get_provider(provider)
+    latencies: list[float] = []
+    correct = agree = 0
+    for doc in corpus:
+        start = time.perf_counter()
+        label = await llm.extract_label(doc["text"])
+        latencies.append(time.perf_counter() - start)
+        correct += _matches(label, doc)
+        agree += _matches(label, extract_label_heuristic(doc["text"]).as_label())
+
+    print(f"llm ({provider}, {llm.label_model})")
+    print(f"  accuracy      {correct}/{len(corpus)}")
+    print(f"  heuristic agreement {agree}/{len(corpus)}")
+    print(f"  latency mean  {statistics.mean(latencies) * 1e3:.1f} ms/doc")
+    print(f"  latency p95   {_percentile(latencies, 0.95) * 1e3:.1f} ms/doc")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threshold", type=float, default=settings.label_heuristic_threshold)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--llm", choices=["openai", "anthropic"])
+    args = parser.parse_args()
+
+    corpus = [json.loads(line) for line in CORPUS.read_text().splitlines() if line.strip()]
+    bench_heuristic(corpus, args.threshold, args.repeat)
+    if args.llm:
+        asyncio.run(bench_llm(corpus, args.llm))
+
+
+if __name__ == "__main__":
+    main()
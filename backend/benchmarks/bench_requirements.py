@@ -0,0 +1,52 @@
+"""Throughput of local requirement extraction (skill automaton plus regexes).
+
+Usage (from backend/):
+    python -m benchmarks.bench_requirements --seconds 3
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from app.services.requirements import RequirementExtractor
+
+CORPUS = Path(__file__).parent / "fixtures" / "jd_corpus.jsonl"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    with CORPUS.open() as f:
+        texts = [json.loads(line)["text"] for line in f]
+
+    start = time.perf_counter()
+    extractor = RequirementExtractor.load()
+    build = time.perf_counter() - start
+    print(
+        f"taxonomy: {len(extractor.skills)} skills, {extractor.automaton.states} states, "
+        f"built in {build * 1e3:.1f} ms"
+    )
+
+    for name, extract in (
+        ("skills only", extractor.find_skills),
+        ("full extraction", extractor.extract),
+    ):
+        done = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < args.seconds:
+            for text in texts:
+                extract(text)
+            done += len(texts)
+        elapsed = time.perf_counter() - start
+        chars = sum(len(t) for t in texts) * done / len(texts)
+        print(
+            f"{name:<16} {done / elapsed:8.0f} JDs/s  {chars / elapsed / 1e6:6.2f} MB/s  "
+            f"(single core)"
+        )
+
+
+if __name__ == "__main__":
+    main()
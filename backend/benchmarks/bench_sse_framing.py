@@ -0,0 +1,130 @@
+"""Frames, bytes and CPU per streamed response: per-token json.dumps framing vs
+coalesced template framing.
+
+Usage (from backend/):
+    python -m benchmarks.bench_sse_framing --tokens 2000 --gap-ms 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import time
+from collections.abc import AsyncIterator
+
+from app.services.sse import coalesce_tokens, event_frame, token_frame
+
+WORDS = ["the", " role", " requires", " 5+", " years", " of", " Python", ",", " and", " AWS", "."]
+
+
+def _make_tokens(count: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    return [rng.choice(WORDS) for _ in range(count)]
+
+
+async def _provider(tokens: list[str], gap_ms: float) -> AsyncIterator[str]:
+    for token in tokens:
+        await asyncio.sleep(gap_ms / 1000)
+        yield token
+
+
+class _SocketSink:
+    """Writes every frame to a real socket, one send per frame like the ASGI server."""
+
+    def __init__(self):
+        self.frames: list[str] = []
+
+    async def __aenter__(self):
+        self._loop = asyncio.get_running_loop()
+        self._writer, self._reader = socket.socketpair()
+        self._writer.setblocking(False)
+        self._reader.setblocking(False)
+        self._drain = asyncio.create_task(self._drain_reader())
+        return self
+
+    async def _drain_reader(self) -> None:
+        while await self._loop.sock_recv(self._reader, 65536):
+            pass
+
+    async def write(self, frame: str) -> None:
+        self.frames.append(frame)
+        await self._loop.sock_sendall(self._writer, frame.encode("utf-8"))
+
+    async def __aexit__(self, *exc):
+        self._writer.close()
+        await self._drain
+        self._reader.close()
+
+
+async def _legacy(tokens: list[str], gap_ms: float) -> list[str]:
+    async with _SocketSink() as sink:
+        async for token in _provider(tokens, gap_ms):
+            await sink.write(f"data: {json.dumps({'token': token})}\n\n")
+        await sink.write(f"data: {json.dumps({'done': True})}\n\n")
+    return sink.frames
+
+
+async def _coalesced(
+    tokens: list[str], gap_ms: float, flush_bytes: int, flush_interval_ms: float
+) -> list[str]:
+    async with _SocketSink() as sink:
+        chunks = coalesce_tokens(_provider(tokens, gap_ms), flush_bytes, flush_interval_ms)
+        async for chunk in chunks:
+            await sink.write(token_frame(chunk))
+        await sink.write(event_frame({"done": True}))
+    return sink.frames
+
+
+def _bench_encoding(tokens: list[str]) -> None:
+    start = time.process_time()
+    for token in tokens:
+        f"data: {json.dumps({'token': token})}\n\n"
+    legacy = time.process_time() - start
+    start = time.process_time()
+    for token in tokens:
+        token_frame(token)
+    template = time.process_time() - start
+    print(
+        f"frame encoding per token: json.dumps {legacy / len(tokens) * 1e9:.0f} ns, "
+        f"template+orjson {template / len(tokens) * 1e9:.0f} ns"
+    )
+
+
+def _decode(frames: list[str]) -> str:
+    return "".join(json.loads(f[6:]).get("token", "") for f in frames)
+
+
+def _run(name: str, coro, expected: str) -> None:
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    frames = asyncio.run(coro)
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    assert _decode(frames) == expected, "stream content changed"
+    size = sum(len(f.encode("utf-8")) for f in frames)
+    print(
+        f"{name:<28} frames={len(frames):>6}  bytes={size:>8}  "
+        f"cpu={cpu * 1e3:8.1f} ms  wall={wall * 1e3:8.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--gap-ms", type=float, default=0.5)
+    parser.add_argument("--flush-bytes", type=int, default=64)
+    parser.add_argument("--flush-interval-ms", type=float, default=30)
+    args = parser.parse_args()
+
+    tokens = _make_tokens(args.tokens)
+    expected = "".join(tokens)
+    _bench_encoding(_make_tokens(200_000))
+    _run("per-token json.dumps", _legacy(tokens, args.gap_ms), expected)
+    _run(
+        f"coalesced {args.flush_bytes}B/{args.flush_interval_ms:g}ms",
+        _coalesced(tokens, args.gap_ms, args.flush_bytes, args.flush_interval_ms),
+        expected,
+    )
+
+
+if __name__ == "__main__":
+    main()
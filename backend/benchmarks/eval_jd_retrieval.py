@@ -0,0 +1,140 @@
+"""Offline evaluation of JD retrieval against sending every JD in full.
+
+For each question in the fixture, renders the JD block both ways and reports
+prompt tokens, the tokens retrieval saved, and evidence recall: the share of
+expected phrases (per JD) that survived into the retrieved excerpts.
+
+With --llm, also answers every question in both modes and asks the same
+provider to grade the retrieval answer against the full-context one (1-5).
+This calls the real API and needs its key configured.
+
+Usage (from backend/):
+    python -m benchmarks.eval_jd_retrieval
+    python -m benchmarks.eval_jd_retrieval --llm openai
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+from pathlib import Path
+
+from app.config import settings
+from app.schemas.chat import ChatRequest, JDInput
+from app.services.llm.base import PromptParts
+from app.services.llm.jd_retrieval import retrieve
+from app.services.llm.prompt_builder import build_prompt_parts
+from app.services.llm.tokens import count_tokens
+
+FIXTURES = Path(__file__).parent / "fixtures"
+CORPUS = FIXTURES / "jd_corpus.jsonl"
+QUESTIONS = FIXTURES / "jd_retrieval_eval.jsonl"
+
+JUDGE_INSTRUCTIONS = (
+    "You grade answers about a set of job descriptions. The reference answer was "
+    "written with every job description in full; the candidate saw only excerpts. "
+    "Score how completely and correctly the candidate covers the reference, from 1 "
+    "(misses or contradicts most of it) to 5 (equivalent). Reply with the number only."
+)
+
+
+def _load(path: Path) -> list[dict]:
+    with path.open() as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _parts(jd_cards: list[JDInput], question: str, mode: str) -> PromptParts:
+    settings.jd_retrieval_mode = mode
+    request = ChatRequest(jd_cards=jd_cards, messages=[], user_message=question)
+    return build_prompt_parts(request)
+
+
+def _recall(jd_cards: list[JDInput], question: str, evidence: list[list[str]]) -> float:
+    retrieved = retrieve(jd_cards, question, None, settings.jd_retrieval_chunks_per_jd)
+    kept = {
+        jd.label_company: "\n".join(c.text for c in result.chunks).lower()
+        for jd, result in zip(jd_cards, retrieved, strict=True)
+    }
+    found = sum(phrase.lower() in kept.get(company, "") for company, phrase in evidence)
+    return found / len(evidence)
+
+
+async def _answer(provider, parts: PromptParts) -> str:
+    return "".join([token async for token in provider.stream_chat(parts)])
+
+
+async def _grade(provider, question: str, reference: str, candidate: str) -> int | None:
+    parts = PromptParts(
+        system_instructions=JUDGE_INSTRUCTIONS,
+        jd_block="",
+        history=[],
+        user_message=(
+            f"Question: {question}\n\nReference answer:\n{reference}\n\n"
+            f"Candidate answer:\n{candidate}"
+        ),
+    )
+    match = re.search(r"[1-5]", await _answer(provider, parts))
+    return int(match.group()) if match else None
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--llm", choices=["openai", "anthropic"], default=None)
+    args = parser.parse_args()
+
+    jd_cards = [
+        JDInput(id=str(i), text=jd["text"], label_title=jd["title"], label_company=jd["company"])
+        for i, jd in enumerate(_load(CORPUS))
+    ]
+    questions = _load(QUESTIONS)
+    provider = None
+    if args.llm:
+        from app.services.llm.factory import get_provider
+
+        provider = get_provider(args.llm)
+
+    print(f"{len(jd_cards)} JDs, {len(questions)} questions\n")
+    print(f"{'question':<48} {'full':>6} {'retr':>6} {'saved':>6} {'recall':>7} {'grade':>6}")
+    full_total = retrieval_total = 0
+    recall_total = 0.0
+    grades: list[int] = []
+    start = time.perf_counter()
+    for q in questions:
+        question = q["question"]
+        full = _parts(jd_cards, question, "off")
+        retrieved = _parts(jd_cards, question, "always")
+        full_tokens = count_tokens(full.jd_block + full.jd_trailer)
+        retrieval_tokens = count_tokens(retrieved.jd_block)
+        recall = _recall(jd_cards, question, q["evidence"])
+        full_total += full_tokens
+        retrieval_total += retrieval_tokens
+        recall_total += recall
+
+        grade = ""
+        if provider is not None:
+            reference, candidate = await asyncio.gather(
+                _answer(provider, full), _answer(provider, retrieved)
+            )
+            score = await _grade(provider, question, reference, candidate)
+            if score is not None:
+                grades.append(score)
+                grade = str(score)
+        print(
+            f"{question[:48]:<48} {full_tokens:>6} {retrieval_tokens:>6} "
+            f"{1 - retrieval_tokens / full_tokens:>6.0%} {recall:>7.0%} {grade:>6}"
+        )
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"\ntotal: {full_total} -> {retrieval_total} JD tokens "
+        f"({1 - retrieval_total / full_total:.0%} saved), "
+        f"mean evidence recall {recall_total / len(questions):.0%}"
+    )
+    if grades:
+        print(f"mean judge grade {sum(grades) / len(grades):.2f} / 5 over {len(grades)} answers")
+    print(f"elapsed {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,43 @@
+import pytest
+
+from app.services.aho_corasick import Automaton
+
+
+def _automaton(patterns: dict[str, str]) -> Automaton[str]:
+    automaton: Automaton[str] = Automaton()
+    for pattern, value in patterns.items():
+        automaton.add(pattern.split(), value)
+    automaton.build()
+    return automaton
+
+
+def test_finds_overlapping_patterns_by_end_position():
+    automaton = _automaton({"a b": "ab", "b c": "bc", "a b c d": "abcd", "c": "c"})
+    assert list(automaton.find(["a", "b", "c", "d"])) == [
+        (0, 2, "ab"),
+        (1, 3, "bc"),
+        (2, 3, "c"),
+        (0, 4, "abcd"),
+    ]
+
+
+def test_follows_failure_links_after_a_partial_match():
+    # "a a b" fails out of "a a a" at the third symbol and must still match
+    automaton = _automaton({"a a a": "aaa", "a a b": "aab"})
+    assert list(automaton.find(["a", "a", "a", "a", "b"])) == [
+        (0, 3, "aaa"),
+        (1, 4, "aaa"),
+        (2, 5, "aab"),
+    ]
+
+
+def test_no_match_and_empty_input():
+    automaton = _automaton({"spring boot": "spring boot"})
+    assert list(automaton.find(["spring", "framework"])) == []
+    assert list(automaton.find([])) == []
+
+
+def test_add_after_build_raises():
+    automaton = _automaton({"go": "go"})
+    with pytest.raises(RuntimeError):
+        automaton.add(["rust"], "rust")
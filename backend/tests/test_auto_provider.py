@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services.label_cache import current_label_models
+from app.services.llm.auto_provider import AutoProvider
+from app.services.llm.base import LLMProvider, PromptParts
+
+PROMPT = PromptParts(system_instructions="", jd_block="", history=[], user_message="hi")
+
+
+class FakeProvider(LLMProvider):
+    def __init__(self, tokens=("a", "b"), delay=0.0, error=None, fail_after=None):
+        self.chat_model = "chat"
+        self.label_model = "label"
+        self.tokens = tokens
+        self.delay = delay
+        self.error = error
+        self.fail_after = fail_after
+        self.closed = False
+        self.tasks: set[asyncio.Task] = set()
+
+    async def stream_chat(self, prompt_parts):
+        self.tasks.add(asyncio.current_task())
+        try:
+            await asyncio.sleep(self.delay)
+            if self.error and self.fail_after is None:
+                raise self.error
+            for i, token in enumerate(self.tokens):
+                if self.fail_after == i:
+                    raise self.error
+                yield token
+                await asyncio.sleep(0)
+        finally:
+            self.closed = True
+
+    async def extract_label(self, jd_text):
+        if self.error:
+            raise self.error
+        return {"title": "T", "company": None}
+
+
+@pytest.fixture(autouse=True)
+def hedge_settings(monkeypatch):
+    monkeypatch.setattr(settings, "llm_hedge_enabled", True)
+    monkeypatch.setattr(settings, "llm_hedge_default_delay_ms", 20)
+    monkeypatch.setattr(settings, "llm_hedge_min_delay_ms", 1)
+
+
+async def _collect(provider: AutoProvider) -> list[str]:
+    return [token async for token in provider.stream_chat(PROMPT)]
+
+
+async def test_hedge_wins_and_cancels_the_slow_stream():
+    slow = FakeProvider(tokens=("slow",), delay=10)
+    fast = FakeProvider(tokens=("f1", "f2"))
+    auto = AutoProvider({"slow": slow, "fast": fast})
+    auto.ranked = lambda: ["slow", "fast"]
+
+    assert await _collect(auto) == ["f1", "f2"]
+    assert slow.closed and fast.closed
+    assert len(auto.health["slow"].ttft) == 1  # recorded as slow
+
+
+async def test_fails_over_when_the_first_provider_errors():
+    broken = FakeProvider(error=RuntimeError("down"))
+    backup = FakeProvider(tokens=("ok",))
+    auto = AutoProvider({"broken": broken, "backup": backup})
+    auto.ranked = lambda: ["broken", "backup"]
+
+    assert await _collect(auto) == ["ok"]
+    assert auto.health["broken"].error_rate > 0
+
+
+async def test_error_after_first_token_is_raised_to_the_consumer():
+    flaky = FakeProvider(tokens=("a", "b"), error=RuntimeError("cut"), fail_after=1)
+    auto = AutoProvider({"flaky": flaky})
+
+    received = []
+    with pytest.raises(RuntimeError, match="cut"):
+        async for token in auto.stream_chat(PROMPT):
+            received.append(token)
+    assert received == ["a"]
+
+
+async def test_each_stream_runs_in_a_single_task():
+    first = FakeProvider(tokens=tuple("abcdef"))
+    auto = AutoProvider({"first": first})
+    await _collect(auto)
+    assert len(first.tasks) == 1
+    assert asyncio.current_task() not in first.tasks
+
+
+async def test_closing_the_consumer_cancels_the_provider_stream():
+    endless = FakeProvider(tokens=tuple("x" * 1000))
+    auto = AutoProvider({"endless": endless})
+    stream = auto.stream_chat(PROMPT)
+    assert await anext(stream) == "x"
+    await stream.aclose()
+    assert endless.closed
+
+
+async def test_extract_label_fails_over():
+    auto = AutoProvider({"a": FakeProvider(error=RuntimeError("down")), "b": FakeProvider()})
+    auto.ranked = lambda: ["a", "b"]
+    assert await auto.extract_label("jd") == {"title": "T", "company": None}
+
+
+def test_label_cache_knows_the_auto_model(monkeypatch):
+    monkeypatch.setattr(settings, "openai_label_model", "gpt")
+    monkeypatch.setattr(settings, "anthropic_label_model", "claude")
+    openai, anthropic = FakeProvider(), FakeProvider()
+    openai.label_model, anthropic.label_model = "gpt", "claude"
+    auto = AutoProvider({"openai": openai, "anthropic": anthropic})
+    assert current_label_models()["auto"] == auto.label_model
@@ -0,0 +1,133 @@
+import uuid
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.services import chat_writer as chat_writer_module
+from app.services.chat_writer import ChatMessageWriter
+
+
+class FakeResult:
+    def __init__(self, values=()):
+        self.values = list(values)
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.values
+
+    def __iter__(self):
+        return iter(self.values)
+
+
+class FakeDatabase:
+    """Stands in for async_session_factory; fails the first `failures` sessions.
+
+    Sessions in `deleted` are gone: the INSERT rejects rows for them, and unless
+    `stale_check` is set the session lookup leaves them out too.
+    """
+
+    def __init__(self, failures: int = 0, deleted=(), stale_check: bool = False):
+        self.failures = failures
+        self.deleted = set(deleted)
+        self.stale_check = stale_check
+        self.commits = 0
+        self.statements = []
+        self.inserted = []
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("database is down")
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        sql = str(stmt)
+        self.statements.append(sql)
+        params = stmt.compile().params
+        if sql.startswith("SELECT chat_sessions.id"):
+            (requested,) = params.values()
+            return FakeResult(s for s in requested if self.stale_check or s not in self.deleted)
+        if sql.startswith("INSERT INTO chat_messages"):
+            rows = [k.removeprefix("content") for k in params if k.startswith("content")]
+            if any(params[f"session_id{row}"] in self.deleted for row in rows):
+                raise IntegrityError(sql, params, Exception("foreign key violation"))
+            self.inserted += [params[f"content{row}"] for row in rows]
+        return FakeResult()
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def database(monkeypatch):
+    def install(failures: int = 0, **options) -> FakeDatabase:
+        db = FakeDatabase(failures, **options)
+        monkeypatch.setattr(chat_writer_module, "async_session_factory", db)
+        return db
+
+    return install
+
+
+def _writer(**overrides) -> ChatMessageWriter:
+    options = {"flush_size": 100, "flush_interval": 0.001, "drain_timeout": 1}
+    return ChatMessageWriter(**(options | overrides))
+
+
+async def test_failed_flush_keeps_rows_in_order(database):
+    database(failures=1)
+    writer = _writer()
+    session = uuid.uuid4()
+    writer.enqueue(session, "user", "first")
+    assert await writer.flush() is False
+    writer.enqueue(session, "assistant", "second")
+    assert [row["content"] for row in writer._rows] == ["first", "second"]
+    assert await writer.flush() is True
+    assert writer._rows == []
+
+
+async def test_stop_retries_until_drained(database):
+    db = database(failures=3)
+    writer = _writer()
+    await writer.start()
+    writer.enqueue(uuid.uuid4(), "assistant", "reply")
+    await writer.stop()
+    assert writer._rows == []
+    assert db.commits == 1
+
+
+async def test_stop_gives_up_after_drain_timeout(database):
+    database(failures=1000)
+    writer = _writer(drain_timeout=0.01)
+    writer.enqueue(uuid.uuid4(), "assistant", "reply")
+    await writer.stop()
+    assert writer._rows == []
+
+
+async def test_flush_bumps_version_but_not_edit_version(database):
+    db = database()
+    writer = _writer()
+    writer.enqueue(uuid.uuid4(), "assistant", "reply")
+    assert await writer.flush() is True
+    bumps = [stmt for stmt in db.statements if stmt.startswith("UPDATE jd_sets")]
+    assert bumps and all("version=" in stmt and "edit_version" not in stmt for stmt in bumps)
+
+
+@pytest.mark.parametrize("stale_check", [False, True])
+async def test_rows_for_deleted_sessions_are_dropped(database, stale_check):
+    live, gone = uuid.uuid4(), uuid.uuid4()
+    db = database(deleted={gone}, stale_check=stale_check)
+    writer = _writer()
+    writer.enqueue(live, "user", "first")
+    writer.enqueue(gone, "assistant", "orphan")
+    writer.enqueue(live, "assistant", "second")
+    assert await writer.flush() is True
+    assert writer._rows == []
+    assert db.inserted == ["first", "second"]
@@ -0,0 +1,32 @@
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.jd_sets import _decode_cursor, _encode_cursor
+
+
+def test_cursor_round_trips_exactly():
+    created_at = datetime(2026, 10, 18, 12, 30, 5, 123456, tzinfo=UTC)
+    row_id = uuid.uuid4()
+    cursor = _encode_cursor(created_at, row_id)
+    assert "=" not in cursor
+    assert _decode_cursor(cursor) == (created_at, row_id)
+
+
+def test_cursor_orders_ties_by_id():
+    # Keyset pages compare (timestamp, id) tuples, so equal timestamps still
+    # page deterministically
+    created_at = datetime(2026, 10, 18, tzinfo=UTC)
+    low, high = sorted([uuid.uuid4(), uuid.uuid4()])
+    assert _decode_cursor(_encode_cursor(created_at, low)) < _decode_cursor(
+        _encode_cursor(created_at, high)
+    )
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "bm90fGE", "!!!"])
+def test_malformed_cursor_is_a_client_error(cursor):
+    with pytest.raises(HTTPException) as excinfo:
+        _decode_cursor(cursor)
+    assert excinfo.value.status_code == 400
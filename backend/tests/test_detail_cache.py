@@ -0,0 +1,49 @@
+import uuid
+
+from app.services.detail_cache import ENTRY_OVERHEAD_BYTES, DetailCache, SQLiteSharedTier
+
+BODY = b"x" * 100
+ENTRY = len(BODY) + ENTRY_OVERHEAD_BYTES
+
+
+async def test_lru_evicts_least_recently_used_by_bytes():
+    cache = DetailCache(max_bytes=2 * ENTRY)
+    a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    await cache.set(a, 1, BODY)
+    await cache.set(b, 1, BODY)
+    assert await cache.get(a, 1) == BODY  # a is now the most recent
+    await cache.set(c, 1, BODY)
+
+    assert await cache.get(b, 1) is None
+    assert await cache.get(a, 1) == BODY
+    assert cache.bytes == 2 * ENTRY
+    assert cache.evictions == 1
+
+
+async def test_newer_version_replaces_older():
+    cache = DetailCache(max_bytes=10 * ENTRY)
+    set_id = uuid.uuid4()
+    await cache.set(set_id, 1, BODY)
+    await cache.set(set_id, 2, b"new")
+    assert await cache.get(set_id, 1) is None
+    assert await cache.get(set_id, 2) == b"new"
+    assert cache.stats()["size"] == 1
+
+
+async def test_oversized_body_is_not_cached():
+    cache = DetailCache(max_bytes=ENTRY - 1)
+    await cache.set(uuid.uuid4(), 1, BODY)
+    assert cache.bytes == 0
+
+
+async def test_shared_tier_fills_local_misses_and_invalidates():
+    shared = SQLiteSharedTier(":memory:")
+    writer, reader = DetailCache(10 * ENTRY, shared), DetailCache(10 * ENTRY, shared)
+    set_id = uuid.uuid4()
+    await writer.set(set_id, 3, BODY)
+
+    assert await reader.get(set_id, 3) == BODY
+    assert reader.shared_hits == 1
+    await writer.invalidate(set_id)
+    assert await writer.get(set_id, 3) is None
+    assert await shared.get((set_id, 3)) is None
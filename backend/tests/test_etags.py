@@ -0,0 +1,43 @@
+import pytest
+
+from app.api.v1.jd_sets import _etag, _etag_matches, _if_match_allows
+
+
+def test_etag_carries_both_versions():
+    assert _etag(3, 17) == '"3.17"'
+
+
+@pytest.mark.parametrize(
+    ("header", "matches"),
+    [
+        ('"3.17"', True),
+        ('W/"3.17"', True),
+        ('"1.1", "3.17"', True),
+        ("*", True),
+        ('"3.16"', False),
+        ('"4.17"', False),
+    ],
+)
+def test_if_none_match_compares_the_whole_tag(header, matches):
+    assert _etag_matches(header, _etag(3, 17)) is matches
+
+
+@pytest.mark.parametrize(
+    ("header", "allowed"),
+    [
+        # A chat turn or label write-back since the read only moved `version`
+        ('"3.16"', True),
+        ('"3.17"', True),
+        ('"2.15", "3.9"', True),
+        ("*", True),
+        # Tags issued before the edit/version split
+        ('"3"', True),
+        # Someone else renamed or synced items
+        ('"2.16"', False),
+        # If-Match uses strong comparison
+        ('W/"3.17"', False),
+        ("3.17", False),
+    ],
+)
+def test_if_match_only_guards_edits(header, allowed):
+    assert _if_match_allows(header, edit_version=3) is allowed
@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import jd_blobs
+from app.services.jd_blobs import (
+    BlobCodec,
+    blob_row,
+    dictionary_id,
+    jd_blob_hash,
+    load_codec,
+    normalize_jd_text,
+    train_dictionary,
+)
+
+TEXTS = [
+    "Senior Backend Engineer\r\nAcme\n\nWe are an equal opportunity employer.",
+    "Data Engineer\nGlobex\n\nWe are an equal opportunity employer. Café perks.",
+    "",
+]
+OLD_DICTIONARY = b"We are an equal opportunity employer."
+NEW_DICTIONARY = train_dictionary(TEXTS * 3)
+
+
+@pytest.mark.parametrize("dictionary", [b"", OLD_DICTIONARY])
+@pytest.mark.parametrize("text", TEXTS)
+def test_blob_round_trip(dictionary, text):
+    codec = BlobCodec(dictionary)
+    text = normalize_jd_text(text)
+    row = blob_row(codec, text)
+    assert row["hash"] == jd_blob_hash(text)
+    assert row["raw_size"] == len(text.encode("utf-8"))
+    assert codec.decompress(row["codec"], row["body"]) == text
+
+
+def test_normalization_makes_equal_texts_share_a_hash():
+    assert jd_blob_hash("a\r\nb") == jd_blob_hash("a\nb")
+    assert jd_blob_hash("Cafe\u0301") == jd_blob_hash("Caf\u00e9")
+
+
+def test_blobs_from_a_retired_dictionary_stay_readable():
+    old_row = blob_row(BlobCodec(OLD_DICTIONARY), TEXTS[0])
+    codec = BlobCodec(NEW_DICTIONARY, retired=[OLD_DICTIONARY])
+
+    assert old_row["codec"] == f"zlib+dict:{dictionary_id(OLD_DICTIONARY)}"
+    assert codec.default == f"zlib+dict:{dictionary_id(NEW_DICTIONARY)}"
+    assert codec.decompress(old_row["codec"], old_row["body"]) == TEXTS[0]
+
+
+def test_unknown_dictionary_is_an_error():
+    row = blob_row(BlobCodec(OLD_DICTIONARY), TEXTS[0])
+    with pytest.raises(ValueError, match="Unknown JD blob codec"):
+        BlobCodec(NEW_DICTIONARY).decompress(row["codec"], row["body"])
+
+
+def test_load_codec_registers_retired_dictionaries(tmp_path, monkeypatch):
+    monkeypatch.setattr(jd_blobs, "DICTIONARY_PATH", tmp_path / "jd_blob_dictionary.txt")
+    jd_blobs.DICTIONARY_PATH.write_bytes(NEW_DICTIONARY)
+    jd_blobs.retired_dictionary_path(dictionary_id(OLD_DICTIONARY)).write_bytes(OLD_DICTIONARY)
+
+    codec = load_codec()
+    assert set(codec.dictionaries) == {dictionary_id(OLD_DICTIONARY), dictionary_id(NEW_DICTIONARY)}
+    assert codec.default == f"zlib+dict:{dictionary_id(NEW_DICTIONARY)}"
+
+    # An edited retired dictionary would silently corrupt its blobs
+    jd_blobs.retired_dictionary_path(dictionary_id(OLD_DICTIONARY)).write_bytes(b"edited")
+    with pytest.raises(ValueError, match="must never change"):
+        load_codec()
+
+
+class RecordingDatabase:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+
+
+async def test_put_refreshes_reused_blobs_against_pruning():
+    db = RecordingDatabase()
+    store = jd_blobs.BlobStore(BlobCodec(b""), max_bytes=1024)
+    await store.put_many(db, TEXTS[:2])
+    sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (hash) DO UPDATE SET created_at = now()" in sql
+    assert "WHERE jd_blobs.created_at < now() -" in sql
@@ -0,0 +1,80 @@
+import json
+import re
+from pathlib import Path
+
+import pytest
+
+from app.services.llm.jd_dedup import dedupe_jd_texts
+
+CORPUS = Path(__file__).parents[1] / "benchmarks" / "fixtures" / "jd_corpus.jsonl"
+REQUIREMENT = "You must have 5+ years of experience building distributed systems in Python."
+
+
+def _jd(title: str, extra: str) -> str:
+    return f"{title}\nAcme\n\nRequirements:\n- {REQUIREMENT}\n- {extra}"
+
+
+def _expand(text: str, sections: list[str]) -> str:
+    """Resolve shared-section references back to their text."""
+    by_number = {}
+    for section in sections:
+        number, body = re.match(r"\[S(\d+)\] (.*)", section, re.DOTALL).groups()
+        by_number[number] = body
+    return re.sub(r"\[See (?:shared section )?S(\d+)\]", lambda m: by_number[m[1]], text)
+
+
+@pytest.mark.parametrize("mode", ["shared", "drop"])
+def test_repeated_requirement_stays_referenced_in_every_jd(mode):
+    result = dedupe_jd_texts([_jd("Backend", "Kafka"), _jd("Data", "Spark")], mode)
+    assert result.shared_sections == [f"[S1] {REQUIREMENT}"]
+    for text in result.texts:
+        assert "- [See S1]" in text
+        assert REQUIREMENT in _expand(text, result.shared_sections)
+
+
+@pytest.mark.parametrize("mode", ["shared", "drop"])
+def test_corpus_loses_nothing_but_boilerplate(mode):
+    texts = [json.loads(line)["text"] for line in CORPUS.read_text().splitlines()]
+    result = dedupe_jd_texts(texts, mode)
+    assert result.tokens_saved > 0
+    for original, text in zip(texts, result.texts, strict=True):
+        expanded = _expand(text, result.shared_sections)
+        for line in original.splitlines():
+            if line.strip() and "opportunity employer" not in line:
+                assert line.strip() in expanded
+
+
+def test_boilerplate_is_removed_per_sentence():
+    text = (
+        "Benefits\n\nWe offer a home office stipend and reasonable accommodations for every "
+        "employee. If you need a reasonable accommodation during the application process, "
+        "let us know. We are an equal opportunity employer. We also offer equity."
+    )
+    shared = dedupe_jd_texts([text], "shared").texts[0]
+    assert "home office stipend and reasonable accommodations" in shared
+    assert "We also offer equity." in shared
+    assert "application process" not in shared
+    assert "equal opportunity employer" not in shared
+    assert shared.count("[equal opportunity statement omitted]") == 1
+
+    dropped = dedupe_jd_texts([text], "drop").texts[0]
+    assert "omitted" not in dropped
+    assert "We also offer equity." in dropped
+
+
+def test_near_duplicates_keep_their_differences():
+    common = "Our team builds the platform that millions of merchants rely on every day."
+    first = f"A\n\n{common} You need 5+ years of Go."
+    second = f"B\n\n{common} You need 8+ years of Go."
+    result = dedupe_jd_texts([first, second], "shared")
+    assert "5+ years" in result.texts[0]
+    assert "8+ years" in result.texts[1]
+    assert result.shared_sections == [f"[S1] {common}"]
+
+
+def test_off_mode_is_passthrough():
+    texts = [_jd("Backend", "Kafka"), _jd("Data", "Spark")]
+    result = dedupe_jd_texts(texts, "off")
+    assert result.texts == texts
+    assert result.shared_sections == []
+    assert result.tokens_saved == 0
@@ -0,0 +1,126 @@
+import pytest
+
+from app.config import Settings, settings
+from app.schemas.chat import ChatMessage, ChatRequest, JDInput
+from app.services.llm.jd_retrieval import (
+    RetrievalIndex,
+    WorkspaceIndex,
+    index_item,
+    retrieval_query,
+    retrieve,
+    split_chunks,
+    use_retrieval,
+)
+from app.services.llm.prompt_builder import RETRIEVAL_NOTE, build_prompt_parts
+
+
+def _jd(company: str, stack: str, perk: str) -> str:
+    return (
+        f"Backend Engineer\n{company}\n\n"
+        f"About us:\n{company} builds payments software.\n\n"
+        f"Requirements:\n- 5+ years with {stack}\n- Experience with distributed systems\n\n"
+        f"Benefits:\n- {perk}\n- Health insurance"
+    )
+
+
+JDS = [
+    JDInput(id=str(i), text=_jd(company, stack, perk), label_company=company)
+    for i, (company, stack, perk) in enumerate(
+        [
+            ("Acme", "Go and PostgreSQL", "Four-day work week"),
+            ("Globex", "Rust", "Unlimited vacation"),
+            ("Initech", "Java", "Stock options"),
+        ]
+    )
+]
+
+
+def test_split_chunks_by_heading():
+    chunks = split_chunks(JDS[0].text, max_tokens=200)
+    assert [(c.kind, c.heading) for c in chunks] == [
+        ("header", ""),
+        ("about", "About us"),
+        ("requirements", "Requirements"),
+        ("benefits", "Benefits"),
+    ]
+
+
+def test_bm25_prefers_rare_terms():
+    items = {str(i): index_item(jd.text, 200) for i, jd in enumerate(JDS)}
+    index = WorkspaceIndex()
+    index.sync(items, list(items))
+    scores = index.scores(["rust", "system"], items["1"])
+    # "rust" is in one chunk of the workspace, "system" in every requirements chunk
+    assert max(scores) == scores[2]
+    assert index.scores(["system"], items["1"])[2] < scores[2]
+    assert index.scores(["kubernete"], items["1"]) == [0.0] * 4
+
+
+def test_workspace_sync_matches_a_rebuild():
+    items = {str(i): index_item(jd.text, 200) for i, jd in enumerate(JDS)}
+    index = WorkspaceIndex()
+    index.sync(items, ["0", "1"])
+    index.sync(items, ["1", "2"])
+    rebuilt = WorkspaceIndex()
+    rebuilt.sync(items, ["1", "2"])
+    assert (index.df, index.chunks, index.total_length) == (
+        rebuilt.df,
+        rebuilt.chunks,
+        rebuilt.total_length,
+    )
+
+
+def test_retrieve_keeps_matching_sections_in_document_order():
+    results = retrieve(JDS, "which one offers unlimited vacation?", None, per_jd=1)
+    assert [c.kind for c in results[1].chunks] == ["benefits"]
+    assert results[1].total == 4
+    assert results[1].omitted_tokens > 0
+    # JDs nothing matches keep their header
+    assert [c.kind for c in results[0].chunks] == ["header"]
+
+
+def test_retrieval_index_reuses_chunked_items():
+    index = RetrievalIndex(max_items=8, max_workspaces=2)
+    texts = [jd.text for jd in JDS]
+    index.workspace("a", texts)
+    index.workspace("a", texts[:2])
+    assert (index.hits, index.misses) == (2, 3)
+
+
+def test_retrieval_query_includes_recent_user_messages(monkeypatch):
+    monkeypatch.setattr(settings, "jd_retrieval_history_messages", 1)
+    request = ChatRequest(
+        messages=[
+            ChatMessage(role="user", content="Which JDs use Rust?"),
+            ChatMessage(role="assistant", content="Globex."),
+            ChatMessage(role="user", content="Compare their benefits"),
+            ChatMessage(role="assistant", content="..."),
+        ],
+        user_message="And the salary?",
+    )
+    assert retrieval_query(request) == "Compare their benefits\nAnd the salary?"
+    monkeypatch.setattr(settings, "jd_retrieval_history_messages", 0)
+    assert retrieval_query(request) == "And the salary?"
+
+
+@pytest.mark.parametrize(
+    ("mode", "count", "expected"),
+    [("off", 100, False), ("always", 1, True), ("auto", 14, False), ("auto", 15, True)],
+)
+def test_use_retrieval(monkeypatch, mode, count, expected):
+    monkeypatch.setattr(settings, "jd_retrieval_mode", mode)
+    monkeypatch.setattr(settings, "jd_retrieval_min_jds", 15)
+    assert use_retrieval(count) is expected
+
+
+def test_retrieval_is_off_by_default():
+    assert Settings.model_fields["jd_retrieval_mode"].default == "off"
+
+
+def test_prompt_says_it_shows_excerpts(monkeypatch):
+    monkeypatch.setattr(settings, "jd_retrieval_mode", "always")
+    request = ChatRequest(jd_cards=JDS, messages=[], user_message="Who offers stock options?")
+    parts = build_prompt_parts(request)
+    assert RETRIEVAL_NOTE in parts.jd_block
+    assert "(1 of 4 sections)" in parts.jd_block
+    assert parts.jd_tokens_saved > 0
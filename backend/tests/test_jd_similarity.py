@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services import jd_similarity
+from app.services.jd_similarity import VectorCache, item_vectors, similarity, vectorize
+
+
+class FakeBlobStore:
+    def __init__(self, texts: dict[str, str]):
+        self.texts = texts
+        self.requested: list[list[str]] = []
+
+    async def get_many(self, db, hashes):
+        hashes = list(hashes)
+        self.requested.append(hashes)
+        return {h: self.texts[h] for h in hashes if h in self.texts}
+
+
+@pytest.fixture
+def blobs(monkeypatch):
+    store = FakeBlobStore({"h1": "Python Kafka services", "h2": "React TypeScript UI"})
+    monkeypatch.setattr(jd_similarity, "blob_store", store)
+    monkeypatch.setattr(jd_similarity, "vector_cache", VectorCache(16))
+    return store
+
+
+def test_vectorize_keeps_tech_tokens_and_bigrams():
+    vector = vectorize("We use C++ and Node.js. C++ is fast.")
+    weights = dict(zip(vector.terms, vector.weights, strict=True))
+    assert weights["c++"] == pytest.approx(1 + np.log(2))
+    assert "node.js" in weights
+    assert "c++ node.js" in weights
+    assert "we" not in weights
+
+
+def test_similarity_ranks_shared_terms():
+    vectors = [vectorize(t) for t in ["python kafka", "python kafka spark", "react css"]]
+    result = similarity(vectors, top_terms=3)
+    assert np.allclose(np.diag(result.matrix), 1.0)
+    assert result.matrix[0, 1] > result.matrix[0, 2]
+    assert [(p.a, p.b) for p in result.pairs] == [(0, 1), (0, 2), (1, 2)]
+    assert "spark" in result.pairs[0].only_b
+
+
+async def test_item_vectors_loads_only_cache_misses(blobs):
+    items = [
+        SimpleNamespace(blob_hash="h1", raw_text=None),
+        SimpleNamespace(blob_hash=None, raw_text="Legacy inline Go text"),
+    ]
+    first = await item_vectors(None, items)
+    assert blobs.requested == [["h1"]]
+
+    items.append(SimpleNamespace(blob_hash="h2", raw_text=None))
+    second = await item_vectors(None, items)
+    assert blobs.requested == [["h1"], ["h2"]]
+    assert second[:2] == first
+    assert "react" in second[2].terms
+
+
+async def test_missing_blob_vectorizes_as_empty(blobs):
+    [vector] = await item_vectors(None, [SimpleNamespace(blob_hash="gone", raw_text=None)])
+    assert vector.terms == ()
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from app.services import label_extractor
+from app.services.label_cache import LabelCache, label_cache_key, normalize_label_text
+
+UNLABELED = "we build things. join us and help build more things with us."
+
+
+class FakeProvider:
+    label_model = "fake-label"
+
+    def __init__(self, label: dict[str, str | None] | None = None, delay: float = 0.01):
+        self.label = label or {"title": "Engineer", "company": "Acme"}
+        self.delay = delay
+        self.calls = 0
+
+    async def extract_label(self, jd_text: str) -> dict[str, str | None]:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return dict(self.label)
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    fake = FakeProvider()
+    monkeypatch.setattr(label_extractor, "get_provider", lambda name: fake)
+    monkeypatch.setattr(label_extractor, "label_cache", LabelCache(16, persist=False))
+    monkeypatch.setattr(label_extractor, "_inflight", {})
+    monkeypatch.setattr(label_extractor, "_semaphores", {})
+    return fake
+
+
+def test_key_ignores_whitespace_and_text_past_limit():
+    assert normalize_label_text("a \n b\t c") == "a b c"
+    assert label_cache_key("a  b", "openai", "m") == label_cache_key("a b", "openai", "m")
+    assert label_cache_key("x" * 3000 + "tail", "openai", "m") == label_cache_key(
+        "x" * 3000, "openai", "m"
+    )
+    assert label_cache_key("a", "openai", "m1") != label_cache_key("a", "openai", "m2")
+
+
+async def test_lru_evicts_least_recently_used():
+    cache = LabelCache(2, persist=False)
+    await cache.set("a", "p", "m", {"title": "A", "company": None})
+    await cache.set("b", "p", "m", {"title": "B", "company": None})
+    assert await cache.get("a") == {"title": "A", "company": None}
+    await cache.set("c", "p", "m", {"title": "C", "company": None})
+
+    assert await cache.get("b") is None
+    assert (await cache.get("a"))["title"] == "A"
+    assert (await cache.get("c"))["title"] == "C"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (3, 1, 2)
+
+
+async def test_empty_labels_are_not_cached():
+    cache = LabelCache(4, persist=False)
+    await cache.set("k", "p", "m", {"title": None, "company": None})
+    assert await cache.get("k") is None
+
+
+async def test_returned_labels_are_copies():
+    cache = LabelCache(4, persist=False)
+    await cache.set("k", "p", "m", {"title": "A", "company": "B"})
+    (await cache.get("k"))["title"] = "mutated"
+    assert (await cache.get("k"))["title"] == "A"
+
+
+async def test_singleflight_shares_one_call(provider):
+    labels = await asyncio.gather(*(label_extractor.extract_label(UNLABELED) for _ in range(5)))
+    assert provider.calls == 1
+    assert all(label == {"title": "Engineer", "company": "Acme"} for label in labels)
+
+    # Served from the cache afterwards
+    await label_extractor.extract_label(UNLABELED)
+    assert provider.calls == 1
+    assert not label_extractor._inflight
+
+
+async def test_cancelled_caller_does_not_cancel_shared_call(provider):
+    first = asyncio.create_task(label_extractor.extract_label(UNLABELED))
+    second = asyncio.create_task(label_extractor.extract_label(UNLABELED))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == {"title": "Engineer", "company": "Acme"}
+    assert provider.calls == 1
+
+
+async def test_batch_dedupes_identical_texts(provider):
+    results = [
+        item async for item in label_extractor.extract_labels_batch([UNLABELED, UNLABELED, "x y"])
+    ]
+    assert sorted(idx for idx, _, _ in results) == [0, 1, 2]
+    assert provider.calls == 2
@@ -0,0 +1,60 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from app.config import settings
+from app.services.label_heuristics import extract_label_heuristic
+
+CORPUS = Path(__file__).parents[1] / "benchmarks" / "fixtures" / "labeled_jds.jsonl"
+DOCS = [json.loads(line) for line in CORPUS.read_text().splitlines() if line.strip()]
+
+
+def _norm(value: str | None) -> str:
+    return " ".join((value or "").lower().split())
+
+
+@pytest.mark.parametrize("doc", DOCS, ids=[doc["title"] for doc in DOCS])
+def test_accepted_labels_are_correct(doc):
+    guess = extract_label_heuristic(doc["text"])
+    if guess.confidence >= settings.label_heuristic_threshold:
+        assert _norm(guess.title) == _norm(doc["title"])
+        assert _norm(guess.company) == _norm(doc["company"])
+
+
+def test_coverage_does_not_regress():
+    accepted = sum(
+        extract_label_heuristic(doc["text"]).confidence >= settings.label_heuristic_threshold
+        for doc in DOCS
+    )
+    assert accepted >= 16
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "Software Engineer - New York",
+        "Backend Engineer | Remote",
+        "Data Engineer - San Francisco, CA",
+        "Platform Engineer — Toronto, ON",
+        "Senior Engineer · Berlin",
+        "Engineer at London",
+        "Product Designer - Remote (US)",
+    ],
+)
+def test_locations_are_never_companies(header):
+    guess = extract_label_heuristic(f"{header}\n\nBuild things with us.")
+    assert guess.company is None
+    # Well clear of the threshold, not just under it
+    assert guess.confidence <= 0.5
+
+
+def test_separator_with_location_keeps_title():
+    guess = extract_label_heuristic("Software Engineer - New York\n\nJoin the team.")
+    assert guess.title == "Software Engineer"
+
+
+def test_company_named_after_a_place():
+    guess = extract_label_heuristic("Robotics Engineer at Boston Dynamics")
+    assert (guess.title, guess.company) == ("Robotics Engineer", "Boston Dynamics")
+    assert guess.confidence >= settings.label_heuristic_threshold
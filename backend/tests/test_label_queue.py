@@ -0,0 +1,116 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.services import label_queue as label_queue_module
+from app.services.label_queue import LabelJob, LabelQueue
+
+SET_ID = uuid.uuid4()
+
+
+def _queue(**overrides) -> LabelQueue:
+    options = {
+        "workers": 1,
+        "max_retries": 2,
+        "backoff_seconds": 0.001,
+        "flush_size": 100,
+        "flush_interval": 60,
+        "provider": "fake",
+        "negative_ttl": 3600,
+        "drain_timeout": 1,
+    }
+    return LabelQueue(**(options | overrides))
+
+
+def _job(blob_hash: str = "h1") -> LabelJob:
+    return LabelJob(item_id=uuid.uuid4(), jd_set_id=SET_ID, text="text", blob_hash=blob_hash)
+
+
+class FakeExtractor:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def __call__(self, text: str, provider: str):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class FailingSession:
+    async def __aenter__(self):
+        raise OSError("database is down")
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture(autouse=True)
+def no_database(monkeypatch):
+    monkeypatch.setattr(label_queue_module, "async_session_factory", FailingSession)
+
+
+async def _drain(queue: LabelQueue) -> None:
+    await queue.start()
+    await asyncio.wait_for(queue._queue.join(), timeout=1)
+
+
+async def test_retries_then_buffers_label(monkeypatch):
+    extract = FakeExtractor(RuntimeError("boom"), {"title": "Engineer", "company": "Acme"})
+    monkeypatch.setattr(label_queue_module, "extract_label", extract)
+    queue = _queue()
+    queue.enqueue([_job()])
+    await _drain(queue)
+
+    assert extract.calls == 2
+    assert [row["b_title"] for row in queue._results] == ["Engineer"]
+    assert queue.status(SET_ID) == {"pending": 0, "completed": 1, "failed": 0}
+    await queue.stop()
+
+
+@pytest.mark.parametrize("outcome", [RuntimeError("boom"), {"title": None, "company": None}])
+async def test_unlabelable_text_is_not_enqueued_again(monkeypatch, outcome):
+    extract = FakeExtractor(outcome)
+    monkeypatch.setattr(label_queue_module, "extract_label", extract)
+    queue = _queue()
+    queue.enqueue([_job("same")])
+    await _drain(queue)
+    calls = extract.calls
+    assert not queue._results
+
+    # A re-sync with the same text (another item id) does not pay again
+    queue.enqueue([_job("same")])
+    await asyncio.wait_for(queue._queue.join(), timeout=1)
+    assert extract.calls == calls
+    assert queue.status(SET_ID)["failed"] == 1
+    queue.enqueue([_job("other")])
+    await asyncio.wait_for(queue._queue.join(), timeout=1)
+    assert extract.calls > calls
+    await queue.stop()
+
+
+async def test_failed_flush_keeps_the_batch():
+    queue = _queue()
+    queue._results = [
+        {"b_id": uuid.uuid4(), "b_set_id": SET_ID, "b_hash": "h", "b_title": "T", "b_company": None}
+    ]
+    await queue._flush()
+    assert len(queue._results) == 1
+    assert queue._results[0]["b_set_id"] == SET_ID
+    assert queue._flush_failures == 1
+
+
+async def test_stop_waits_for_backoff_retries(monkeypatch):
+    extract = FakeExtractor(RuntimeError("boom"), {"title": "Engineer", "company": "Acme"})
+    monkeypatch.setattr(label_queue_module, "extract_label", extract)
+    queue = _queue(backoff_seconds=0.05)
+    await queue.start()
+    queue.enqueue([_job()])
+    await asyncio.sleep(0.01)  # first attempt failed, the retry is backing off
+    await queue.stop()
+
+    assert extract.calls == 2
+    assert queue.status(SET_ID)["completed"] == 1
@@ -0,0 +1,76 @@
+from app.services.requirements import RequirementExtractor, Requirements
+
+TAXONOMY = {
+    "language": {
+        "Go": ["=Go", "golang"],
+        "C": ["-C", "=C programming", "ansi c"],
+        "C++": ["cpp"],
+    },
+    "backend": {
+        "Spring": ["spring framework"],
+        "Spring Boot": ["springboot"],
+    },
+    "database": {"PostgreSQL": ["postgres"]},
+}
+
+extractor = RequirementExtractor(TAXONOMY, "test")
+
+
+def test_longest_match_wins():
+    assert extractor.find_skills("Spring Boot and Spring") == ["spring boot", "spring"]
+
+
+def test_exact_case_aliases():
+    assert extractor.find_skills("We use Go and golang") == ["go"]
+    assert extractor.find_skills("go ahead and apply") == []
+
+
+def test_excluded_name_only_matches_aliases():
+    assert extractor.find_skills("Plan C, or C++ and ANSI C") == ["c++", "c"]
+    assert extractor.find_skills("C programming") == ["c"]
+    assert extractor.find_skills("c programming") == []
+
+
+def test_skills_keep_first_mention_order_without_duplicates():
+    text = "Postgres, Golang, postgres again and more Go"
+    assert extractor.find_skills(text) == ["postgresql", "go"]
+
+
+def test_extract_years_salary_and_seniority():
+    text = (
+        "Senior Backend Engineer\nAcme\n"
+        "You have 5+ years of experience with Go. Pay: $150-180k USD."
+    )
+    req = extractor.extract(text)
+    assert req.seniority == "senior"
+    assert (req.years_min, req.years_max) == (5, None)
+    assert (req.salary_min, req.salary_max, req.salary_currency) == (150_000, 180_000, "USD")
+
+
+def test_year_ranges_and_implausible_salaries():
+    req = extractor.extract("Engineer\n3-6 years of experience. Rate: $50-70 per hour.")
+    assert (req.years_min, req.years_max) == (3, 6)
+    assert req.salary_min is None
+    assert extractor.extract("Engineer\nAcme was founded 12 years ago.").years_min is None
+
+
+def test_summary():
+    req = Requirements(
+        skills=["go", "postgresql"],
+        seniority="senior",
+        years_min=5,
+        salary_min=150_000,
+        salary_max=180_000,
+        salary_currency="USD",
+    )
+    assert extractor.summary(req) == (
+        "Extracted: senior | 5+ yrs | USD 150,000-180,000 | Skills: Go, PostgreSQL"
+    )
+    assert extractor.summary(Requirements()) == ""
+
+
+def test_bundled_taxonomy_loads():
+    bundled = RequirementExtractor.load()
+    assert len(bundled.skills) > 2000
+    assert len(bundled.version) == 16
+    assert bundled.find_skills("Kubernetes, k8s and Spring Boot") == ["kubernetes", "spring boot"]
@@ -0,0 +1,108 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.llm.scheduler import (
+    AdmissionScheduler,
+    OverloadedError,
+    Priority,
+    TokenBucket,
+    _retry_after,
+)
+
+
+def _scheduler(**overrides) -> AdmissionScheduler:
+    options = {
+        "name": "fake",
+        "requests_per_minute": 0,
+        "tokens_per_minute": 0,
+        "max_queue_depth": 10,
+        "max_wait": {Priority.INTERACTIVE: 1.0, Priority.BACKGROUND: 1.0},
+    }
+    return AdmissionScheduler(**(options | overrides))
+
+
+def _rate_limit(headers: dict | None = None, status: int = 429) -> Exception:
+    error = RuntimeError("rate limited")
+    error.response = SimpleNamespace(status_code=status, headers=headers or {})
+    return error
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(per_minute=60)
+    now = bucket.updated
+    assert bucket.delay_for(60, now) == 0
+    bucket.take(60)
+    assert bucket.delay_for(1, now) == pytest.approx(1.0)
+    assert bucket.delay_for(1, now + 1) == pytest.approx(0.0)
+    # Larger than the bucket: waits for a full bucket instead of forever
+    assert bucket.delay_for(1000, now + 1) == pytest.approx(59.0)
+
+
+def test_disabled_bucket_never_delays():
+    bucket = TokenBucket(per_minute=0)
+    bucket.take(1000)
+    assert bucket.delay_for(1000, bucket.updated) == 0
+
+
+async def test_admits_immediately_when_idle():
+    scheduler = _scheduler()
+    assert await scheduler.acquire(Priority.INTERACTIVE, 100) == 0
+    assert scheduler.admitted == 1
+
+
+async def test_queued_requests_are_admitted_by_priority():
+    scheduler = _scheduler()
+    scheduler.throttle(0.05)
+    order = []
+
+    async def request(priority: Priority, label: str) -> None:
+        await scheduler.acquire(priority, 1)
+        order.append(label)
+
+    tasks = [asyncio.create_task(request(Priority.BACKGROUND, "background"))]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(request(Priority.INTERACTIVE, "interactive")))
+    await asyncio.gather(*tasks)
+    assert order == ["interactive", "background"]
+    assert scheduler.throttled == 1
+
+
+async def test_full_queue_is_rejected():
+    scheduler = _scheduler(max_queue_depth=1)
+    scheduler.throttle(10)
+    waiting = asyncio.create_task(scheduler.acquire(Priority.BACKGROUND, 1))
+    await asyncio.sleep(0)
+    with pytest.raises(OverloadedError) as excinfo:
+        await scheduler.acquire(Priority.INTERACTIVE, 1)
+    assert excinfo.value.retry_after >= 1
+    assert scheduler.stats()["queue_depth"] == {"interactive": 0, "background": 1}
+    waiting.cancel()
+    await asyncio.gather(waiting, return_exceptions=True)
+
+
+async def test_wait_budget_is_enforced():
+    scheduler = _scheduler(max_wait={Priority.INTERACTIVE: 0.01, Priority.BACKGROUND: 0.01})
+    scheduler.throttle(10)
+    with pytest.raises(OverloadedError):
+        await scheduler.acquire(Priority.INTERACTIVE, 1)
+    assert scheduler.rejected == 1
+    assert scheduler.stats()["queue_depth"]["interactive"] == 0
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected"),
+    [
+        ({"retry-after-ms": "1500"}, 1.5),
+        ({"retry-after": "7"}, 7.0),
+        ({}, 4.0),
+    ],
+)
+def test_retry_after_reads_headers(headers, expected):
+    assert _retry_after(_rate_limit(headers), attempt=2) == expected
+
+
+def test_retry_after_ignores_other_errors():
+    assert _retry_after(_rate_limit(status=500), attempt=0) is None
+    assert _retry_after(ValueError("bad"), attempt=0) is None
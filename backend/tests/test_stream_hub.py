@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from app.services.llm.stream_hub import StreamHub
+
+
+class Upstream:
+    def __init__(self, tokens, error=None):
+        self.tokens = tokens
+        self.error = error
+        self.calls = 0
+        self.closed = False
+        self.release = asyncio.Event()
+
+    async def stream(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+            for token in self.tokens:
+                yield token
+                await asyncio.sleep(0)
+            if self.error:
+                raise self.error
+        finally:
+            self.closed = True
+
+
+async def _collect(stream) -> list[str]:
+    return [token async for token in stream]
+
+
+async def test_identical_requests_share_one_upstream_call():
+    hub = StreamHub()
+    upstream = Upstream(["a", "b", "c"])
+    first = asyncio.create_task(_collect(hub.subscribe("k", upstream.stream)))
+    second = asyncio.create_task(_collect(hub.subscribe("k", upstream.stream)))
+    await asyncio.sleep(0)
+    upstream.release.set()
+
+    assert await first == await second == ["a", "b", "c"]
+    assert upstream.calls == 1
+    assert hub.stats() == {"active_streams": 0, "subscribers": 0, "started": 1, "joined": 1}
+
+
+async def test_upstream_error_reaches_every_subscriber():
+    hub = StreamHub()
+    upstream = Upstream(["a"], error=RuntimeError("boom"))
+    upstream.release.set()
+    results = await asyncio.gather(
+        _collect(hub.subscribe("k", upstream.stream)),
+        _collect(hub.subscribe("k", upstream.stream)),
+        return_exceptions=True,
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert upstream.calls == 1
+
+
+async def test_upstream_is_cancelled_when_the_last_subscriber_leaves():
+    hub = StreamHub()
+    upstream = Upstream(["a"])
+    stream = hub.subscribe("k", upstream.stream)
+    waiting = asyncio.create_task(anext(stream))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    await stream.aclose()
+    await asyncio.sleep(0)
+    assert upstream.closed
+    assert hub.stats()["active_streams"] == 0